@@ -0,0 +1,80 @@
+"""الملفات المحلية للواجهة (الخط والأيقونة) وذاكرة على القرص للصور البعيدة في oil_types.image"""
+import hashlib
+import logging
+import os
+import urllib.request
+from pathlib import Path
+from typing import Iterable, Optional
+
+from repository import data_dir
+
+# مجلد الملفات الذي يمرر إلى app(assets_dir=...)، والمسارات أدناه نسبية له
+ASSETS_DIR = Path(__file__).resolve().parent / "assets"
+
+# الخطوط المضمّنة مع التطبيق، تنزّل بواسطة fetch_assets.py
+FONTS = {
+    "Cairo": "fonts/Cairo.ttf",
+}
+
+APP_ICON = "icons/app_icon.png"
+
+# الصور البعيدة تنزّل مرة واحدة وتقرأ بعدها من هذا المجلد
+IMAGE_CACHE_DIR = data_dir / "image_cache"
+IMAGE_FETCH_TIMEOUT = 10
+
+
+def local_fonts() -> dict:
+    """الخطوط الموجودة فعلاً في مجلد الملفات، الخط الناقص يترك للخط الافتراضي بدل طلبه من الشبكة"""
+    return {family: path for family, path in FONTS.items() if (ASSETS_DIR / path).is_file()}
+
+
+def _is_remote(src: str) -> bool:
+    return src.startswith(("http://", "https://"))
+
+
+def _cache_path(url: str) -> Path:
+    suffix = Path(url.split("?", 1)[0]).suffix.lower()
+    if suffix not in (".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg"):
+        suffix = ".img"
+    return IMAGE_CACHE_DIR / (hashlib.sha1(url.encode("utf-8")).hexdigest() + suffix)
+
+
+def resolve_image(src: Optional[str]) -> Optional[str]:
+    """مسار الصورة للعرض دون انتظار الشبكة
+
+    الصورة المحلية ترجع كما هي، والبعيدة ترجع من الذاكرة إن نزلت سابقاً وإلا None
+    """
+    if not src:
+        return None
+    if not _is_remote(src):
+        return src
+    path = _cache_path(src)
+    return str(path) if path.is_file() else None
+
+
+def fetch_image(url: str) -> Optional[str]:
+    """تنزيل صورة بعيدة إلى الذاكرة، تستدعى على خيط الملفات وليس خيط الواجهة"""
+    path = _cache_path(url)
+    if path.is_file():
+        return str(path)
+
+    IMAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".part")
+    try:
+        with urllib.request.urlopen(url, timeout=IMAGE_FETCH_TIMEOUT) as response, open(tmp_path, "wb") as f:
+            f.write(response.read())
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.warning(f"تعذر تنزيل الصورة {url}: {e}")
+        tmp_path.unlink(missing_ok=True)
+        return None
+    return str(path)
+
+
+def prefetch_images(sources: Iterable[str]) -> int:
+    """تنزيل الصور البعيدة غير الموجودة في الذاكرة، وإرجاع عدد ما نزل منها"""
+    fetched = 0
+    for src in set(sources):
+        if src and _is_remote(src) and resolve_image(src) is None:
+            fetched += fetch_image(src) is not None
+    return fetched
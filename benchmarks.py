@@ -0,0 +1,319 @@
+"""قياس أداء مسارات البيانات الساخنة على أساطيل صناعية بأحجام مختلفة
+
+لكل حجم (عدد سيارات) تنشأ قاعدة بيانات مؤقتة بسنوات من القراءات لكل سيارة، ثم يقاس:
+فتح قاعدة البيانات (init_db)، بدء التشغيل كاملاً، load_oil_types، صفحات السجل، التصدير،
+وحفظ القراءات (حفظ لكل عملية وعبر كاتب الدفعات). النتائج JSON لمقارنتها بين الإصدارات
+
+أمثلة:
+    python benchmarks.py --sizes 10,1000 --output bench.json
+    python benchmarks.py --output new.json --compare bench.json
+    python benchmarks.py --sizes 100000 --years 3 --only history,export
+"""
+import argparse
+import datetime
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import exporter
+import summary
+from catalog import OilCatalog
+from migrations import DEFAULT_OIL_TYPES
+from repository import Repository
+from writer import GroupCommitWriter
+
+DEFAULT_SIZES = (10, 1000, 100000)
+DEFAULT_YEARS = 2
+
+# متوسط المدة بين قراءتين لنفس السيارة (يوم)
+READING_INTERVAL_DAYS = 30
+
+# عدد مرات تكرار كل قياس، والتصدير أثقل فيكرر أقل
+ROUNDS = 5
+HEAVY_ROUNDS = 2
+
+# عدد القراءات المحفوظة في كل جولة من قياس الحفظ
+SAVE_OPS = 100
+
+# قاعدة البيانات المولدة مؤقتة، فتكتب دون سجل ولا مزامنة مع القرص وبذاكرة مؤقتة كبيرة
+GENERATE_PRAGMAS = {
+    "journal_mode": "OFF",
+    "synchronous": "OFF",
+    "cache_size": -256 * 1024,
+}
+
+VEHICLE_TYPE = "سيارة خاصة"
+SEED = 2024
+
+
+def _readings(rng: random.Random, vehicle_id: int, oil_type: str, start: datetime.datetime, days: int):
+    """قراءات سيارة واحدة: (صفوف oil_changes, صفوف oil_readings, العداد الأخير)"""
+    odometer = rng.randint(0, 100_000)
+    daily_km = rng.uniform(20, 150)
+    changes, readings = [], [(vehicle_id, int(start.timestamp()), odometer, oil_type)]
+    day = 0.0
+    while True:
+        day += rng.uniform(0.5, 1.5) * READING_INTERVAL_DAYS
+        if day >= days:
+            break
+        at = start + datetime.timedelta(days=day, seconds=vehicle_id)
+        distance = max(1, int(daily_km * READING_INTERVAL_DAYS * rng.uniform(0.7, 1.3)))
+        odometer += distance
+        changes.append((vehicle_id, oil_type, at.isoformat(timespec="seconds"), distance, VEHICLE_TYPE))
+        readings.append((vehicle_id, int(at.timestamp()), odometer, oil_type))
+    return changes, readings, odometer
+
+
+def generate_fleet(path: Path, vehicles: int, years: int, seed: int = SEED) -> dict:
+    """إنشاء قاعدة بيانات بأسطول صناعي، وإرجاع عدد الصفوف"""
+    rng = random.Random(seed)
+    oil_names = list(DEFAULT_OIL_TYPES)
+    days = 365 * years
+    start = datetime.datetime.now().replace(microsecond=0) - datetime.timedelta(days=days)
+
+    repo = Repository(path, pragmas=GENERATE_PRAGMAS)
+    repo.migrate()
+    repo.save_oil_types(DEFAULT_OIL_TYPES)
+    counts = {"vehicles": vehicles, "oil_changes": 0, "oil_readings": 0}
+    with repo.transaction() as conn:
+        for first in range(1, vehicles + 1, 1000):
+            vehicle_rows, state_rows, change_rows, reading_rows = [], [], [], []
+            for vehicle_id in range(first, min(first + 1000, vehicles + 1)):
+                oil_type = oil_names[vehicle_id % len(oil_names)]
+                changes, readings, odometer = _readings(rng, vehicle_id, oil_type, start, days)
+                max_distance = DEFAULT_OIL_TYPES[oil_type]["max_distance"]
+                remaining = rng.randint(0, max_distance)
+                vehicle_rows.append((vehicle_id, f"مركبة {vehicle_id}", rng.randint(2005, 2024), odometer,
+                                     start.isoformat(), odometer + remaining))
+                state_rows.append((vehicle_id, oil_type, odometer - (max_distance - remaining), remaining,
+                                   start.isoformat()))
+                change_rows.extend(changes)
+                reading_rows.extend(readings)
+            conn.executemany("""INSERT INTO vehicles (id, car_type, manufacture_year, current_mileage,
+                                                      last_oil_change_date, next_oil_change_mileage)
+                                VALUES (?, ?, ?, ?, ?, ?)""", vehicle_rows)
+            conn.executemany("""INSERT INTO vehicle_oil_state
+                                (vehicle_id, oil_type, last_change_km, remaining_distance, updated_at)
+                                VALUES (?, ?, ?, ?, ?)""", state_rows)
+            conn.executemany("""INSERT INTO oil_changes
+                                (vehicle_id, oil_type, change_date, kilometer_reading, vehicle_type)
+                                VALUES (?, ?, ?, ?, ?)""", change_rows)
+            conn.executemany("""INSERT INTO oil_readings (vehicle_id, reading_date, reading_km, oil_type)
+                                VALUES (?, ?, ?, ?)""", reading_rows)
+            counts["oil_changes"] += len(change_rows)
+            counts["oil_readings"] += len(reading_rows)
+        summary.rebuild(conn)
+    repo.query_one("PRAGMA optimize")
+    repo.close()
+    return counts
+
+
+def _measure(fn, rounds: int, ops: int = 1) -> dict:
+    """زمن العملية الواحدة بالمللي ثانية عبر الجولات"""
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000 / ops)
+    return {
+        "rounds": rounds,
+        "ops": ops,
+        "min_ms": round(min(samples), 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+class FleetBenchmarks:
+    def __init__(self, path: Path, rounds: int = ROUNDS, heavy_rounds: int = HEAVY_ROUNDS):
+        self.path = path
+        self.rounds = rounds
+        self.heavy_rounds = heavy_rounds
+        self.repo = Repository(path)
+        self.repo.migrate()
+        self._odometers = dict(self.repo.query("SELECT id, current_mileage FROM vehicles"))
+        self._oil_types = dict(self.repo.query("SELECT vehicle_id, oil_type FROM vehicle_oil_state"))
+        self._vehicle_ids = sorted(self._odometers)
+
+    def close(self):
+        self.repo.close()
+
+    def init_db(self) -> dict:
+        def run():
+            repo = Repository(self.path)
+            repo.migrate()
+            repo.close()
+        return _measure(run, self.rounds)
+
+    def startup(self) -> dict:
+        # ما تفعله load_startup_data في main.py على اتصال جديد وكتالوج فارغ
+        def run():
+            repo = Repository(self.path)
+            repo.migrate()
+            OilCatalog(repo).snapshot()
+            repo.load_vehicle_states()
+            repo.list_vehicles()
+            repo.close()
+        return _measure(run, self.rounds)
+
+    def load_oil_types(self) -> dict:
+        return _measure(self.repo.load_oil_types, self.rounds)
+
+    def history(self) -> dict:
+        return _measure(self.repo.history_page, self.rounds)
+
+    def history_scroll(self) -> dict:
+        # عشر صفحات متتالية كما يطلبها التمرير في نافذة السجل
+        def run():
+            cursor = None
+            for _ in range(10):
+                _, cursor = self.repo.history_page(after=cursor)
+                if cursor is None:
+                    break
+        return _measure(run, self.rounds, ops=10)
+
+    def history_filtered(self) -> dict:
+        oil_type = next(iter(DEFAULT_OIL_TYPES))
+        return _measure(lambda: self.repo.history_page(oil_type=oil_type), self.rounds)
+
+    def export(self) -> dict:
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "export.ndjson.gz"
+            return _measure(lambda: exporter.export_data(output, repo=self.repo), self.heavy_rounds)
+
+    def _save(self, submit):
+        rng = random.Random(SEED)
+
+        def run():
+            for _ in range(SAVE_OPS):
+                vehicle_id = rng.choice(self._vehicle_ids)
+                self._odometers[vehicle_id] += rng.randint(5, 300)
+                submit(vehicle_id, self._oil_types.get(vehicle_id), self._odometers[vehicle_id])
+        return run
+
+    def save_reading(self) -> dict:
+        # كل قراءة في معاملة وحفظ مستقلين
+        def submit(vehicle_id, oil_type, odometer):
+            self.repo.record_odometer(vehicle_id, oil_type, odometer, VEHICLE_TYPE)
+        return _measure(self._save(submit), self.rounds, ops=SAVE_OPS)
+
+    def save_reading_group(self) -> dict:
+        # نفس القراءات عبر كاتب الدفعات، وتنتهي الجولة بعد حفظ آخر دفعة
+        writer = GroupCommitWriter(self.repo)
+        futures = []
+
+        def submit(vehicle_id, oil_type, odometer):
+            futures.append(writer.submit(self.repo.record_odometer, vehicle_id, oil_type, odometer, VEHICLE_TYPE))
+
+        def run():
+            self._save(submit)()
+            for future in futures:
+                future.result()
+            futures.clear()
+        try:
+            return _measure(run, self.rounds, ops=SAVE_OPS)
+        finally:
+            writer.close()
+
+
+# ترتيب التنفيذ: القراءة أولاً ثم الحفظ الذي يغير قاعدة البيانات
+BENCHMARKS = ("init_db", "startup", "load_oil_types", "history", "history_scroll",
+              "history_filtered", "export", "save_reading", "save_reading_group")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run(sizes=DEFAULT_SIZES, years: int = DEFAULT_YEARS, only=None,
+        rounds: int = ROUNDS, heavy_rounds: int = HEAVY_ROUNDS, log=None) -> dict:
+    names = [name for name in BENCHMARKS if not only or name in only]
+    results = {
+        "time": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "years": years,
+        "sizes": {},
+    }
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "bench.db"
+            started = time.perf_counter()
+            counts = generate_fleet(path, size, years)
+            if log:
+                log(f"{size} سيارة: {counts['oil_changes']} قراءة في {time.perf_counter() - started:.1f} ث")
+            bench = FleetBenchmarks(path, rounds, heavy_rounds)
+            try:
+                timings = {}
+                for name in names:
+                    timings[name] = getattr(bench, name)()
+                    if log:
+                        log(f"  {name}: {timings[name]['median_ms']} ms")
+            finally:
+                bench.close()
+            results["sizes"][str(size)] = {"rows": counts, "benchmarks": timings}
+    return results
+
+
+def compare(old: dict, new: dict) -> list:
+    """(الحجم, القياس, الوسيط القديم, الجديد, نسبة التغير %) لكل قياس موجود في النتيجتين"""
+    rows = []
+    for size, data in new["sizes"].items():
+        old_timings = old.get("sizes", {}).get(size, {}).get("benchmarks", {})
+        for name, timing in data["benchmarks"].items():
+            if name in old_timings and old_timings[name]["median_ms"]:
+                before, after = old_timings[name]["median_ms"], timing["median_ms"]
+                rows.append((size, name, before, after, round((after - before) / before * 100, 1)))
+    return rows
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="alka-bench", description="ALKA Oil Tracker benchmarks")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="أعداد السيارات مفصولة بفاصلة")
+    parser.add_argument("--years", type=int, default=DEFAULT_YEARS, help="سنوات القراءات لكل سيارة")
+    parser.add_argument("--only", help="أسماء القياسات مفصولة بفاصلة")
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    parser.add_argument("--heavy-rounds", type=int, default=HEAVY_ROUNDS, help="جولات التصدير")
+    parser.add_argument("--output", type=Path, help="ملف JSON للنتائج")
+    parser.add_argument("--compare", type=Path, help="نتائج سابقة للمقارنة")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    only = set(args.only.split(",")) if args.only else None
+    if only and only - set(BENCHMARKS):
+        print(f"قياسات غير معروفة: {', '.join(sorted(only - set(BENCHMARKS)))}", file=sys.stderr)
+        return 2
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = run(sizes, args.years, only, args.rounds, args.heavy_rounds,
+                  log=lambda line: print(line, file=sys.stderr))
+    if args.output:
+        args.output.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+    else:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+
+    if args.compare:
+        old = json.loads(args.compare.read_text(encoding="utf-8"))
+        for size, name, before, after, change in compare(old, results):
+            print(f"{size:>7} {name:<20} {before:>10.3f} -> {after:>10.3f} ms  {change:+.1f}%", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,125 @@
+"""كتالوج أنواع الزيوت المشترك بين كل الجلسات في العملية
+
+نسخة واحدة في الذاكرة بمفتاح الاسم، كل تعديل يكتب في قاعدة البيانات أولاً ثم يحدث النسخة
+ويرفع رقم الإصدار. الجلسات تقارن الإصدار الذي عرضته بالحالي، وتصلها رسالة عبر Flet pubsub
+على الموضوع CATALOG_TOPIC عند كل تغيير، فالكتالوج الذي لم يتغير لا يكلف أي استعلام
+"""
+import functools
+import threading
+from typing import Optional
+
+from migrations import DEFAULT_OIL_TYPES
+from repository import Repository, get_repository
+
+# موضوع رسائل pubsub، والرسالة هي رقم الإصدار الجديد
+CATALOG_TOPIC = "oil_catalog"
+
+
+class OilCatalog:
+    def __init__(self, repo: Optional[Repository] = None):
+        self._repo = repo
+        self._lock = threading.RLock()
+        self._types: Optional[dict] = None
+        self._version = 0
+
+    @property
+    def repo(self) -> Repository:
+        return self._repo or get_repository()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def load(self) -> dict:
+        """كل الأنواع (نسخة)، تقرأ من قاعدة البيانات مرة واحدة فقط"""
+        return self.snapshot()[1]
+
+    def snapshot(self) -> tuple:
+        """(الإصدار, نسخة من الأنواع) معاً حتى لا يختلط إصدار بمحتوى غيره
+
+        القراءة من قاعدة البيانات خارج قفل الكتالوج: تحديث النسخة بعد الحفظ يأخذ قفل المستودع
+        ثم قفل الكتالوج دائماً، والعكس هنا يسبب تعليقاً مع كاتب الدفعات
+        """
+        while True:
+            with self._lock:
+                if self._types is not None:
+                    return self._version, {name: dict(data) for name, data in self._types.items()}
+                version = self._version
+            types = self.repo.load_oil_types()
+            if not types:
+                # قاعدة بيانات فارغة: تضاف القيم الافتراضية
+                self.repo.save_oil_types(DEFAULT_OIL_TYPES)
+                types = self.repo.load_oil_types()
+            if self.repo.in_transaction():
+                # ما قرئ داخل معاملة لم تحفظ قد يلغى، فلا يخزن في النسخة المشتركة
+                return version, types
+            with self._lock:
+                # كتابة أو إسقاط أثناء القراءة يعني أن ما قرئ قديم، فتعاد القراءة
+                if self._types is None and self._version == version:
+                    self._types = types
+                    self._version += 1
+
+    def get(self, name: str) -> Optional[dict]:
+        data = self.load().get(name)
+        return dict(data) if data else None
+
+    def invalidate(self):
+        """إسقاط النسخة بعد تعديل من خارج الكتالوج (مثل الاستيراد)، وتقرأ من جديد عند الطلب"""
+        with self._lock:
+            self._types = None
+            self._version += 1
+
+    # الكتابة: قاعدة البيانات أولاً، والنسخة تتغير بعد حفظ المعاملة فقط، فالمعاملة الملغاة
+    # (أو دفعة كاتب لم تحفظ) لا تترك في النسخة ما لم يحفظ
+    def add(self, name: str, max_distance: float, capacity: float, grade: str, image: str = ""):
+        with self.repo.transaction():
+            self.repo.add_oil_type(name, max_distance, capacity, grade, image)
+            self._update_after_commit(name, {
+                "max_distance": max_distance,
+                "remaining_distance": max_distance,
+                "image": image,
+                "liter_capacity": capacity,
+                "grade": grade,
+            })
+
+    def reset(self, name: str) -> float:
+        """تصفير عداد نوع الزيت إلى مسافته القصوى وإرجاعها"""
+        with self.repo.transaction():
+            max_distance = self.get(name)["max_distance"]
+            self.repo.set_remaining_distance(name, max_distance)
+            self._update_after_commit(name, {"remaining_distance": max_distance})
+            return max_distance
+
+    def record_reading(self, name: str, km_reading: float, vehicle_type: str,
+                       reading_at: Optional[str] = None) -> tuple:
+        """تسجيل قراءة بلا سيارة على نوع الزيت، ترجع ما ترجعه Repository.record_reading"""
+        with self.repo.transaction():
+            remaining, inserted = self.repo.record_reading(name, km_reading, vehicle_type, reading_at)
+            if inserted:
+                self._update_after_commit(name, {"remaining_distance": remaining})
+            return remaining, inserted
+
+    def _update_after_commit(self, name: str, fields: dict):
+        self.repo.after_commit(functools.partial(self._update, name, fields))
+
+    def _update(self, name: str, fields: dict):
+        # تنفذ داخل قفل المستودع بعد الحفظ، فالترتيب قفل المستودع ثم قفل الكتالوج كما في الكتابة
+        with self._lock:
+            if self._types is not None:
+                self._types.setdefault(name, {}).update(fields)
+            # النسخة غير المحملة تقرأ من قاعدة البيانات المحفوظة عند الطلب
+            self._version += 1
+
+
+_catalog: Optional[OilCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> OilCatalog:
+    """الكتالوج المشترك، ينشأ عند أول استخدام"""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = OilCatalog()
+    return _catalog
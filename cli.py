@@ -0,0 +1,180 @@
+"""واجهة سطر الأوامر لـ ALKA Oil Tracker، تعمل دون تحميل Flet أو بناء الواجهة
+
+أمثلة:
+    python cli.py add-reading --vehicle-id 3 --km 120
+    python cli.py add-reading --vehicle-id 3 --odometer 48250
+    python cli.py list-due --threshold 500
+    python cli.py odometer-flags
+    python cli.py archive-readings --keep-months 12
+    python cli.py export --format csv
+    python cli.py import alka_backup_20240101_120000.ndjson.gz
+    python cli.py stats --json
+"""
+import argparse
+import json
+import sys
+
+from fleet import OIL_ALERT_THRESHOLD
+from repository import get_repository
+
+
+def _batch_size(args) -> dict:
+    # الوحدات الثقيلة تحمّل داخل الأوامر، فيترك حجم الدفعة الافتراضي لها
+    return {"batch_size": args.batch_size} if args.batch_size else {}
+
+
+def _print(args, data, lines):
+    if args.json:
+        print(json.dumps(data, ensure_ascii=False, default=str))
+    else:
+        for line in lines:
+            print(line)
+
+
+def cmd_add_reading(args) -> int:
+    from ingest import ingest_readings
+
+    summary = ingest_readings([{
+        "vehicle_id": args.vehicle_id,
+        "oil_type": args.oil_type,
+        "km": args.km,
+        "odometer": args.odometer,
+        "timestamp": args.timestamp,
+        "vehicle_type": args.vehicle_type,
+    }], threshold=args.threshold)
+    if summary["rejected"]:
+        _print(args, summary, [f"خطأ: السيارة {args.vehicle_id} غير موجودة، لم تسجل القراءة"])
+        return 1
+    _print(args, summary,
+           [f"تم تسجيل {summary['inserted'] or summary['odometer']} قراءة"] +
+           [f"تنبيه: متبقي {int(alert['remaining_distance'])} كم "
+            f"({alert.get('vehicle_id') or alert.get('oil_type')})" for alert in summary["alerts"]])
+    return 0
+
+
+def cmd_ingest(args) -> int:
+    from pathlib import Path
+    from ingest import ingest_folder, ingest_readings, read_readings_csv
+
+    path = Path(args.path)
+    if path.is_dir():
+        summary = ingest_folder(path, **_batch_size(args))
+    else:
+        summary = ingest_readings(read_readings_csv(path), **_batch_size(args))
+    _print(args, summary, [f"تم إدخال {summary['inserted']} من {summary['readings']} قراءة، "
+                           f"ورفض {summary['rejected']} لسيارات غير موجودة، {len(summary['alerts'])} تنبيه"])
+    return 0
+
+
+def cmd_list_due(args) -> int:
+    repo = get_repository()
+    vehicles = [{"vehicle_id": row[0], "car_type": row[1], "oil_type": row[2], "remaining_distance": row[3]}
+                for row in repo.due_vehicles(args.threshold)]
+    _print(args, vehicles,
+           [f"{v['vehicle_id']}\t{v['car_type']}\t{v['oil_type'] or '-'}\t{int(v['remaining_distance'])} كم"
+            for v in vehicles])
+    return 0
+
+
+def cmd_odometer_flags(args) -> int:
+    readings = [{"id": row[0], "vehicle_id": row[1], "reading_date": row[2], "reading_km": row[3],
+                 "previous_km": row[4], "flag": row[5]}
+                for row in get_repository().flagged_readings()]
+    _print(args, readings,
+           [f"{r['vehicle_id']}\t{r['reading_date']}\t{int(r['reading_km'])} كم\t{r['flag']}" for r in readings])
+    return 0
+
+
+def cmd_archive_readings(args) -> int:
+    moved = get_repository().archive_oil_readings(args.keep_months)
+    _print(args, moved, [f"{table}: {count}" for table, count in moved.items()] or ["لا توجد قراءات للأرشفة"])
+    return 0
+
+
+def cmd_export(args) -> int:
+    from exporter import export_data
+
+    # عند تحديد ملف الإخراج يحدد امتداده الضغط
+    compress = not args.no_gzip and (args.output is None or args.output.endswith(".gz"))
+    path = export_data(path=args.output, fmt=args.format, compress=compress, **_batch_size(args))
+    _print(args, {"path": str(path)}, [str(path)])
+    return 0
+
+
+def cmd_import(args) -> int:
+    from importer import import_data
+
+    summary = import_data(args.path, **_batch_size(args))
+    _print(args, summary, [f"{table}: {counts['inserted']} مضاف من {counts['read']}"
+                           + (f"، {counts['rejected']} مرفوض" if counts["rejected"] else "")
+                           for table, counts in summary.items()])
+    return 0
+
+
+def cmd_stats(args) -> int:
+    stats = get_repository().stats()
+    _print(args, stats, [f"{key}: {value}" for key, value in stats.items()])
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="alka", description="ALKA Oil Tracker CLI")
+    parser.add_argument("--json", action="store_true", help="إخراج النتائج بصيغة JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add_reading = commands.add_parser("add-reading", help="تسجيل قراءة عداد")
+    add_reading.add_argument("--vehicle-id", type=int)
+    add_reading.add_argument("--oil-type")
+    distance = add_reading.add_mutually_exclusive_group(required=True)
+    distance.add_argument("--km", type=float, help="المسافة المقطوعة (كم)")
+    distance.add_argument("--odometer", type=float, help="قراءة العداد المطلقة للسيارة (كم)")
+    add_reading.add_argument("--timestamp", help="وقت القراءة بصيغة ISO، الافتراضي الآن")
+    add_reading.add_argument("--vehicle-type")
+    add_reading.add_argument("--threshold", type=float, default=OIL_ALERT_THRESHOLD)
+    add_reading.set_defaults(handler=cmd_add_reading)
+
+    ingest = commands.add_parser("ingest", help="إدخال قراءات من ملف CSV أو مجلد استقبال")
+    ingest.add_argument("path")
+    ingest.add_argument("--batch-size", type=int)
+    ingest.set_defaults(handler=cmd_ingest)
+
+    list_due = commands.add_parser("list-due", help="السيارات التي اقترب موعد تغيير زيتها")
+    list_due.add_argument("--threshold", type=float, default=OIL_ALERT_THRESHOLD)
+    list_due.set_defaults(handler=cmd_list_due)
+
+    odometer_flags = commands.add_parser("odometer-flags", help="قراءات العداد المتراجعة أو المتأخرة")
+    odometer_flags.set_defaults(handler=cmd_odometer_flags)
+
+    archive = commands.add_parser("archive-readings", help="نقل قراءات العداد القديمة لجداول أرشيف شهرية")
+    archive.add_argument("--keep-months", type=int, default=12)
+    archive.set_defaults(handler=cmd_archive_readings)
+
+    export = commands.add_parser("export", help="تصدير البيانات")
+    export.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    export.add_argument("--no-gzip", action="store_true")
+    export.add_argument("--output")
+    export.add_argument("--batch-size", type=int)
+    export.set_defaults(handler=cmd_export)
+
+    import_ = commands.add_parser("import", help="استيراد نسخة احتياطية أو ملف CSV")
+    import_.add_argument("path")
+    import_.add_argument("--batch-size", type=int)
+    import_.set_defaults(handler=cmd_import)
+
+    stats = commands.add_parser("stats", help="إحصائيات قاعدة البيانات")
+    stats.set_defaults(handler=cmd_stats)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except (ValueError, OSError) as e:
+        print(f"خطأ: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
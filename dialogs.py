@@ -0,0 +1,81 @@
+"""إدارة الحوارات والرسائل المنبثقة: كل حوار يبنى مرة واحدة ويعاد استخدامه، والمغلق يزال من overlay"""
+import weakref
+from typing import Callable, Optional
+
+from flet import AlertDialog, BottomSheet, Colors, SnackBar, Text
+
+import perf
+
+# مدير واحد لكل صفحة، حتى تصل إليه الدوال التي تستقبل page فقط
+_managers = weakref.WeakKeyDictionary()
+
+
+class DialogManager:
+    """حوارات الصفحة بمفاتيح ثابتة
+
+    get(key, build) تبني الحوار عند أول طلب فقط، والاستدعاءات التالية تعيد نفس الحوار
+    ليملأ ببيانات جديدة. open تزيل أولاً الحوارات المغلقة من overlay حتى لا يكبر
+    مع طول الجلسة، والرسائل المنبثقة تستخدم SnackBar واحداً دون مسح overlay
+    """
+
+    def __init__(self, page, render=None):
+        self.page = page
+        self.render = render
+        self._dialogs = {}
+        self._snackbar: Optional[SnackBar] = None
+        _managers[page] = self
+
+    def get(self, key: str, build: Callable[[], AlertDialog]) -> AlertDialog:
+        dialog = self._dialogs.get(key)
+        if dialog is None:
+            with perf.measure(f"dialog:{key}"):
+                dialog = self._dialogs[key] = build()
+        return dialog
+
+    def open(self, dialog):
+        self.prune()
+        if dialog not in self.page.overlay:
+            self.page.overlay.append(dialog)
+        dialog.open = True
+        self._update()
+
+    def close(self, dialog):
+        # يغلق أولاً ثم يزال عند فتح الحوار التالي، بعد انتهاء حركة الإغلاق
+        dialog.open = False
+        self._update(dialog)
+
+    def prune(self) -> int:
+        """إزالة الحوارات المغلقة من overlay، وإرجاع عدد ما أزيل"""
+        overlay = self.page.overlay
+        closed = [control for control in overlay
+                  if isinstance(control, (AlertDialog, BottomSheet)) and not control.open]
+        for control in closed:
+            overlay.remove(control)
+        return len(closed)
+
+    def snackbar(self, message: str, color=None):
+        snack = self._snackbar
+        if snack is None:
+            snack = self._snackbar = SnackBar(
+                content=Text(message, color=Colors.WHITE),
+                duration=3000,  # 3 ثواني
+                action="حسناً",
+                action_color=Colors.WHITE,
+            )
+        if snack not in self.page.overlay:
+            self.page.overlay.append(snack)
+        snack.content.value = message
+        snack.bgcolor = color
+        snack.open = True
+        self._update()
+
+    def _update(self, *controls):
+        if self.render:
+            self.render.update(*controls)
+        else:
+            self.page.update(*controls)
+
+
+def dialogs_for(page) -> DialogManager:
+    """مدير حوارات الصفحة، ينشأ عند أول طلب إذا لم ينشئه main"""
+    return _managers.get(page) or DialogManager(page)
@@ -0,0 +1,98 @@
+"""تصدير البيانات على دفعات دون تحميل الجداول كاملة في الذاكرة"""
+import csv
+import datetime
+import gzip
+import io
+import json
+from pathlib import Path
+from typing import Callable, Optional
+
+from repository import Repository, data_dir, get_repository
+
+# الجداول المصدّرة وأعمدتها، معرّف السيارة يصدّر فقط لربط السجلات بها
+# ويعاد ترقيمه عند الاستيراد
+EXPORT_TABLES = {
+    "oil_types": ("name", "max_distance", "remaining_distance", "image", "liter_capacity", "grade"),
+    "vehicles": ("id", "car_type", "manufacture_year", "current_mileage",
+                 "last_oil_change_date", "next_oil_change_mileage"),
+    "wheels": ("wheel_type", "install_date", "expected_life"),
+    "oil_changes": ("oil_type", "change_date", "kilometer_reading", "vehicle_type", "vehicle_id"),
+}
+
+# ملف CSV يحمل جدولاً واحداً، وهو سجل التغييرات
+CSV_TABLE = "oil_changes"
+
+# لا سيارات في ملف CSV، فكل سجل يحمل نوع سيارته وسنة صنعها ليربط بها عند الاستيراد
+CSV_VEHICLE_COLUMNS = ("car_type", "manufacture_year")
+CSV_COLUMNS = EXPORT_TABLES[CSV_TABLE] + CSV_VEHICLE_COLUMNS
+
+_CSV_SQL = f"""SELECT {', '.join(f'c.{column}' for column in EXPORT_TABLES[CSV_TABLE])},
+                      {', '.join(f'v.{column}' for column in CSV_VEHICLE_COLUMNS)}
+               FROM oil_changes c
+               LEFT JOIN vehicles v ON v.id = c.vehicle_id
+               ORDER BY c.rowid"""
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+# عدد الصفوف التي تقرأ من قاعدة البيانات في كل دفعة
+EXPORT_BATCH_SIZE = 1000
+
+
+def default_export_path(fmt: str = "ndjson", compress: bool = True) -> Path:
+    suffix = f".{fmt}.gz" if compress else f".{fmt}"
+    return data_dir / f"alka_backup_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}{suffix}"
+
+
+def _open_output(path: Path, compress: bool):
+    if compress:
+        return io.TextIOWrapper(gzip.open(path, "wb"), encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def export_data(path: Optional[Path] = None, fmt: str = "ndjson", compress: bool = True,
+                batch_size: int = EXPORT_BATCH_SIZE,
+                progress: Optional[Callable[[int, int], None]] = None,
+                repo: Optional[Repository] = None) -> Path:
+    """تصدير البيانات إلى ملف NDJSON أو CSV مع ضغط gzip اختياري
+
+    تستدعى progress(المصدّر, الإجمالي) بعد كل دفعة
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"صيغة تصدير غير مدعومة: {fmt}")
+
+    repo = repo or get_repository()
+    path = Path(path) if path else default_export_path(fmt, compress)
+    tables = EXPORT_TABLES if fmt == "ndjson" else {CSV_TABLE: EXPORT_TABLES[CSV_TABLE]}
+
+    with repo.snapshot() as conn:
+        # الإجمالي لحساب نسبة التقدم، من نفس اللقطة المقروءة
+        total = sum(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables)
+        done = 0
+
+        with _open_output(path, compress) as f:
+            writer = None
+            if fmt == "csv":
+                writer = csv.writer(f)
+                writer.writerow(CSV_COLUMNS)
+
+            for table, columns in tables.items():
+                sql = _CSV_SQL if writer else f"SELECT {', '.join(columns)} FROM {table} ORDER BY rowid"
+                cursor = conn.execute(sql)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+
+                    if writer:
+                        writer.writerows(rows)
+                    else:
+                        f.writelines(
+                            json.dumps({"table": table, **dict(zip(columns, row))}, ensure_ascii=False) + "\n"
+                            for row in rows
+                        )
+
+                    done += len(rows)
+                    if progress:
+                        progress(done, total)
+
+    return path
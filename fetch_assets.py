@@ -0,0 +1,62 @@
+"""تنزيل الخطوط وشعار التطبيق في مجلد assets قبل بناء التطبيق، على جهاز المطور وفي خطوة البناء
+
+    python fetch_assets.py
+
+يرجع 1 إذا بقي أي ملف ناقصاً أو نائباً بعد التنزيل، فيتوقف البناء بدل تغليف التطبيق بدونه
+"""
+import sys
+import urllib.request
+from pathlib import Path
+
+from assets_cache import APP_ICON, ASSETS_DIR, FONTS
+
+# مصدر كل خط، خط Cairo المتغير يغطي الأوزان 200-1000
+FONT_SOURCES = {
+    "Cairo": "https://github.com/google/fonts/raw/main/ofl/cairo/Cairo%5Bslnt%2Cwght%5D.ttf",
+}
+
+# شعار التطبيق الذي كانت الواجهة تحمله من الشبكة عند كل تشغيل
+APP_ICON_SOURCE = "https://cdn-icons-png.flaticon.com/512/3202/3202926.png"
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _present(path: Path) -> bool:
+    # الأيقونات في المستودع ملفات نائبة من بايت واحد، فالصورة تعتبر موجودة إذا كانت PNG فعلاً
+    if not path.is_file():
+        return False
+    if path.suffix.lower() == ".png":
+        with open(path, "rb") as f:
+            return f.read(len(_PNG_SIGNATURE)) == _PNG_SIGNATURE
+    return path.stat().st_size > 0
+
+
+def main() -> int:
+    downloads = [(family, relative_path, FONT_SOURCES[family]) for family, relative_path in FONTS.items()]
+    downloads.append(("app_icon", APP_ICON, APP_ICON_SOURCE))
+
+    failed = 0
+    for name, relative_path, url in downloads:
+        path = ASSETS_DIR / relative_path
+        if _present(path):
+            print(f"{name}: موجود ({relative_path})")
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # التنزيل لملف مؤقت، فالتنزيل الفاشل لا يحذف الملف النائب ولا يترك ملفاً ناقصاً
+        partial = path.with_name(f"{path.stem}.part{path.suffix}")
+        try:
+            urllib.request.urlretrieve(url, partial)
+            # صفحة خطأ بدل الصورة لا تستبدل الملف النائب
+            if not _present(partial):
+                raise OSError(f"الملف المنزل ليس {path.suffix}")
+            partial.replace(path)
+            print(f"{name}: تم التنزيل ({relative_path})")
+        except OSError as e:
+            failed += 1
+            partial.unlink(missing_ok=True)
+            print(f"{name}: فشل التنزيل: {e}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""حالة الزيت لكل سيارة في الأسطول، محفوظة في الذاكرة بمفتاح رقم السيارة"""
+import threading
+from typing import Optional
+
+# المسافة الافتراضية حتى التغيير القادم إذا لم يحدد نوع الزيت
+DEFAULT_OIL_INTERVAL = 5000
+
+# حد التنبيه بتغيير الزيت (كم)
+OIL_ALERT_THRESHOLD = 500
+
+
+class FleetState:
+    """نسخة في الذاكرة من جدول vehicle_oil_state، كل قراءة تعدل سيارة واحدة فقط"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = {}
+
+    def load(self, states: dict):
+        with self._lock:
+            self._states = states
+
+    def get(self, vehicle_id: int) -> Optional[dict]:
+        return self._states.get(vehicle_id)
+
+    def __contains__(self, vehicle_id: int) -> bool:
+        return vehicle_id in self._states
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def snapshot(self) -> dict:
+        """نسخة من حالات كل السيارات يمكن حفظها أو إرسالها لخيط آخر"""
+        with self._lock:
+            return {vehicle_id: dict(state) for vehicle_id, state in self._states.items()}
+
+    def set(self, vehicle_id: int, oil_type: Optional[str], last_change_km: int, remaining_distance: float):
+        with self._lock:
+            self._states[vehicle_id] = {
+                "oil_type": oil_type,
+                "last_change_km": last_change_km,
+                "remaining_distance": remaining_distance,
+            }
+
+    def set_remaining(self, vehicle_id: int, remaining_distance: float):
+        """تحديث المتبقي بالقيمة المحفوظة في قاعدة البيانات، بعد نجاح الحفظ فقط"""
+        with self._lock:
+            self._states[vehicle_id]["remaining_distance"] = remaining_distance
+
+    def due(self, threshold: float = OIL_ALERT_THRESHOLD) -> list:
+        """السيارات التي اقتربت من موعد تغيير الزيت"""
+        return [vehicle_id for vehicle_id, state in self._states.items()
+                if state["remaining_distance"] <= threshold]
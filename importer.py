@@ -0,0 +1,213 @@
+"""استيراد النسخ الاحتياطية على دفعات مع تجاهل السجلات المكررة"""
+import csv
+import gzip
+import io
+import json
+from operator import itemgetter
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from exporter import CSV_TABLE, CSV_VEHICLE_COLUMNS, EXPORT_TABLES
+from repository import Repository, get_repository
+
+# عدد الصفوف في كل معاملة
+IMPORT_BATCH_SIZE = 10000
+
+DEFAULT_VEHICLE_TYPE = "سيارة خاصة"
+
+# oil_types و oil_changes لهما مفتاح طبيعي مفهرس فيكفي INSERT OR IGNORE،
+# أما السيارات والإطارات فلا مفتاح لهما فيعتبر الصف مكرراً إذا تطابقت جميع أعمدته
+_INSERT_SQL = {
+    "oil_types": """INSERT OR IGNORE INTO oil_types
+                    (name, max_distance, remaining_distance, image, liter_capacity, grade)
+                    VALUES (?, ?, ?, ?, ?, ?)""",
+    "oil_changes": """INSERT OR IGNORE INTO oil_changes
+                      (oil_type, change_date, kilometer_reading, vehicle_type, vehicle_id)
+                      VALUES (?, ?, ?, ?, ?)""",
+    "vehicles": """INSERT INTO vehicles
+                   (car_type, manufacture_year, current_mileage, last_oil_change_date, next_oil_change_mileage)
+                   SELECT ?, ?, ?, ?, ?
+                   WHERE NOT EXISTS (SELECT 1 FROM vehicles
+                                     WHERE car_type IS ? AND manufacture_year IS ?
+                                       AND current_mileage IS ? AND last_oil_change_date IS ?
+                                       AND next_oil_change_mileage IS ?)""",
+    "wheels": """INSERT INTO wheels
+                 (wheel_type, install_date, expected_life)
+                 SELECT ?, ?, ?
+                 WHERE NOT EXISTS (SELECT 1 FROM wheels
+                                   WHERE wheel_type IS ? AND install_date IS ? AND expected_life IS ?)""",
+}
+
+# سيارة تنشأ من هوية سجل CSV، وتحتفظ برقمها في المصدر إذا كان متاحاً
+_CREATE_CSV_VEHICLE_SQL = """INSERT INTO vehicles (id, car_type, manufacture_year, current_mileage)
+                             VALUES ((SELECT ? WHERE NOT EXISTS (SELECT 1 FROM vehicles WHERE id = ?)), ?, ?, 0)"""
+
+_VEHICLE_ID_SQL = """SELECT id FROM vehicles
+                     WHERE car_type IS ? AND manufacture_year IS ?
+                       AND current_mileage IS ? AND last_oil_change_date IS ?
+                       AND next_oil_change_mileage IS ?"""
+
+# الجداول التي تتكرر قيمها في شرط NOT EXISTS
+_FULL_ROW_KEY = {"wheels"}
+
+
+def _open_text(path: Path):
+    if path.suffix == ".gz":
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _detect_format(path: Path) -> str:
+    suffixes = [s.lower() for s in path.suffixes if s.lower() != ".gz"]
+    fmt = suffixes[-1].lstrip(".") if suffixes else ""
+    if fmt not in ("ndjson", "csv", "json"):
+        raise ValueError(f"صيغة ملف غير مدعومة: {path.name}")
+    return fmt
+
+
+def _normalize(table: str, row: tuple) -> tuple:
+    if table == "oil_changes":
+        # السادس هوية السيارة من ملف CSV (نوعها وسنة صنعها)، و None للصيغ التي تصدّر السيارات
+        oil_type, change_date, km_reading, vehicle_type, vehicle_id, *vehicle = row
+        return (oil_type, change_date, km_reading, vehicle_type or DEFAULT_VEHICLE_TYPE,
+                int(vehicle_id) if vehicle_id not in (None, "") else None,
+                vehicle[0] if vehicle else None)
+    return row
+
+
+def _iter_ndjson(f) -> Iterator[tuple]:
+    getters = {table: itemgetter(*columns) for table, columns in EXPORT_TABLES.items()}
+    decode = json.JSONDecoder().decode
+    for line in f:
+        if not line.strip():
+            continue
+        record = decode(line)
+        getter = getters.get(record.get("table"))
+        if getter:
+            yield record["table"], getter(record)
+
+
+def _iter_csv(f) -> Iterator[tuple]:
+    columns = EXPORT_TABLES[CSV_TABLE]
+    reader = csv.DictReader(f)
+    # ملفات CSV القديمة بلا أعمدة السيارة هويتها فارغة، فتربط بالسيارة المحلية بنفس الرقم
+    has_vehicle = set(CSV_VEHICLE_COLUMNS) <= set(reader.fieldnames or ())
+    for record in reader:
+        identity = ()
+        if has_vehicle and record["car_type"]:
+            year = record["manufacture_year"]
+            identity = (record["car_type"], int(year) if year else None)
+        yield CSV_TABLE, tuple(record.get(column) or None for column in columns) + (identity,)
+
+
+def _iter_legacy_json(f) -> Iterator[tuple]:
+    # صيغة alka_backup_*.json القديمة مستند واحد فيقرأ كاملاً،
+    # وهي ناتجة عن تصدير الإصدارات السابقة فقط
+    document = json.load(f)
+    for name, data in document.get("oil_types", {}).items():
+        yield "oil_types", (name, data.get("max_distance"), data.get("remaining_distance"),
+                            data.get("image", ""), data.get("liter_capacity"), data.get("grade"))
+    for change in document.get("changes", []):
+        # الصفوف القديمة بالترتيب: id, oil_type, change_date, kilometer_reading, vehicle_type
+        yield "oil_changes", tuple(change[1:5]) + (None,)
+
+
+_READERS = {
+    "ndjson": _iter_ndjson,
+    "csv": _iter_csv,
+    "json": _iter_legacy_json,
+}
+
+
+def import_data(path: Path, batch_size: int = IMPORT_BATCH_SIZE,
+                progress: Optional[Callable[[int], None]] = None,
+                repo: Optional[Repository] = None) -> dict:
+    """استيراد ملف NDJSON أو CSV (مضغوط أو لا) أو نسخة JSON قديمة
+
+    ترجع لكل جدول عدد الصفوف المقروءة والمضافة والمرفوضة، وتستدعى progress(المقروء) بعد كل دفعة.
+    سجل التغيير الذي يشير لسيارة ليست في الملف يرفض، فمعرّفها في المصدر لا يعني شيئاً هنا.
+    ملف CSV بلا سيارات يربط كل سجل بالسيارة المحلية بنفس الرقم والهوية، أو ينشئها
+    """
+    path = Path(path)
+    reader = _READERS[_detect_format(path)]
+    repo = repo or get_repository()
+
+    summary = {table: {"read": 0, "inserted": 0, "rejected": 0} for table in EXPORT_TABLES}
+    pending = {table: [] for table in EXPORT_TABLES}
+    pending_count = 0
+    read_total = 0
+    # معرّف السيارة في الملف -> معرّفها في قاعدة البيانات، و None لسيارة لم يعثر عليها
+    vehicle_ids = {}
+
+    def import_vehicles(conn, rows):
+        # السيارات قليلة، فتضاف صفاً صفاً لمعرفة معرّفها الجديد
+        for old_id, *values in rows:
+            cursor = conn.execute(_INSERT_SQL["vehicles"], values + values)
+            if cursor.rowcount:
+                summary["vehicles"]["inserted"] += 1
+                new_id = cursor.lastrowid
+            else:
+                new_id = conn.execute(_VEHICLE_ID_SQL, values).fetchone()[0]
+            if old_id is not None:
+                vehicle_ids[int(old_id)] = new_id
+
+    def resolve_csv_vehicle(conn, old_id: int, identity: tuple) -> Optional[int]:
+        """رقم السيارة المحلية لسجل CSV، وتنشأ السيارة إذا لم تكن موجودة"""
+        if not identity:
+            found = conn.execute("SELECT id FROM vehicles WHERE id = ?", (old_id,)).fetchone()
+            return found[0] if found else None
+        found = conn.execute("SELECT id FROM vehicles WHERE id = ? AND car_type IS ? AND manufacture_year IS ?",
+                             (old_id, *identity)).fetchone()
+        if found:
+            return found[0]
+        summary["vehicles"]["inserted"] += 1
+        return conn.execute(_CREATE_CSV_VEHICLE_SQL, (old_id, old_id, *identity)).lastrowid
+
+    def flush():
+        nonlocal pending_count
+        with repo.transaction() as conn:
+            # الأنواع والسيارات أولاً حتى تسبق السجلات التي تشير إليها
+            for table in EXPORT_TABLES:
+                rows = pending[table]
+                if not rows:
+                    continue
+                pending[table] = []
+                if table == "vehicles":
+                    import_vehicles(conn, rows)
+                    continue
+                if table == "oil_changes":
+                    for *_, old_id, identity in rows:
+                        if old_id is not None and old_id not in vehicle_ids and identity is not None:
+                            vehicle_ids[old_id] = resolve_csv_vehicle(conn, old_id, identity)
+                    linked = [row[:4] + (vehicle_ids.get(row[4]),) for row in rows
+                              if row[4] is None or vehicle_ids.get(row[4]) is not None]
+                    summary[table]["rejected"] += len(rows) - len(linked)
+                    rows = linked
+                if table in _FULL_ROW_KEY:
+                    rows = [row + row for row in rows]
+                before = conn.total_changes
+                conn.executemany(_INSERT_SQL[table], rows)
+                summary[table]["inserted"] += conn.total_changes - before
+        pending_count = 0
+        if progress:
+            progress(read_total)
+
+    with _open_text(path) as f:
+        for table, row in reader(f):
+            pending[table].append(_normalize(table, row))
+            summary[table]["read"] += 1
+            pending_count += 1
+            read_total += 1
+            if pending_count >= batch_size:
+                flush()
+
+    if pending_count:
+        flush()
+
+    if summary["vehicles"]["inserted"]:
+        repo.ensure_vehicle_states()
+    # الاستيراد يتجاوز مسار الكتابة العادي، فيعاد حساب الملخص مرة واحدة في النهاية
+    if any(counts["inserted"] for counts in summary.values()):
+        repo.rebuild_summaries()
+
+    return summary
@@ -0,0 +1,279 @@
+"""إدخال قراءات العدادات دفعة واحدة من مصادر التتبع (ملفات CSV أو مجلد استقبال)"""
+import csv
+import datetime
+import json
+import logging
+import shutil
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Optional
+
+from fleet import OIL_ALERT_THRESHOLD, FleetState
+from migrations import OIL_READING_DELTAS_SQL
+from repository import Repository, get_repository, to_epoch
+from summary import record_staged
+
+# عدد القراءات في كل معاملة
+INGEST_BATCH_SIZE = 5000
+
+DEFAULT_VEHICLE_TYPE = "سيارة خاصة"
+
+# أعمدة ملف القراءات، vehicle_id أو oil_type مطلوب على الأقل
+# والقراءة التي فيها odometer قراءة عداد مطلقة للسيارة بدلاً من مسافة km
+READING_COLUMNS = ("vehicle_id", "oil_type", "km", "timestamp", "vehicle_type", "odometer")
+
+# جدول مؤقت تجمع فيه قراءات الدفعة قبل توزيعها بعمليات على مستوى المجموعة
+_STAGING_DDL = """CREATE TEMP TABLE IF NOT EXISTS ingest_staging
+                  (vehicle_id INTEGER, oil_type TEXT, change_date TEXT,
+                   km REAL, vehicle_type TEXT)"""
+
+# فروق القراءات (عرض oil_reading_deltas) لسيارات الدفعة فقط، والتقييد داخل المصدر يقرأ من الفهرس
+_BATCH_DELTAS_SQL = OIL_READING_DELTAS_SQL.format(
+    readings="(SELECT * FROM oil_readings WHERE vehicle_id IN (SELECT value FROM json_each(?)))")
+
+
+def _normalize_reading(reading: dict) -> tuple:
+    vehicle_id = reading.get("vehicle_id")
+    oil_type = reading.get("oil_type") or None
+    if vehicle_id in (None, ""):
+        vehicle_id = None
+        if not oil_type:
+            raise ValueError("القراءة تحتاج رقم السيارة أو نوع الزيت")
+    else:
+        vehicle_id = int(vehicle_id)
+
+    km = float(reading["km"])
+    if km <= 0:
+        raise ValueError(f"قراءة غير صحيحة: {km}")
+
+    # القراءة بلا وقت تأخذ وقت إدخالها بدقة الميكروثانية حتى لا تتطابق مع غيرها
+    return (vehicle_id, oil_type, reading.get("timestamp") or datetime.datetime.now().isoformat(),
+            km, reading.get("vehicle_type") or DEFAULT_VEHICLE_TYPE)
+
+
+def _normalize_odometer(reading: dict) -> tuple:
+    if reading.get("vehicle_id") in (None, ""):
+        raise ValueError("قراءة العداد تحتاج رقم السيارة")
+    odometer = float(reading["odometer"])
+    if odometer < 0:
+        raise ValueError(f"قراءة عداد غير صحيحة: {odometer}")
+    return (int(reading["vehicle_id"]), to_epoch(reading.get("timestamp") or datetime.datetime.now().isoformat()),
+            odometer, reading.get("oil_type") or None)
+
+
+def _reject_unknown_vehicles(conn, rows: list, summary: dict) -> list:
+    """إسقاط قراءات السيارات غير المسجلة، فمفاتيح السيارات لا تفرض في SQLite"""
+    vehicle_ids = {row[0] for row in rows if row[0] is not None}
+    if not vehicle_ids:
+        return rows
+    known = {row[0] for row in conn.execute(
+        "SELECT id FROM vehicles WHERE id IN (SELECT value FROM json_each(?))", (json.dumps(sorted(vehicle_ids)),))}
+    if len(known) == len(vehicle_ids):
+        return rows
+    accepted = [row for row in rows if row[0] is None or row[0] in known]
+    summary["rejected"] += len(rows) - len(accepted)
+    logging.warning(f"تم رفض {len(rows) - len(accepted)} قراءة لسيارات غير موجودة: "
+                    f"{sorted(vehicle_ids - known)}")
+    return accepted
+
+
+def _crossed(before: float, km: float, threshold: float) -> Optional[float]:
+    after = max(0, before - km)
+    return after if before > threshold >= after else None
+
+
+def _ingest_batch(conn, rows: list, threshold: float, summary: dict) -> dict:
+    conn.execute(_STAGING_DDL)
+    conn.executemany("""INSERT INTO ingest_staging
+                        (vehicle_id, oil_type, change_date, km, vehicle_type)
+                        VALUES (?, ?, ?, ?, ?)""", rows)
+    return _apply_staged(conn, threshold, summary)
+
+
+def _reconcile_odometers(conn, threshold: float, summary: dict, vehicle_ids: set, after_id: int) -> dict:
+    """تحويل قراءات العداد المطلقة الجديدة إلى مسافات بمرور واحد على مستوى المجموعة
+
+    المخصوم لكل قراءة هو ما تجاوزت به أعلى عداد سابق (عداد السيارة أو قراءة أقدم في نفس المرور)
+    فالقراءة المتراجعة أو المتأخرة تحت هذا الحد لا تخصم شيئاً وتبقى ظاهرة بعلمها للمراجعة،
+    ورفع عداد السيارة في نفس المعاملة يمنع خصم أي قراءة مرتين. المرور يقتصر على سيارات
+    vehicle_ids، والأعلام تعد للقراءات بعد after_id فقط، فتكلفة الإدخال لا تكبر مع السجل
+    """
+    ids = json.dumps(sorted(vehicle_ids))
+    conn.execute(_STAGING_DDL)
+    conn.execute("""INSERT INTO ingest_staging (vehicle_id, oil_type, change_date, km, vehicle_type)
+                    SELECT vehicle_id, oil_type,
+                           strftime('%Y-%m-%dT%H:%M:%S', reading_date, 'unixepoch', 'localtime'),
+                           reading_km - MAX(mileage, IFNULL(previous_km, mileage)), ?
+                    FROM (SELECT r.vehicle_id, r.oil_type, r.reading_date, r.reading_km,
+                                 IFNULL(v.current_mileage, 0) AS mileage,
+                                 MAX(r.reading_km) OVER (PARTITION BY r.vehicle_id ORDER BY r.reading_date, r.id
+                                                         ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING)
+                                     AS previous_km
+                          FROM vehicles v
+                          JOIN oil_readings r ON r.vehicle_id = v.id
+                                             AND r.reading_km > IFNULL(v.current_mileage, 0)
+                          WHERE v.id IN (SELECT value FROM json_each(?)))
+                    WHERE reading_km > MAX(mileage, IFNULL(previous_km, mileage))""", (DEFAULT_VEHICLE_TYPE, ids))
+    conn.execute("""UPDATE vehicles
+                    SET current_mileage = m.km
+                    FROM (SELECT vehicle_id, MAX(reading_km) AS km FROM oil_readings
+                          WHERE vehicle_id IN (SELECT value FROM json_each(?))
+                          GROUP BY vehicle_id) AS m
+                    WHERE vehicles.id = m.vehicle_id AND m.km > IFNULL(vehicles.current_mileage, 0)""", (ids,))
+    updated = _apply_staged(conn, threshold, summary)
+    summary["flagged"] += conn.execute(f"""SELECT COUNT(*) FROM ({_BATCH_DELTAS_SQL})
+                                           WHERE id > ? AND flag IS NOT NULL""", (ids, after_id)).fetchone()[0]
+    return updated
+
+
+def _apply_staged(conn, threshold: float, summary: dict) -> dict:
+    now = datetime.datetime.now().isoformat()
+
+    # نوع الزيت للقراءات التي لم تحدده يؤخذ من حالة السيارة
+    conn.execute("""UPDATE ingest_staging
+                    SET oil_type = (SELECT oil_type FROM vehicle_oil_state s
+                                    WHERE s.vehicle_id = ingest_staging.vehicle_id)
+                    WHERE oil_type IS NULL AND vehicle_id IS NOT NULL""")
+
+    # القراءات المكررة داخل الدفعة أو المسجلة سابقاً لا تخصم مرة ثانية، وقراءة السيارة
+    # تعرف بالسيارة والوقت والمسافة فقط مثل مفتاح ux_oil_changes_idempotency
+    conn.execute("""DELETE FROM ingest_staging
+                    WHERE rowid NOT IN (SELECT MIN(rowid) FROM ingest_staging
+                                        GROUP BY change_date, km, IFNULL(vehicle_id, 0),
+                                                 CASE WHEN vehicle_id IS NULL THEN oil_type END,
+                                                 CASE WHEN vehicle_id IS NULL THEN vehicle_type END)""")
+    conn.execute("""DELETE FROM ingest_staging
+                    WHERE EXISTS (SELECT 1 FROM oil_changes c
+                                  WHERE c.change_date = ingest_staging.change_date
+                                    AND c.kilometer_reading = ingest_staging.km
+                                    AND IFNULL(c.vehicle_id, 0) = IFNULL(ingest_staging.vehicle_id, 0)
+                                    AND (ingest_staging.vehicle_id IS NOT NULL
+                                         OR (c.oil_type IS ingest_staging.oil_type
+                                             AND c.vehicle_type IS ingest_staging.vehicle_type)))""")
+
+    before = conn.total_changes
+    conn.execute("""INSERT OR IGNORE INTO oil_changes
+                    (oil_type, change_date, kilometer_reading, vehicle_type, vehicle_id)
+                    SELECT oil_type, change_date, km, vehicle_type, vehicle_id
+                    FROM ingest_staging""")
+    summary["inserted"] += conn.total_changes - before
+
+    # المسافة المتبقية قبل الخصم لمعرفة من تجاوز حد التنبيه
+    vehicle_totals = conn.execute("""SELECT s.vehicle_id, s.remaining_distance, d.km
+                                     FROM vehicle_oil_state s
+                                     JOIN (SELECT vehicle_id, SUM(km) AS km FROM ingest_staging
+                                           WHERE vehicle_id IS NOT NULL GROUP BY vehicle_id) d
+                                       ON d.vehicle_id = s.vehicle_id""").fetchall()
+    oil_type_totals = conn.execute("""SELECT t.name, t.remaining_distance, d.km
+                                      FROM oil_types t
+                                      JOIN (SELECT oil_type, SUM(km) AS km FROM ingest_staging
+                                            WHERE vehicle_id IS NULL GROUP BY oil_type) d
+                                        ON d.oil_type = t.name""").fetchall()
+
+    # تحديث واحد مجمّع لكل جدول في الدفعة
+    conn.execute("""UPDATE vehicle_oil_state
+                    SET remaining_distance = MAX(0, remaining_distance - d.km), updated_at = ?
+                    FROM (SELECT vehicle_id, SUM(km) AS km FROM ingest_staging
+                          WHERE vehicle_id IS NOT NULL GROUP BY vehicle_id) AS d
+                    WHERE vehicle_oil_state.vehicle_id = d.vehicle_id""", (now,))
+    conn.execute("""UPDATE oil_types
+                    SET remaining_distance = MAX(0, remaining_distance - d.km)
+                    FROM (SELECT oil_type, SUM(km) AS km FROM ingest_staging
+                          WHERE vehicle_id IS NULL GROUP BY oil_type) AS d
+                    WHERE oil_types.name = d.oil_type""")
+    record_staged(conn, "ingest_staging", threshold)
+    conn.execute("DELETE FROM ingest_staging")
+
+    updated = {}
+    for vehicle_id, remaining, km in vehicle_totals:
+        updated[vehicle_id] = max(0, remaining - km)
+        after = _crossed(remaining, km, threshold)
+        if after is not None:
+            summary["alerts"].append({"vehicle_id": vehicle_id, "remaining_distance": after})
+    for name, remaining, km in oil_type_totals:
+        after = _crossed(remaining, km, threshold)
+        if after is not None:
+            summary["alerts"].append({"oil_type": name, "remaining_distance": after})
+
+    summary["vehicles"] += len(vehicle_totals)
+    return updated
+
+
+def ingest_readings(readings: Iterable[dict], batch_size: int = INGEST_BATCH_SIZE,
+                    threshold: float = OIL_ALERT_THRESHOLD, fleet: Optional[FleetState] = None,
+                    repo: Optional[Repository] = None) -> dict:
+    """إدخال قراءات كثيرة، كل دفعة في معاملة واحدة
+
+    كل قراءة قاموس بالمفاتيح: vehicle_id أو oil_type، km (المسافة المقطوعة) أو odometer
+    (قراءة العداد المطلقة)، و timestamp و vehicle_type اختيارياً. قراءات العداد تحفظ كما هي
+    ثم تحول إلى مسافات بمرور واحد في النهاية. قراءات السيارات غير الموجودة لا تحفظ وتعد في
+    rejected. ترجع ملخصاً فيه السيارات التي تجاوزت حد التنبيه
+    """
+    repo = repo or get_repository()
+    summary = {"readings": 0, "inserted": 0, "vehicles": 0, "odometer": 0, "rejected": 0, "flagged": 0,
+               "alerts": []}
+    readings = iter(readings)
+    # السيارات التي وصلتها قراءات عداد، وآخر قراءة قبل هذا الإدخال لعد أعلام الجديدة فقط
+    odometer_vehicles = set()
+    after_id = repo.query_one("SELECT IFNULL(MAX(id), 0) FROM oil_readings")[0]
+
+    while True:
+        batch = list(islice(readings, batch_size))
+        if not batch:
+            break
+        odometer = [_normalize_odometer(reading) for reading in batch if reading.get("odometer") not in (None, "")]
+        rows = [_normalize_reading(reading) for reading in batch if reading.get("odometer") in (None, "")]
+        with repo.transaction() as conn:
+            rows = _reject_unknown_vehicles(conn, rows, summary)
+            odometer = _reject_unknown_vehicles(conn, odometer, summary)
+            updated = _ingest_batch(conn, rows, threshold, summary) if rows else {}
+            if odometer:
+                odometer_vehicles.update(row[0] for row in odometer)
+                before = conn.total_changes
+                conn.executemany("""INSERT OR IGNORE INTO oil_readings
+                                    (vehicle_id, reading_date, reading_km, oil_type)
+                                    VALUES (?, ?, ?, ?)""", odometer)
+                summary["odometer"] += conn.total_changes - before
+        summary["readings"] += len(batch)
+        _update_fleet(fleet, updated)
+
+    if summary["odometer"]:
+        with repo.transaction() as conn:
+            _update_fleet(fleet, _reconcile_odometers(conn, threshold, summary, odometer_vehicles, after_id))
+
+    return summary
+
+
+def _update_fleet(fleet: Optional[FleetState], updated: dict):
+    # تحديث الحالة في الذاكرة بعد نجاح الحفظ فقط
+    if fleet is not None:
+        for vehicle_id, remaining in updated.items():
+            if vehicle_id in fleet:
+                fleet.set_remaining(vehicle_id, remaining)
+
+
+def read_readings_csv(path: Path) -> Iterable[dict]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for record in csv.DictReader(f):
+            yield {column: record.get(column) for column in READING_COLUMNS}
+
+
+def ingest_folder(folder: Path, batch_size: int = INGEST_BATCH_SIZE,
+                  repo: Optional[Repository] = None) -> dict:
+    """إدخال كل ملفات CSV في مجلد الاستقبال ونقلها إلى المجلد الفرعي processed"""
+    folder = Path(folder)
+    processed_dir = folder / "processed"
+    processed_dir.mkdir(exist_ok=True)
+
+    totals = {"files": 0, "readings": 0, "inserted": 0, "vehicles": 0, "rejected": 0, "alerts": []}
+    for path in sorted(folder.glob("*.csv")):
+        summary = ingest_readings(read_readings_csv(path), batch_size=batch_size, repo=repo)
+        shutil.move(str(path), processed_dir / path.name)
+        logging.info(f"تم إدخال {summary['inserted']} قراءة من {path.name}")
+
+        totals["files"] += 1
+        for key in ("readings", "inserted", "vehicles", "rejected"):
+            totals[key] += summary[key]
+        totals["alerts"].extend(summary["alerts"])
+
+    return totals
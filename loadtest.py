@@ -0,0 +1,202 @@
+"""اختبار حمل لطبقة البيانات المشتركة في وضع الخادم: N جلسة متزامنة تحفظ قراءات
+
+كل جلسة تفعل ما تفعله الواجهة: قراءة بيانات البدء، ثم لكل قراءة حفظ على خيط قاعدة البيانات
+بحفظ لكل عملية (أو عبر كاتب الدفعات مع --group-commit كما في server.py) وتحديث لوحة
+المعلومات عبر خيوط القراءة (run_read). مع --cli-writers تكتب خيوط
+إضافية من اتصالات مستقلة بنفس الملف كما يفعل سطر الأوامر أثناء عمل الخادم.
+يعمل على قاعدة بيانات مؤقتة افتراضياً ولا يلمس بيانات المستخدم
+
+أمثلة:
+    python loadtest.py --sessions 50 --readings 20
+    python loadtest.py --sessions 100 --cli-writers 2 --json
+    python loadtest.py --sessions 100 --think 0.01 --group-commit
+"""
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import worker
+import writer
+from migrations import DEFAULT_OIL_TYPES
+from repository import Repository
+
+VEHICLE_TYPE = "سيارة"
+
+
+def _percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def _report(latencies: dict) -> dict:
+    return {name: {
+        "count": len(values),
+        "p50_ms": round(_percentile(values, 0.50) * 1000, 2),
+        "p95_ms": round(_percentile(values, 0.95) * 1000, 2),
+        "p99_ms": round(_percentile(values, 0.99) * 1000, 2),
+        "max_ms": round(max(values, default=0.0) * 1000, 2),
+    } for name, values in latencies.items()}
+
+
+class LoadTest:
+    def __init__(self, repo: Repository, readings: int, think: float,
+                 group: "writer.GroupCommitWriter" = None):
+        self.repo = repo
+        self.group = group
+        self.readings = readings
+        self.think = think
+        self.latencies = {"startup": [], "save": [], "refresh": [], "cli_save": []}
+        self.errors: dict = {}
+        self._lock = threading.Lock()
+
+    def _record(self, name: str, started: float):
+        with self._lock:
+            self.latencies[name].append(time.perf_counter() - started)
+
+    def _error(self, error: Exception):
+        key = f"{type(error).__name__}: {error}"
+        with self._lock:
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def _startup(self) -> tuple:
+        return self.repo.load_vehicle_states(), self.repo.list_vehicles()
+
+    async def _write(self, fn, *args):
+        if self.group is not None:
+            return await asyncio.wrap_future(self.group.submit(fn, *args))
+        return await worker.run_db(fn, *args)
+
+    async def session(self, vehicle_id: int, oil_type: str):
+        started = time.perf_counter()
+        try:
+            await worker.run_read(self._startup)
+            self._record("startup", started)
+        except Exception as e:
+            self._error(e)
+
+        odometer = 0
+        for _ in range(self.readings):
+            await asyncio.sleep(random.uniform(0, self.think))
+            odometer += random.randint(5, 80)
+            started = time.perf_counter()
+            try:
+                await self._write(self.repo.record_odometer, vehicle_id, oil_type, odometer, VEHICLE_TYPE)
+                self._record("save", started)
+                started = time.perf_counter()
+                await worker.run_read(self.repo.fleet_summary)
+                self._record("refresh", started)
+            except Exception as e:
+                self._error(e)
+
+    def cli_writer(self, vehicle_id: int, oil_type: str, stop: threading.Event):
+        # اتصال مستقل بنفس الملف، مثل تشغيل cli.py بجانب الخادم
+        repo = Repository(self.repo.path)
+        odometer = 0
+        try:
+            while not stop.is_set():
+                odometer += random.randint(5, 80)
+                started = time.perf_counter()
+                try:
+                    repo.record_odometer(vehicle_id, oil_type, odometer, VEHICLE_TYPE)
+                    self._record("cli_save", started)
+                except Exception as e:
+                    self._error(e)
+                time.sleep(random.uniform(0, self.think))
+        finally:
+            repo.close()
+
+
+async def _run_sessions(test: LoadTest, vehicles: list):
+    await asyncio.gather(*(test.session(vehicle_id, oil_type) for vehicle_id, oil_type in vehicles))
+
+
+def run(sessions: int, readings: int, think: float, readers: int,
+        cli_writers: int = 0, path: Path = None, group_commit: bool = writer.GROUP_COMMIT) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Repository(path or Path(tmp) / "loadtest.db", concurrent_reads=True)
+        repo.migrate()
+        if not repo.load_oil_types():
+            repo.save_oil_types(DEFAULT_OIL_TYPES)
+        oil_names = list(DEFAULT_OIL_TYPES)
+        vehicles = []
+        for index in range(sessions + cli_writers):
+            oil_type = oil_names[index % len(oil_names)]
+            vehicles.append((repo.add_vehicle(f"loadtest-{index}", 2020, 0, oil_type), oil_type))
+
+        worker.configure(read_workers=readers)
+        group = writer.GroupCommitWriter(repo) if group_commit else None
+        test = LoadTest(repo, readings, think, group)
+        stop = threading.Event()
+        threads = [threading.Thread(target=test.cli_writer, args=(*vehicle, stop), daemon=True)
+                   for vehicle in vehicles[sessions:]]
+        for thread in threads:
+            thread.start()
+
+        started = time.perf_counter()
+        asyncio.run(_run_sessions(test, vehicles[:sessions]))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        for thread in threads:
+            thread.join()
+        worker.shutdown()
+        if group is not None:
+            group.close()
+        repo.close()
+
+    saves = len(test.latencies["save"])
+    return {
+        "sessions": sessions,
+        "readings_per_session": readings,
+        "readers": readers,
+        "cli_writers": cli_writers,
+        "group_commit": group.metrics() if group is not None else None,
+        "elapsed_s": round(elapsed, 3),
+        "saves_per_s": round(saves / elapsed, 1) if elapsed else 0.0,
+        "latency": _report(test.latencies),
+        "errors": test.errors,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="alka-loadtest", description="ALKA Oil Tracker load test")
+    parser.add_argument("--sessions", type=int, default=50, help="عدد الجلسات المتزامنة")
+    parser.add_argument("--readings", type=int, default=20, help="عدد القراءات لكل جلسة")
+    parser.add_argument("--think", type=float, default=0.05, help="أقصى انتظار بين قراءتين (ثانية)")
+    parser.add_argument("--readers", type=int, default=worker.READ_WORKERS, help="عدد خيوط القراءة")
+    parser.add_argument("--cli-writers", type=int, default=0, help="كتّاب إضافيون باتصالات مستقلة")
+    parser.add_argument("--group-commit", action="store_true", help="الحفظ عبر كاتب الدفعات كما في server.py")
+    parser.add_argument("--db", type=Path, help="ملف قاعدة بيانات بدل الملف المؤقت")
+    parser.add_argument("--json", action="store_true")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    result = run(args.sessions, args.readings, args.think, args.readers, args.cli_writers, args.db,
+                 args.group_commit)
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False))
+    else:
+        print(f"{result['sessions']} جلسة، {result['elapsed_s']} ث، {result['saves_per_s']} حفظ/ث")
+        for name, stats in result["latency"].items():
+            if stats["count"]:
+                print(f"  {name}: n={stats['count']} p50={stats['p50_ms']}ms "
+                      f"p95={stats['p95_ms']}ms p99={stats['p99_ms']}ms max={stats['max_ms']}ms")
+        if result["group_commit"]:
+            metrics = result["group_commit"]
+            print(f"  group commit: {metrics['commits']} حفظ لـ {metrics['operations']} عملية، "
+                  f"متوسط الدفعة {metrics['batch_avg']} وأقصاها {metrics['batch_max']}")
+        for error, count in result["errors"].items():
+            print(f"  خطأ ×{count}: {error}")
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
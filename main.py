@@ -1,29 +1,57 @@
+# يستورد أولاً حتى يشمل قياس بدء التشغيل تحميل Flet نفسه
+from startup import StartupTimer, load_snapshot, save_snapshot
 from flet import *
-import json
 import datetime
-from pathlib import Path
-import sqlite3
-import os
-import shutil  # لنسخ قاعدة البيانات القديمة
-import math
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
-from typing import Optional, Tuple
 
-# تهيئة نظام تسجيل الأخطاء
+from assets_cache import APP_ICON, local_fonts, prefetch_images, resolve_image
+from catalog import CATALOG_TOPIC, get_catalog
+from prediction import WHEEL_ALERT_DAYS, get_predictor
+from fleet import DEFAULT_OIL_INTERVAL, OIL_ALERT_THRESHOLD, FleetState
+from dialogs import DialogManager, dialogs_for
+from render import Renderer
+import perf
+import writer
+import validation
+from validation import KmReadingValidator
+from repository import data_dir, get_repository
+from worker import run_db, run_io, run_read, submit_io
+from writer import run_write
+
+# ملف تقرير الأداء الذي تصدره لوحة الأداء
+PERF_REPORT_NAME = "alka_perf_{:%Y%m%d_%H%M%S}.json"
+
+# ارتفاع صف السجل، ثابت حتى تبني القائمة العناصر الظاهرة فقط
+HISTORY_ITEM_HEIGHT = 72
+
+# تهيئة نظام تسجيل الأخطاء، تستدعى عند تشغيل التطبيق وليس عند الاستيراد
 def init_logging():
-    log_file = Path.home() / "ALKA_Data" / "alka_app.log"
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file, encoding='utf-8'),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
-
-init_logging()
-logging.info("تم بدء تشغيل تطبيق ALKA Oil Tracker")
+    # تستدعى مع كل جلسة أيضاً، والإعداد يتم مرة واحدة في العملية
+    if any(isinstance(handler, logging.handlers.QueueHandler) for handler in logging.getLogger().handlers):
+        return
+    # إنشاء مجلد البيانات قبل فتح ملف السجل فيه
+    data_dir.mkdir(exist_ok=True)
+    log_file = data_dir / "alka_app.log"
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    handlers = [
+        logging.FileHandler(log_file, encoding='utf-8'),
+        logging.StreamHandler(sys.stdout)
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    # السجلات تكتب على خيط منفصل، فلا ينتظر الحفظ أو معالج الحدث الكتابة على القرص
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # التنسيق الكامل في معالجات المستمع، والطابور يحمل نص الرسالة فقط
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+    listener.start()
+    atexit.register(listener.stop)
 
 # دوال معالجة الأخطاء
 def log_error(error: Exception, context: str = "") -> str:
@@ -37,333 +65,183 @@ def show_error(page: Page, error: Exception, context: str = ""):
     error_msg = log_error(error, context)
     show_snackbar(page, error_msg, ThemeColors.ERROR)
 
-# إنشاء مجلد للبيانات إذا لم يكن موجوداً
-data_dir = Path.home() / "ALKA_Data"
-data_dir.mkdir(exist_ok=True)
-
-# إنشاء قاعدة البيانات
-db_path = data_dir / "alka_oil.db"
-
 def init_db():
-    # نسخ احتياطي لقاعدة البيانات القديمة إذا كانت موجودة
-    if db_path.exists():
-        backup_path = data_dir / f"alka_oil_backup_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-        shutil.copy(db_path, backup_path)
-        db_path.unlink()  # حذف قاعدة البيانات القديمة
-
-    conn = sqlite3.connect(str(db_path))
-    c = conn.cursor()
-    
-    # إنشاء الجداول مع الحقول الجديدة
-    c.execute('''CREATE TABLE IF NOT EXISTS oil_types
-                 (name TEXT PRIMARY KEY, max_distance INTEGER, 
-                  remaining_distance INTEGER, image TEXT,
-                  liter_capacity REAL, grade TEXT)''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS oil_changes
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  oil_type TEXT, change_date TEXT,
-                  kilometer_reading INTEGER,
-                  vehicle_type TEXT DEFAULT 'سيارة خاصة')''')
-    
-    # إضافة جدول السيارات
-    c.execute('''CREATE TABLE IF NOT EXISTS vehicles
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  car_type TEXT,
-                  manufacture_year INTEGER,
-                  current_mileage INTEGER,
-                  last_oil_change_date TEXT,
-                  next_oil_change_mileage INTEGER)''')
-    
-    # إضافة جدول الإطارات
-    c.execute('''CREATE TABLE IF NOT EXISTS wheels
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  wheel_type TEXT,
-                  install_date TEXT,
-                  expected_life INTEGER)''')
-    
-    # إضافة البيانات الافتراضية
-    default_oil_types = {
-        "زيت 10W-40": {
-            "max_distance": 5000,
-            "remaining_distance": 5000,
-            "image": "",
-            "liter_capacity": 4,
-            "grade": "10W-40"
-        },
-        "زيت 5W-30": {
-            "max_distance": 6000,
-            "remaining_distance": 6000,
-            "image": "",
-            "liter_capacity": 5,
-            "grade": "5W-30"
-        }
-    }
-    
-    for name, data in default_oil_types.items():
-        c.execute("""INSERT OR REPLACE INTO oil_types 
-                    VALUES (?, ?, ?, ?, ?, ?)""",
-                 (name, data["max_distance"], data["remaining_distance"],
-                  data["image"], data["liter_capacity"], data["grade"]))
-    
-    conn.commit()
-    conn.close()
-
-# تهيئة قاعدة البيانات
-init_db()
-
-# جدول لتخزين معلومات السيارة
-def init_vehicle_table():
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS vehicles (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            car_type TEXT,
-            manufacture_year INTEGER,
-            current_mileage INTEGER,
-            last_oil_change_date TEXT,
-            next_oil_change_mileage INTEGER
-        )
-    ''')
-    conn.commit()
-    conn.close()
-
-# دالة إضافة سيارة جديدة
-def add_vehicle_dialog(page, show_snackbar):
-    dialog = None  # تعريف الحوار كمتغير عام في الدالة
-    
-    # حقول إدخال معلومات السيارة
-    car_type_field = TextField(
-        label="نوع السيارة",
-        width=350,
-        prefix_icon=Icons.DIRECTIONS_CAR,
-        border_color=ThemeColors.PRIMARY
-    )
-    
-    year_field = TextField(
-        label="سنة الصنع",
-        width=350,
-        prefix_icon=Icons.CALENDAR_MONTH,
-        keyboard_type=KeyboardType.NUMBER,
-        border_color=ThemeColors.PRIMARY
-    )
-    
-    mileage_field = TextField(
-        label="الكيلومترات الحالية",
-        width=350,
-        prefix_icon=Icons.SPEED,
-        keyboard_type=KeyboardType.NUMBER,
-        border_color=ThemeColors.PRIMARY
-    )
-
-    def close_dialog(e):
-        page.overlay.remove(dialog)
-        page.update()
-
-    # دالة حفظ معلومات السيارة
-    def save_vehicle(e):
-        try:
-            # التحقق من صحة الإدخال
-            if not car_type_field.value or not year_field.value or not mileage_field.value:
-                show_snackbar(page, "يرجى ملء جميع الحقول", color=Colors.RED)
-                return
+    # فتح الاتصال المشترك وترحيل المخطط في مكانه
+    get_repository()
 
-            # إضافة السيارة إلى قاعدة البيانات
-            conn = sqlite3.connect(str(db_path))
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO vehicles 
-                (car_type, manufacture_year, current_mileage, last_oil_change_date, next_oil_change_mileage) 
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                car_type_field.value, 
-                int(year_field.value), 
-                int(mileage_field.value),
-                datetime.datetime.now().strftime("%Y-%m-%d"),
-                int(mileage_field.value) + 5000  # افتراضي 5000 كم للتغيير القادم
-            ))
-            conn.commit()
-            conn.close()
-
-            # إغلاق الحوار وعرض رسالة نجاح
-            page.overlay.remove(dialog)
-            show_snackbar(page, "تمت إضافة السيارة بنجاح", color=ThemeColors.SUCCESS)
-            page.update()
+def load_vehicle_data():
+    """حالات السيارات وقائمتها، تقرأ عند البدء وبعد استيراد نسخة احتياطية"""
+    repo = get_repository()
+    return repo.load_vehicle_states(), repo.list_vehicles()
 
-        except ValueError:
-            show_snackbar(page, "الرجاء التأكد من صحة البيانات المدخلة", color=Colors.RED)
-        except Exception as ex:
-            show_snackbar(page, f"خطأ: {str(ex)}", color=Colors.RED)
-
-    # إنشاء الحوار
-    dialog = AlertDialog(
-        title=Text("إضافة سيارة جديدة", weight=FontWeight.BOLD),
-        content=Column([
-            car_type_field,
-            year_field,
-            mileage_field
-        ], width=400, height=300),
-        actions=[
-            TextButton("حفظ", on_click=save_vehicle),
-            TextButton("إلغاء", on_click=close_dialog)
-        ]
-    )
-    
-    page.overlay.clear()  # مسح أي حوارات سابقة
-    page.overlay.append(dialog)
-    page.update()
+def load_startup_data():
+    """فتح قاعدة البيانات وقراءة ما تعرضه الواجهة، ينفذ على خيوط القراءة بعد الإطار الأول"""
+    init_db()
+    return (get_catalog().snapshot(), *load_vehicle_data())
 
-def show_wheel_dialog(page, e):
-    try:
-        def close_dlg(e):
-            dlg_modal.open = False
-            page.update()
-
-        def save_wheel_info(e):
-            try:
-                # حفظ معلومات الإطارات في قاعدة البيانات
-                conn = sqlite3.connect(str(db_path))
-                c = conn.cursor()
-                c.execute('''INSERT INTO wheels 
-                            (wheel_type, install_date, expected_life) 
-                            VALUES (?, ?, ?)''',
-                         (wheel_type.value, install_date.value, int(expected_life.value)))
-                conn.commit()
-                conn.close()
-                
-                logging.info(f"تم حفظ معلومات الإطارات: {wheel_type.value}")
-                dlg_modal.open = False
-                page.update()
-                show_snackbar(page, "تم حفظ معلومات الإطارات بنجاح", ThemeColors.SUCCESS)
-            except Exception as ex:
-                show_snackbar(page, f"خطأ: {str(ex)}", ThemeColors.ERROR)
+# دالة إضافة سيارة جديدة
+def add_vehicle_dialog(page, on_saved=None):
+    dialogs = dialogs_for(page)
 
-        wheel_type = TextField(
-            label="نوع الإطارات",
-            prefix_icon=Icons.TIRE_REPAIR,
-            width=300,
+    def build_dialog():
+        # حقول إدخال معلومات السيارة
+        car_type_field = TextField(
+            label="نوع السيارة",
+            width=350,
+            prefix_icon=Icons.DIRECTIONS_CAR,
             border_color=ThemeColors.PRIMARY
         )
         
-        install_date = TextField(
-            label="تاريخ التركيب",
-            prefix_icon=Icons.CALENDAR_TODAY,
-            width=300,
+        year_field = TextField(
+            label="سنة الصنع",
+            width=350,
+            prefix_icon=Icons.CALENDAR_MONTH,
+            keyboard_type=KeyboardType.NUMBER,
             border_color=ThemeColors.PRIMARY
         )
         
-        expected_life = TextField(
-            label="العمر المتوقع (كم)",
+        mileage_field = TextField(
+            label="الكيلومترات الحالية",
+            width=350,
             prefix_icon=Icons.SPEED,
-            width=300,
             keyboard_type=KeyboardType.NUMBER,
             border_color=ThemeColors.PRIMARY
         )
 
-        dlg_modal = AlertDialog(
-            modal=True,
-            title=Text("إضافة معلومات الإطارات", weight=FontWeight.BOLD),
-            content=Container(
-                content=Column(
-                    [
-                        wheel_type,
-                        install_date,
-                        expected_life
-                    ],
-                    tight=True,
-                    spacing=20,
-                    horizontal_alignment=CrossAxisAlignment.CENTER,
-                ),
-                padding=padding.all(20),
-            ),
+        def close_dialog(e):
+            dialogs.close(dialog)
+
+        # دالة حفظ معلومات السيارة
+        async def save_vehicle(e):
+            try:
+                # التحقق من صحة الإدخال
+                if not car_type_field.value or not year_field.value or not mileage_field.value:
+                    show_snackbar(page, "يرجى ملء جميع الحقول", color=Colors.RED)
+                    return
+
+                # إضافة السيارة إلى قاعدة البيانات
+                vehicle_id = await run_write(
+                    get_repository().add_vehicle,
+                    car_type_field.value,
+                    int(year_field.value),
+                    int(mileage_field.value)
+                )
+                if dialog.data["on_saved"]:
+                    await dialog.data["on_saved"](vehicle_id)
+
+                # إغلاق الحوار وعرض رسالة نجاح
+                dialogs.close(dialog)
+                show_snackbar(page, "تمت إضافة السيارة بنجاح", color=ThemeColors.SUCCESS)
+
+            except ValueError:
+                show_snackbar(page, "الرجاء التأكد من صحة البيانات المدخلة", color=Colors.RED)
+            except Exception as ex:
+                show_snackbar(page, f"خطأ: {str(ex)}", color=Colors.RED)
+
+        # إنشاء الحوار
+        dialog = AlertDialog(
+            title=Text("إضافة سيارة جديدة", weight=FontWeight.BOLD),
+            content=Column([
+                car_type_field,
+                year_field,
+                mileage_field
+            ], width=400, height=300),
             actions=[
-                TextButton("إلغاء", on_click=close_dlg),
-                ElevatedButton(
-                    "حفظ",
-                    on_click=save_wheel_info,
-                    style=ButtonStyle(bgcolor=ThemeColors.PRIMARY)
-                ),
-            ],
-            actions_alignment=MainAxisAlignment.END,
+                TextButton("حفظ", on_click=save_vehicle),
+                TextButton("إلغاء", on_click=close_dialog)
+            ]
         )
+        dialog.data = {"fields": (car_type_field, year_field, mileage_field)}
+        return dialog
 
-        page.overlay.append(dlg_modal)
-        dlg_modal.open = True
-        page.update()
+    # الحوار يبنى مرة واحدة ويفرّغ عند كل فتح
+    dialog = dialogs.get("add_vehicle", build_dialog)
+    dialog.data["on_saved"] = on_saved
+    for field in dialog.data["fields"]:
+        field.value = ""
+    dialogs.open(dialog)
+
+def show_wheel_dialog(page, e):
+    try:
+        dialogs = dialogs_for(page)
+
+        def build_dialog():
+            def close_dlg(e):
+                dialogs.close(dlg_modal)
+
+            async def save_wheel_info(e):
+                try:
+                    # حفظ معلومات الإطارات في قاعدة البيانات
+                    await run_write(get_repository().add_wheel, wheel_type.value, install_date.value, int(expected_life.value))
+                    
+                    logging.info(f"تم حفظ معلومات الإطارات: {wheel_type.value}")
+                    dialogs.close(dlg_modal)
+                    show_snackbar(page, "تم حفظ معلومات الإطارات بنجاح", ThemeColors.SUCCESS)
+                except Exception as ex:
+                    show_snackbar(page, f"خطأ: {str(ex)}", ThemeColors.ERROR)
+
+            wheel_type = TextField(
+                label="نوع الإطارات",
+                prefix_icon=Icons.TIRE_REPAIR,
+                width=300,
+                border_color=ThemeColors.PRIMARY
+            )
+            
+            install_date = TextField(
+                label="تاريخ التركيب",
+                prefix_icon=Icons.CALENDAR_TODAY,
+                width=300,
+                border_color=ThemeColors.PRIMARY
+            )
+            
+            expected_life = TextField(
+                label="العمر المتوقع (كم)",
+                prefix_icon=Icons.SPEED,
+                width=300,
+                keyboard_type=KeyboardType.NUMBER,
+                border_color=ThemeColors.PRIMARY
+            )
+
+            dlg_modal = AlertDialog(
+                modal=True,
+                title=Text("إضافة معلومات الإطارات", weight=FontWeight.BOLD),
+                content=Container(
+                    content=Column(
+                        [
+                            wheel_type,
+                            install_date,
+                            expected_life
+                        ],
+                        tight=True,
+                        spacing=20,
+                        horizontal_alignment=CrossAxisAlignment.CENTER,
+                    ),
+                    padding=padding.all(20),
+                ),
+                actions=[
+                    TextButton("إلغاء", on_click=close_dlg),
+                    ElevatedButton(
+                        "حفظ",
+                        on_click=save_wheel_info,
+                        style=ButtonStyle(bgcolor=ThemeColors.PRIMARY)
+                    ),
+                ],
+                actions_alignment=MainAxisAlignment.END,
+            )
+            dlg_modal.data = (wheel_type, install_date, expected_life)
+            return dlg_modal
+
+        dlg_modal = dialogs.get("wheel", build_dialog)
+        for field in dlg_modal.data:
+            field.value = ""
+        dialogs.open(dlg_modal)
 
     except Exception as e:
         show_error(page, e, "عرض نافذة الإطارات")
 
 def show_snackbar(page, message, color=None):
-    snack = SnackBar(
-        content=Text(message, color=Colors.WHITE),
-        bgcolor=color,
-        duration=3000,
-        action="حسناً"
-    )
-    page.overlay.clear()
-    page.overlay.append(snack)
-    snack.open = True
-    page.update()
-
-# دالة استرجاع معلومات السيارة
-def get_vehicle_info():
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM vehicles ORDER BY id DESC LIMIT 1')
-    vehicle = cursor.fetchone()
-    conn.close()
-    
-    return vehicle if vehicle else None
-
-# القيم الافتراضية لأنواع الزيوت
-default_oil_types = {
-    "زيت 10W-40": {
-        "max_distance": 5000,
-        "remaining_distance": 5000,
-        "image": "",
-        "liter_capacity": 4,
-        "grade": "10W-40"
-    },
-    "زيت 5W-30": {
-        "max_distance": 6000,
-        "remaining_distance": 6000,
-        "image": "",
-        "liter_capacity": 5,
-        "grade": "5W-30"
-    }
-}
-
-def load_oil_types():
-    conn = sqlite3.connect(str(db_path))
-    c = conn.cursor()
-    c.execute("SELECT * FROM oil_types")
-    rows = c.fetchall()
-    conn.close()
-    
-    if not rows:  # إذا كانت قاعدة البيانات فارغة، أضف القيم الافتراضية
-        save_default_oil_types()
-        return default_oil_types
-    
-    return {row[0]: {
-        "max_distance": row[1],
-        "remaining_distance": row[2],
-        "image": row[3],
-        "liter_capacity": row[4],
-        "grade": row[5]
-    } for row in rows}
-
-def save_default_oil_types():
-    conn = sqlite3.connect(str(db_path))
-    c = conn.cursor()
-    for name, data in default_oil_types.items():
-        c.execute("""INSERT OR REPLACE INTO oil_types 
-                    VALUES (?, ?, ?, ?, ?, ?)""",
-                 (name, data["max_distance"], data["remaining_distance"],
-                  data["image"], data["liter_capacity"], data["grade"]))
-    conn.commit()
-    conn.close()
+    # رسالة واحدة يعاد استخدامها دون مسح الحوارات المفتوحة
+    dialogs_for(page).snackbar(message, color)
 
 class ThemeColors:
     PRIMARY = Colors.BLUE
@@ -374,62 +252,18 @@ class ThemeColors:
     SUCCESS = Colors.GREEN_600
     WARNING = Colors.ORANGE_600
 
-def log_error(error: Exception, context: str = "") -> str:
-    """تسجيل الخطأ وإرجاع رسالة الخطأ"""
-    error_msg = f"خطأ في {context}: {str(error)}"
-    logging.error(error_msg)
-    return error_msg
-
-def show_error(page: Page, error: Exception, context: str = ""):
-    """عرض رسالة الخطأ للمستخدم"""
-    error_msg = log_error(error, context)
-    show_snackbar(page, error_msg, ThemeColors.ERROR)
-
-def save_oil_reading(vehicle_id: int, reading_date: str, reading_km: int, oil_type: str) -> bool:
-    try:
-        conn = sqlite3.connect(str(db_path))
-        c = conn.cursor()
-        c.execute('''INSERT INTO oil_readings 
-                    (vehicle_id, reading_date, reading_km, oil_type) 
-                    VALUES (?, ?, ?, ?)''',
-                 (vehicle_id, reading_date, reading_km, oil_type))
-        conn.commit()
-        conn.close()
-        logging.info(f"تم حفظ قراءة الزيت: {reading_km}km, النوع: {oil_type}")
-        return True
-    except Exception as e:
-        log_error(e, "حفظ قراءة الزيت")
-        return False
-
-def get_vehicle_info() -> Optional[tuple]:
-    try:
-        conn = sqlite3.connect(str(db_path))
-        c = conn.cursor()
-        c.execute('SELECT * FROM vehicles LIMIT 1')
-        vehicle = c.fetchone()
-        conn.close()
-        return vehicle
-    except Exception as e:
-        log_error(e, "جلب معلومات السيارة")
-        return None
-
-def update_oil_info(oil_type: str):
-    try:
-        conn = sqlite3.connect(str(db_path))
-        c = conn.cursor()
-        c.execute('SELECT * FROM oil_types WHERE name = ?', (oil_type,))
-        oil_info = c.fetchone()
-        conn.close()
-        
-        if oil_info:
-            logging.info(f"تم تحديث معلومات الزيت: {oil_type}")
-            return oil_info
-        return None
-    except Exception as e:
-        log_error(e, "تحديث معلومات الزيت")
-        return None
+# لون حقل قراءة العداد حسب نتيجة التحقق
+KM_INPUT_COLORS = {
+    validation.OK: ThemeColors.PRIMARY,
+    validation.WARNING: ThemeColors.WARNING,
+    validation.ERROR: ThemeColors.ERROR,
+}
 
 def main(page: Page):
+    init_logging()
+    timer = StartupTimer()
+    timer.mark("app_ready")
+
     try:
         logging.info("بدء تهيئة الصفحة الرئيسية")
         
@@ -441,10 +275,9 @@ def main(page: Page):
         page.bgcolor = ThemeColors.BACKGROUND
         page.padding = 20
         page.scroll = ScrollMode.AUTO
-        page.fonts = {
-            "Cairo": "https://fonts.googleapis.com/css2?family=Cairo:wght@300;400;700&display=swap"
-        }
-        page.theme = Theme(font_family="Cairo")
+        # الخطوط من مجلد assets فقط، وإذا لم يوجد Cairo يستخدم الخط الافتراضي
+        page.fonts = local_fonts()
+        page.theme = Theme(font_family="Cairo" if "Cairo" in page.fonts else None)
         
         logging.info("تم تهيئة إعدادات الصفحة بنجاح")
 
@@ -453,8 +286,31 @@ def main(page: Page):
         page.add(Text(error_msg, color="red"))
         page.update()
 
-    # تحميل بيانات الزيوت
-    oil_types = load_oil_types()
+    # كل حدث يرسل تحديثاً واحداً للعناصر التي تغيرت
+    render = Renderer(page)
+    dialogs = DialogManager(page, render)
+
+    # الإطار الأول يبنى من اللقطة المخزنة دون فتح قاعدة البيانات،
+    # والبيانات الفعلية تحمّل بعد ظهوره في finish_startup
+    snapshot = load_snapshot() or {}
+    oil_types = snapshot.get("oil_types", {})
+
+    # نسخة الجلسة من كتالوج الزيوت المشترك، والإصدار الذي تعرضه حالياً
+    catalog = get_catalog()
+    catalog_version = {"value": None}
+
+    # حالة الزيت لكل سيارة، والسيارة المختارة حالياً
+    fleet = FleetState()
+    fleet.load(snapshot.get("states", {}))
+    vehicles = {row[0]: row for row in snapshot.get("vehicles", [])}
+    active_vehicle = {"id": None}
+
+    # توقعات مواعيد الصيانة، تحسب في الخلفية بعد التحميل ومع كل قراءة
+    predictor = get_predictor()
+    predictions = {}
+    # ملخص الأسطول من الجداول المجمّعة، قراءته لا تمر على سجل التغييرات
+    fleet_summary = {}
+    timer.mark("snapshot_loaded")
 
     # تحسين بطاقة المعلومات الرئيسية
     def create_pro_card(content, color=ThemeColors.SURFACE, elevation=5):
@@ -475,119 +331,6 @@ def main(page: Page):
             on_hover=lambda e: setattr(e.control, 'scale', 1.02 if e.data == 'true' else 1)
         )
 
-    # شريط التطبيق المحسن مع تأثيرات بصرية
-    page.appbar = AppBar(
-        leading=Container(
-            content=Icon(Icons.OIL_BARREL, color=Colors.WHITE, size=30),
-            padding=10,
-            border_radius=10,
-            gradient=LinearGradient(
-                begin=alignment.top_left,
-                end=alignment.bottom_right,
-                colors=[ThemeColors.PRIMARY, Colors.BLUE_600]
-            )
-        ),
-        title=Text(
-            "ALKA Oil Tracker",
-            size=22,
-            weight=FontWeight.BOLD,
-            color=Colors.WHITE
-        ),
-        center_title=True,
-        bgcolor=ThemeColors.PRIMARY,
-        color=Colors.WHITE,
-        actions=[
-            IconButton(
-                icon=Icons.MORE_VERT,
-                icon_color=Colors.WHITE,
-                on_click=lambda e: show_app_menu(e)
-            )
-        ]
-    )
-
-    # مؤشر المسافة المتبقية المحسن
-    progress = ProgressRing(
-        width=250,
-        height=250,
-        stroke_width=20,
-        color=ThemeColors.PRIMARY,
-        bgcolor=Colors.BLUE_50,
-        rotate=Rotate(angle=math.pi/2),  # تدوير المؤشر
-    )
-    
-    progress_text = Text(
-        "5000 كم متبقية",
-        size=24,
-        weight=FontWeight.BOLD,
-        color=ThemeColors.PRIMARY,
-        text_align=TextAlign.CENTER
-    )
-
-    # قائمة اختيار نوع الزيت المحسنة
-    oil_dropdown = Dropdown(
-        width=350,
-        label="نوع الزيت",
-        hint_text="اختر نوع الزيت",
-        prefix_icon=Icons.OIL_BARREL,
-        options=[dropdown.Option(key=name, text=name) for name in oil_types.keys()],
-        border_color=ThemeColors.PRIMARY,
-        focused_border_color=ThemeColors.PRIMARY,
-        focused_bgcolor=Colors.BLUE_50,
-        border_radius=15,
-        content_padding=15,
-        animate_opacity=300,
-    )
-
-    # زر إضافة قراءة محسن
-    add_reading_btn = ElevatedButton(
-        "إضافة قراءة جديدة",
-        icon=Icons.ADD_ROAD,
-        style=ButtonStyle(
-            bgcolor=ThemeColors.PRIMARY,
-            color=Colors.WHITE,
-            padding=15,
-            animation_duration=500,
-            shape=RoundedRectangleBorder(radius=15),
-            overlay_color=Colors.WHITE10,
-        ),
-        width=350,
-        height=60,
-        animate_scale=True,
-    )
-
-    # معلومات الزيت مع تصميم محسن
-    oil_info = create_pro_card(
-        Column([
-            Row([
-                Icon(Icons.INFO_OUTLINE, color=ThemeColors.PRIMARY),
-                Text("معلومات الزيت", weight=FontWeight.BOLD, size=18),
-            ], alignment=MainAxisAlignment.START),
-            Divider(height=1, color=Colors.BLACK12),
-            Container(height=10),
-            Row([
-                Text("السعة:", weight=FontWeight.W_500),
-                Text("-- لتر", color=Colors.GREY_700),
-            ], alignment=MainAxisAlignment.SPACE_BETWEEN),
-            Row([
-                Text("الدرجة:", weight=FontWeight.W_500),
-                Text("--", color=Colors.GREY_700),
-            ], alignment=MainAxisAlignment.SPACE_BETWEEN),
-        ], spacing=10)
-    )
-
-    def show_snackbar(page, message, color=None):
-        snack_bar = SnackBar(
-            content=Text(message, color=Colors.WHITE),
-            bgcolor=color,
-            duration=3000,  # 3 ثواني
-            action="حسناً",
-            action_color=Colors.WHITE
-        )
-        page.overlay.clear()  # مسح أي رسائل سابقة
-        page.overlay.append(snack_bar)
-        snack_bar.open = True
-        page.update()
-
     def create_card(content, width=None, height=None, color=ThemeColors.SURFACE):
         return Container(
             content=content,
@@ -606,7 +349,11 @@ def main(page: Page):
 
     # شريط التطبيق المحسن
     page.appbar = AppBar(
-        leading=Icon(Icons.OIL_BARREL, color=ThemeColors.PRIMARY, size=30),
+        # ضغطة مطولة على الأيقونة تظهر عنصر لوحة الأداء المخفي في القائمة
+        leading=GestureDetector(
+            content=Icon(Icons.OIL_BARREL, color=ThemeColors.PRIMARY, size=30),
+            on_long_press_start=lambda e: reveal_performance_item(),
+        ),
         title=Text(
             "ALKA",
             size=22,
@@ -631,13 +378,18 @@ def main(page: Page):
                     PopupMenuItem(
                         text="سجل التغييرات",
                         icon=Icons.HISTORY,
-                        on_click=lambda e: show_history_dialog()
+                        on_click=lambda e: page.run_task(show_history_dialog)
                     ),
                     PopupMenuItem(),
                     PopupMenuItem(
                         text="النسخ الاحتياطي",
                         icon=Icons.BACKUP,
-                        on_click=lambda e: export_data()
+                        on_click=lambda e: page.run_task(export_data)
+                    ),
+                    PopupMenuItem(
+                        text="استعادة نسخة احتياطية",
+                        icon=Icons.RESTORE,
+                        on_click=lambda e: pick_import_file()
                     ),
                 ]
             )
@@ -672,9 +424,16 @@ def main(page: Page):
         focused_bgcolor=Colors.BLUE_50,
     )
 
+    def current_remaining(selected_oil):
+        # عند اختيار سيارة تعرض حالتها هي وليس المسافة العامة لنوع الزيت
+        state = fleet.get(active_vehicle["id"])
+        if state:
+            return state["remaining_distance"]
+        return oil_types[selected_oil]["remaining_distance"]
+
     def update_oil_info(selected_oil):
         if selected_oil in oil_types:
-            remaining = oil_types[selected_oil]["remaining_distance"]
+            remaining = current_remaining(selected_oil)
             max_distance = oil_types[selected_oil]["max_distance"]
             progress.value = remaining / max_distance
             progress_text.value = f"{int(remaining)} كم متبقية"
@@ -682,19 +441,54 @@ def main(page: Page):
             # إضافة معلومات إضافية
             oil_info.content.controls[1].value = f"السعة: {oil_types[selected_oil]['liter_capacity']} لتر"
             oil_info.content.controls[2].value = f"الدرجة: {oil_types[selected_oil]['grade']}"
-            page.update()
 
+            # الصورة البعيدة تظهر بعد تنزيلها إلى الذاكرة في الخلفية
+            oil_image.src = resolve_image(oil_types[selected_oil].get("image"))
+            oil_image.visible = oil_image.src is not None
+            render.update(progress, progress_text, oil_info)
+
+    @render.event()
     def on_dropdown_change(e):
         if e.data:
             update_oil_info(e.data)
-            page.update()
+
+    def apply_catalog(version, types):
+        # تستبدل نسخة الجلسة فقط إذا تغير إصدار الكتالوج
+        if version == catalog_version["value"]:
+            return
+        catalog_version["value"] = version
+        oil_types.clear()
+        oil_types.update(types)
+        oil_dropdown.options = [dropdown.Option(key=name, text=name) for name in oil_types.keys()]
+        if oil_dropdown.value not in oil_types:
+            oil_dropdown.value = next(iter(oil_types), None)
+        add_reading_btn.disabled = not oil_types
+        render.update(oil_dropdown, add_reading_btn)
+        if oil_dropdown.value:
+            update_oil_info(oil_dropdown.value)
+
+    async def sync_catalog(publish: bool = False):
+        # الكتالوج غير المتغير يرجع من الذاكرة دون استعلام
+        apply_catalog(*await run_db(catalog.snapshot))
+        if publish:
+            # إبلاغ باقي الجلسات، وهذه الجلسة تتجاهل الرسالة لأن إصدارها محدث
+            page.pubsub.send_all_on_topic(CATALOG_TOPIC, catalog_version["value"])
+
+    @render.event()
+    async def on_catalog_changed(topic, version):
+        if version != catalog_version["value"]:
+            await sync_catalog()
+
+    page.pubsub.subscribe_topic(CATALOG_TOPIC, on_catalog_changed)
 
     # معلومات الزيت
+    oil_image = Image(width=60, height=60, fit=ImageFit.CONTAIN, visible=False)
     oil_info = create_card(
         Column([
             Text("معلومات الزيت", weight=FontWeight.BOLD, size=16),
             Text("السعة: -- لتر"),
             Text("الدرجة: --"),
+            oil_image,
         ], spacing=10)
     )
 
@@ -710,24 +504,29 @@ def main(page: Page):
             shape=RoundedRectangleBorder(radius=10),
         ),
         width=300,
+        # معطل حتى تحميل أنواع الزيوت في أول تشغيل بلا لقطة محفوظة
+        disabled=not oil_types,
     )
 
-    def show_add_reading_dialog():
-        # التأكد من وجود نوع الزيت
-        current_oil_type = oil_dropdown.value if oil_dropdown.value else list(oil_types.keys())[0]
-        
+    # شريط تقدم التصدير، يظهر أثناء التصدير فقط
+    export_progress = ProgressBar(
+        width=300,
+        value=0,
+        color=ThemeColors.PRIMARY,
+        bgcolor=Colors.BLUE_50,
+        visible=False,
+    )
+
+    def build_add_reading_dialog():
         reading_input = TextField(
             label="أدخل قراءة العداد (كم)",
             keyboard_type=KeyboardType.NUMBER,
             prefix_icon=Icons.SPEED,
             width=300,
-            border_color=get_kilometer_input_color(current_oil_type, 0),
-            on_change=lambda e: setattr(
-                e.control, 
-                'border_color', 
-                get_kilometer_input_color(current_oil_type, float(e.control.value or 0))
-            )
         )
+        # المسافة المتوقعة بعد القراءة وتنبيه الاقتراب من الحد أثناء الكتابة
+        reading_feedback = Text(size=13)
+        validator = KmReadingValidator(reading_input, reading_feedback, KM_INPUT_COLORS, render)
         
         vehicle_type = Dropdown(
             label="نوع العجلة",
@@ -747,6 +546,7 @@ def main(page: Page):
             content=Container(
                 content=Column([
                     reading_input,
+                    reading_feedback,
                     Container(height=10),
                     vehicle_type,
                 ], spacing=10),
@@ -756,20 +556,41 @@ def main(page: Page):
                 TextButton("إلغاء", on_click=lambda e: close_dialog(e, dialog)),
                 ElevatedButton(
                     "حفظ",
-                    on_click=lambda e: save_reading(e, dialog, reading_input, vehicle_type),
+                    on_click=lambda e: page.run_task(save_reading, e, dialog, reading_input, vehicle_type,
+                                                     request["reading_at"]),
                     style=ButtonStyle(bgcolor=ThemeColors.PRIMARY),
                 ),
             ],
         )
-        page.overlay.append(dialog)
-        dialog.open = True
-        page.update()
+        # وقت القراءة يثبت عند فتح الحوار، فهو مع المسافة مفتاح عدم تكرار الحفظ
+        request = {"reading_at": None}
+        dialog.data = (reading_input, vehicle_type, validator, request)
+        return dialog
 
+    @render.event()
+    def show_add_reading_dialog():
+        # التأكد من وجود نوع الزيت، والكتالوج قد لا يكون حمّل بعد
+        current_oil_type = oil_dropdown.value or next(iter(oil_types), None)
+        if current_oil_type is None:
+            return
+
+        # الحوار يبنى مرة واحدة ويفرّغ عند كل فتح
+        dialog = dialogs.get("add_reading", build_add_reading_dialog)
+        reading_input, vehicle_type, validator, request = dialog.data
+        request["reading_at"] = datetime.datetime.now().isoformat()
+        # قراءة السيارة المختارة قراءة عداد مطلقة تقارن بعدادها الحالي
+        vehicle_id = active_vehicle["id"]
+        odometer = vehicles[vehicle_id][3] if vehicle_id in fleet and vehicle_id in vehicles else None
+        validator.reset(current_remaining(current_oil_type) if current_oil_type in oil_types else None, odometer)
+        vehicle_type.value = None
+        dialogs.open(dialog)
+
+    @render.event()
     def close_dialog(e, dialog):
-        dialog.open = False
-        page.update()
+        dialogs.close(dialog)
 
-    def save_reading(e, dialog, reading_input, vehicle_type):
+    @render.event()
+    async def save_reading(e, dialog, reading_input, vehicle_type, reading_at):
         try:
             new_reading = float(reading_input.value)
             vehicle = vehicle_type.value if vehicle_type.value else "سيارة خاصة"
@@ -777,54 +598,61 @@ def main(page: Page):
             if new_reading > 0:
                 selected_oil = oil_dropdown.value
                 if selected_oil:
-                    # تحديث المسافة المتبقية
-                    remaining = oil_types[selected_oil]["remaining_distance"] - new_reading
-                    oil_types[selected_oil]["remaining_distance"] = max(0, remaining)
-
-                    # حفظ التحديث في قاعدة البيانات
-                    conn = sqlite3.connect(str(db_path))
-                    c = conn.cursor()
-                    
-                    # تحديث المسافة المتبقية في جدول أنواع الزيوت
-                    c.execute("""UPDATE oil_types 
-                                SET remaining_distance = ?
-                                WHERE name = ?""",
-                             (max(0, remaining), selected_oil))
-                    
-                    # إضافة القراءة الجديدة في سجل التغييرات
-                    c.execute("""INSERT INTO oil_changes 
-                                (oil_type, change_date, kilometer_reading, vehicle_type) 
-                                VALUES (?, ?, ?, ?)""",
-                             (selected_oil, datetime.datetime.now().isoformat(), new_reading, vehicle))
-                    
-                    conn.commit()
-                    conn.close()
+                    # الخصم يتم في قاعدة البيانات، والذاكرة تأخذ القيمة المحفوظة بعد نجاح الحفظ فقط
+                    # فالضغط المزدوج أو إعادة المحاولة بنفس المفتاح لا تخصم مرتين
+                    vehicle_id = active_vehicle["id"]
+                    if vehicle_id in fleet:
+                        # قراءة العداد المطلقة للسيارة المختارة، والمسافة من أعلى قراءة سابقة بوقت القراءة
+                        remaining, distance, inserted = await run_write(get_repository().record_odometer,
+                                                                     vehicle_id, selected_oil, new_reading,
+                                                                     vehicle, reading_at)
+                        if inserted and distance is None:
+                            show_snackbar(page, "القراءة أقل من عداد السيارة، حفظت للمراجعة دون خصم",
+                                          ThemeColors.WARNING)
+                            dialogs.close(dialog)
+                            return
+                        if inserted:
+                            vehicle_row = list(vehicles[vehicle_id])
+                            vehicle_row[3] = max(vehicle_row[3] or 0, new_reading)
+                            vehicles[vehicle_id] = tuple(vehicle_row)
+                            new_reading = distance
+                        fleet.set_remaining(vehicle_id, remaining)
+                    else:
+                        # حفظ القراءة في سجل التغييرات وخصمها من نوع الزيت عبر الكتالوج المشترك
+                        remaining, inserted = await run_write(catalog.record_reading,
+                                                           selected_oil, new_reading, vehicle, reading_at)
+                        await sync_catalog(publish=inserted)
+
+                    if not inserted:
+                        # القراءة محفوظة من ضغطة سابقة
+                        dialogs.close(dialog)
+                        return
 
                     # تحديث الواجهة
                     update_oil_info(selected_oil)
+                    store_snapshot()
+                    page.run_task(refresh_predictions)
                     
                     # عرض رسالة نجاح مع المسافة المتبقية
                     remaining_msg = f"تم تسجيل {int(new_reading)} كم. متبقي {int(max(0, remaining))} كم"
                     show_snackbar(page, remaining_msg, ThemeColors.SUCCESS)
                     
                     # إظهار تنبيه إذا اقتربت المسافة المتبقية من الصفر
-                    if remaining <= 500 and remaining > 0:
+                    if remaining <= OIL_ALERT_THRESHOLD and remaining > 0:
                         show_oil_change_alert(f"تنبيه! متبقي {int(remaining)} كم فقط حتى موعد تغيير الزيت")
                     elif remaining <= 0:
                         show_oil_change_alert("يجب تغيير الزيت الآن!")
                     
-                    dialog.open = False
-                    page.update()
+                    dialogs.close(dialog)
                 else:
                     show_snackbar(page, "الرجاء اختيار نوع الزيت أولاً", ThemeColors.ERROR)
         except ValueError:
             show_snackbar(page, "الرجاء إدخال رقم صحيح", ThemeColors.ERROR)
-            page.update()
 
-    def show_oil_change_alert(message="حان موعد تغيير الزيت!"):
+    def build_oil_change_alert():
         alert = AlertDialog(
             title=Text("تنبيه!", color=ThemeColors.ERROR, weight=FontWeight.BOLD),
-            content=Text(message, size=18),
+            content=Text(size=18),
             actions=[
                 ElevatedButton(
                     "حسناً",
@@ -833,39 +661,46 @@ def main(page: Page):
                 ),
                 TextButton(
                     "تصفير العداد",
-                    on_click=lambda e: reset_oil_counter(e, alert),
+                    on_click=lambda e: page.run_task(reset_oil_counter, e, alert),
                 )
             ],
         )
-        page.overlay.append(alert)
-        alert.open = True
-        page.update()
+        return alert
 
-    def reset_oil_counter(e, dialog):
+    def show_oil_change_alert(message="حان موعد تغيير الزيت!"):
+        alert = dialogs.get("oil_change_alert", build_oil_change_alert)
+        alert.content.value = message
+        dialogs.open(alert)
+
+    @render.event()
+    async def reset_oil_counter(e, dialog):
         selected_oil = oil_dropdown.value
         if selected_oil:
             # إعادة تعيين المسافة المتبقية إلى القيمة القصوى
             max_distance = oil_types[selected_oil]["max_distance"]
-            oil_types[selected_oil]["remaining_distance"] = max_distance
-
-            # تحديث قاعدة البيانات
-            conn = sqlite3.connect(str(db_path))
-            c = conn.cursor()
-            c.execute("""UPDATE oil_types 
-                        SET remaining_distance = ?
-                        WHERE name = ?""",
-                     (max_distance, selected_oil))
-            conn.commit()
-            conn.close()
+            vehicle_id = active_vehicle["id"]
+            if vehicle_id in fleet:
+                # تغيير الزيت للسيارة المختارة بنوع الزيت المحدد
+                await run_write(get_repository().reset_vehicle_oil, vehicle_id, selected_oil, max_distance)
+                fleet.set(vehicle_id, selected_oil, vehicles[vehicle_id][3], max_distance)
+                vehicle = list(vehicles[vehicle_id])
+                vehicle[4] = datetime.date.today().strftime("%Y-%m-%d")
+                vehicle[5] = (vehicle[3] or 0) + max_distance
+                vehicles[vehicle_id] = tuple(vehicle)
+            else:
+                # تحديث قاعدة البيانات ثم الكتالوج المشترك
+                await run_write(catalog.reset, selected_oil)
+                await sync_catalog(publish=True)
 
             # تحديث الواجهة
             update_oil_info(selected_oil)
+            store_snapshot()
+            page.run_task(refresh_predictions)
             show_snackbar(page, "تم تصفير العداد بنجاح", ThemeColors.SUCCESS)
             
-        dialog.open = False
-        page.update()
+        dialogs.close(dialog)
 
-    def show_add_oil_type_dialog():
+    def build_add_oil_type_dialog():
         name_input = TextField(
             label="نوع الزيت",
             prefix_icon=Icons.OIL_BARREL,
@@ -904,16 +739,23 @@ def main(page: Page):
                 TextButton("إلغاء", on_click=lambda e: close_dialog(e, dialog)),
                 ElevatedButton(
                     "حفظ",
-                    on_click=lambda e: save_new_oil_type(e, dialog, name_input, max_distance_input, capacity_input, grade_input),
+                    on_click=lambda e: page.run_task(save_new_oil_type, e, dialog, name_input, max_distance_input, capacity_input, grade_input),
                     style=ButtonStyle(bgcolor=ThemeColors.PRIMARY),
                 ),
             ],
         )
-        page.overlay.append(dialog)
-        dialog.open = True
-        page.update()
+        dialog.data = (name_input, max_distance_input, capacity_input, grade_input)
+        return dialog
 
-    def save_new_oil_type(e, dialog, name_input, max_distance_input, capacity_input, grade_input):
+    @render.event()
+    def show_add_oil_type_dialog():
+        dialog = dialogs.get("add_oil_type", build_add_oil_type_dialog)
+        for field in dialog.data:
+            field.value = ""
+        dialogs.open(dialog)
+
+    @render.event()
+    async def save_new_oil_type(e, dialog, name_input, max_distance_input, capacity_input, grade_input):
         try:
             name = name_input.value.strip()
             max_distance = float(max_distance_input.value)
@@ -928,47 +770,35 @@ def main(page: Page):
                 show_snackbar(page, "يجب أن تكون القيم أكبر من صفر", ThemeColors.ERROR)
                 return
 
-            # حفظ في قاعدة البيانات
-            conn = sqlite3.connect(str(db_path))
-            c = conn.cursor()
-            c.execute("""INSERT INTO oil_types 
-                        (name, max_distance, remaining_distance, image, liter_capacity, grade)
-                        VALUES (?, ?, ?, ?, ?, ?)""",
-                     (name, max_distance, max_distance, "", capacity, grade))
-            conn.commit()
-            conn.close()
-
-            # تحديث القائمة المنسدلة
-            oil_types[name] = {
-                "max_distance": max_distance,
-                "remaining_distance": max_distance,
-                "image": "",
-                "liter_capacity": capacity,
-                "grade": grade
-            }
-            
-            oil_dropdown.options = [dropdown.Option(key=name, text=name) for name in oil_types.keys()]
+            # حفظ في قاعدة البيانات والكتالوج المشترك، ثم تحديث القائمة المنسدلة في كل الجلسات
+            await run_write(catalog.add, name, max_distance, capacity, grade)
+            await sync_catalog(publish=True)
             oil_dropdown.value = name
             update_oil_info(name)
+            store_snapshot()
             
             show_snackbar(page, "تم إضافة نوع الزيت بنجاح", ThemeColors.SUCCESS)
-            dialog.open = False
-            page.update()
+            render.update(oil_dropdown)
+            dialogs.close(dialog)
 
         except ValueError:
             show_snackbar(page, "الرجاء إدخال أرقام صحيحة", ThemeColors.ERROR)
-            page.update()
-
-    def show_history_dialog():
-        # جلب سجل التغييرات من قاعدة البيانات
-        conn = sqlite3.connect(str(db_path))
-        c = conn.cursor()
-        c.execute("""SELECT oil_type, change_date, kilometer_reading, vehicle_type 
-                    FROM oil_changes 
-                    ORDER BY change_date DESC
-                    LIMIT 50""")
-        history = c.fetchall()
-        conn.close()
+
+    def create_history_card(row):
+        # صف خفيف بارتفاع ثابت، التاريخ يصل منسقاً من الاستعلام
+        _, oil_type, _, km_reading, vehicle_type, formatted_date = row
+        return ListTile(
+            leading=Icon(Icons.LOCAL_GAS_STATION, color=ThemeColors.PRIMARY),
+            title=Text(oil_type, weight=FontWeight.BOLD, size=16),
+            subtitle=Text(
+                f"{vehicle_type or 'سيارة خاصة'} • {formatted_date} • {int(km_reading)} كم",
+                color=Colors.BLUE_GREY_700,
+            ),
+            dense=True,
+        )
+
+    def build_history_dialog():
+        state = {"cursor": None, "loading": False}
 
         # إنشاء عنوان جذاب
         title_row = Row(
@@ -979,95 +809,56 @@ def main(page: Page):
             alignment=MainAxisAlignment.CENTER,
         )
 
-        # إنشاء بطاقات لكل تغيير
-        history_cards = []
-        for oil_type, change_date, km_reading, vehicle_type in history:
-            # تحويل التاريخ إلى صيغة مقروءة
-            date_obj = datetime.datetime.fromisoformat(change_date)
-            formatted_date = date_obj.strftime("%Y-%m-%d %H:%M")
+        # ListView تبني العناصر الظاهرة فقط، وitem_extent يغنيها عن قياس كل عنصر
+        history_list = ListView(
+            height=400,
+            item_extent=HISTORY_ITEM_HEIGHT,
+            divider_thickness=1,
+            padding=padding.only(right=20),
+            on_scroll_interval=100,
+        )
 
-            # إنشاء بطاقة لكل تغيير
-            card = Container(
-                content=Column([
-                    # صف العنوان مع الأيقونة
-                    Row([
-                        Icon(Icons.LOCAL_GAS_STATION, color=ThemeColors.PRIMARY),
-                        Text(oil_type, weight=FontWeight.BOLD, size=16),
-                    ], alignment=MainAxisAlignment.START),
-                    
-                    Divider(height=1, color=Colors.BLACK12),
-                    
-                    # معلومات التغيير
-                    Container(
-                        content=Column([
-                            Row([
-                                Icon(Icons.DIRECTIONS_CAR, color=Colors.BLUE_GREY_400, size=20),
-                                Container(width=10),
-                                Text(vehicle_type if vehicle_type else "سيارة خاصة", 
-                                     color=Colors.BLUE_GREY_700),
-                            ]),
-                            Row([
-                                Icon(Icons.CALENDAR_TODAY, color=Colors.BLUE_GREY_400, size=20),
-                                Container(width=10),
-                                Text(formatted_date, color=Colors.BLUE_GREY_700),
-                            ]),
-                            Row([
-                                Icon(Icons.SPEED, color=Colors.BLUE_GREY_400, size=20),
-                                Container(width=10),
-                                Text(f"{int(km_reading)} كم", color=Colors.BLUE_GREY_700),
-                            ]),
-                        ], spacing=10),
-                        padding=padding.only(left=10, right=10, top=10, bottom=10),
-                    ),
-                ]),
-                border_radius=10,
-                border=border.all(1, Colors.BLACK12),
-                margin=margin.only(bottom=10),
-                padding=10,
-                ink=True,
-                bgcolor=Colors.WHITE,
-                shadow=BoxShadow(
-                    spread_radius=1,
-                    blur_radius=5,
-                    color=Colors.BLACK12,
-                    offset=Offset(0, 2),
-                ),
-            )
-            
-            # إضافة تأثير التحويم
-            card.on_hover = lambda e: apply_hover_effect(e)
-            history_cards.append(card)
+        # تحميل الصفحة التالية عند الاقتراب من نهاية القائمة
+        @render.event("load_history_page")
+        async def load_next_page(e):
+            if state["loading"] or state["cursor"] is None:
+                return
+            if e.pixels < e.max_scroll_extent - 200:
+                return
+            state["loading"] = True
+            try:
+                rows, state["cursor"] = await run_read(get_repository().history_page, after=state["cursor"])
+                history_list.controls.extend(create_history_card(row) for row in rows)
+                render.update(history_list)
+            except Exception as ex:
+                show_error(page, ex, "تحميل سجل التغييرات")
+            finally:
+                state["loading"] = False
+
+        history_list.on_scroll = load_next_page
 
         # إذا لم يكن هناك سجلات
-        if not history:
-            content = Container(
-                content=Column([
-                    Icon(Icons.HISTORY_TOGGLE_OFF, size=50, color=Colors.GREY_400),
-                    Container(height=20),
-                    Text("لا يوجد سجل للتغييرات حتى الآن",
-                         size=16, color=Colors.GREY_700,
-                         weight=FontWeight.W_500),
-                ], 
-                horizontal_alignment=CrossAxisAlignment.CENTER,
-                alignment=MainAxisAlignment.CENTER),
-                padding=20,
-            )
-        else:
-            content = Column([
-                title_row,
+        empty_content = Container(
+            content=Column([
+                Icon(Icons.HISTORY_TOGGLE_OFF, size=50, color=Colors.GREY_400),
                 Container(height=20),
-                # إضافة البطاقات في عمود قابل للتمرير
-                Container(
-                    content=Column(history_cards),
-                    padding=padding.only(right=20),
-                    scrollable=True,
-                    height=400,
-                )
-            ])
+                Text("لا يوجد سجل للتغييرات حتى الآن",
+                     size=16, color=Colors.GREY_700,
+                     weight=FontWeight.W_500),
+            ], 
+            horizontal_alignment=CrossAxisAlignment.CENTER,
+            alignment=MainAxisAlignment.CENTER),
+            padding=20,
+        )
+        list_content = Column([
+            title_row,
+            Container(height=20),
+            # إضافة البطاقات في قائمة قابلة للتمرير
+            history_list,
+        ])
 
         dialog = AlertDialog(
             content=Container(
-                content=content,
                 padding=20,
                 width=450,
             ),
@@ -1087,63 +878,107 @@ def main(page: Page):
             ],
             actions_alignment=MainAxisAlignment.END,
         )
-        page.overlay.append(dialog)
-        dialog.open = True
-        page.update()
-
-    def apply_hover_effect(e):
-        if e.data == "true":  # عند التحويم
-            e.control.elevation = 5
-            e.control.scale = 1.02
-        else:  # عند إزالة التحويم
-            e.control.elevation = 0
-            e.control.scale = 1
-        e.control.update()
+        dialog.data = {"state": state, "list": history_list, "empty": empty_content, "content": list_content}
+        return dialog
+
+    @render.event()
+    async def show_history_dialog():
+        # جلب الصفحة الأولى من سجل التغييرات، والباقي يحمّل عند التمرير
+        history, next_cursor = await run_read(get_repository().history_page)
+
+        # نفس الحوار والقائمة في كل مرة، تستبدل صفوفها فقط
+        dialog = dialogs.get("history", build_history_dialog)
+        parts = dialog.data
+        parts["state"].update(cursor=next_cursor, loading=False)
+        parts["list"].controls = [create_history_card(row) for row in history]
+        dialog.content.content = parts["content"] if history else parts["empty"]
+        dialogs.open(dialog)
+
+    @render.event()
+    async def export_data():
+        if export_progress.visible:
+            return  # يوجد تصدير جارٍ بالفعل
+        export_progress.value = 0
+        export_progress.visible = True
+        render.update(export_progress)
+        render.flush()
+        last_percent = [-1]
+
+        def report_progress(done, total):
+            # تحديث الشريط عند تغير النسبة فقط وليس مع كل دفعة
+            percent = done * 100 // total if total else 100
+            if percent != last_percent[0]:
+                last_percent[0] = percent
+                export_progress.value = percent / 100
+                render.update(export_progress)
 
-    def export_data():
         try:
-            export_path = data_dir / f"alka_backup_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(export_path, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'oil_types': oil_types,
-                    'changes': load_changes_history()
-                }, f, ensure_ascii=False, indent=2)
-            show_snackbar(page, "تم تصدير البيانات بنجاح", ThemeColors.SUCCESS)
+            import exporter
+            export_path = await run_io(exporter.export_data, progress=report_progress)
+            show_snackbar(page, f"تم تصدير البيانات بنجاح: {export_path.name}", ThemeColors.SUCCESS)
         except Exception as e:
             show_snackbar(page, f"خطأ في تصدير البيانات: {str(e)}", ThemeColors.ERROR)
+        finally:
+            export_progress.visible = False
+            render.update(export_progress)
+
+    def pick_import_file():
+        import_picker.pick_files(
+            dialog_title="اختر ملف النسخة الاحتياطية",
+            allowed_extensions=["ndjson", "csv", "json", "gz"],
+        )
+
+    @render.event()
+    async def on_import_file_picked(e):
+        if not e.files:
+            return
+        export_progress.value = None  # شريط غير محدد أثناء الاستيراد
+        export_progress.visible = True
+        render.update(export_progress)
+        render.flush()
+        try:
+            import importer
+            summary = await run_io(importer.import_data, e.files[0].path)
+            inserted = sum(table["inserted"] for table in summary.values())
+            rejected = sum(table["rejected"] for table in summary.values())
+            skipped = sum(table["read"] - table["inserted"] for table in summary.values()) - rejected
+
+            # إعادة تحميل أنواع الزيوت لأن الاستيراد قد يضيف أنواعاً جديدة
+            catalog.invalidate()
+            await sync_catalog(publish=True)
+
+            # السيارات المستوردة تظهر في القائمة دون إعادة تشغيل التطبيق
+            states, vehicle_rows = await run_read(load_vehicle_data)
+            fleet.load(states)
+            vehicles.clear()
+            vehicles.update((row[0], row) for row in vehicle_rows)
+            refresh_vehicle_options()
+            select_vehicle(active_vehicle["id"] if active_vehicle["id"] in vehicles else max(vehicles, default=None))
+            store_snapshot()
+            await refresh_predictions()
+
+            message = f"تم استيراد {inserted} سجل، وتجاهل {skipped} سجل مكرر"
+            if rejected:
+                message += f"، ورفض {rejected} سجل لسيارات غير موجودة في الملف"
+            show_snackbar(page, message, ThemeColors.SUCCESS)
+        except Exception as e:
+            show_snackbar(page, f"خطأ في استيراد البيانات: {str(e)}", ThemeColors.ERROR)
+        finally:
+            export_progress.visible = False
+            render.update(export_progress)
+
+    # منتقي الملفات يضاف مرة واحدة، فالرسائل والحوارات لا تمسح overlay
+    import_picker = FilePicker(on_result=on_import_file_picked)
+    page.overlay.append(import_picker)
 
-    def load_changes_history():
-        conn = sqlite3.connect(str(db_path))
-        c = conn.cursor()
-        c.execute("SELECT * FROM oil_changes ORDER BY change_date DESC")
-        history = c.fetchall()
-        conn.close()
-        return history
+    def store_snapshot():
+        # نسخة من البيانات المعروضة لبناء الإطار الأول في التشغيل القادم
+        submit_io(save_snapshot, dict(oil_types), dict(vehicles), fleet.snapshot())
 
+    @render.event()
     def update_ui(e=None):
         if oil_dropdown.value:
             update_oil_info(oil_dropdown.value)
-        page.update()
-
-    def get_kilometer_input_color(oil_type, km):
-        try:
-            # التحقق من وجود نوع الزيت في القاموس
-            if oil_type not in oil_types:
-                return ThemeColors.PRIMARY
-            
-            # جلب كمية الزيت المتبقية
-            remaining_oil = oil_types[oil_type]["liter_capacity"]
-            
-            # تحديد اللون بناءً على كمية الزيت المتبقية
-            if remaining_oil <= 1:  # أقل من لتر واحد
-                return ThemeColors.ERROR  # أحمر (خطأ)
-            elif remaining_oil <= 2:  # بين لتر وليترين
-                return ThemeColors.WARNING  # برتقالي (تحذير)
-            
-            return ThemeColors.PRIMARY  # أزرق (الحالة الطبيعية)
-        except Exception as e:
-            print(f"خطأ في حساب لون العداد: {e}")
-            return ThemeColors.PRIMARY
 
     oil_dropdown.on_change = on_dropdown_change
     add_reading_btn.on_click = lambda e: show_add_reading_dialog()
@@ -1151,20 +986,74 @@ def main(page: Page):
     
     # إضافة وظيفة إضافة نوع زيت جديد وعرض السجل للقائمة
     page.appbar.actions[0].items[0].on_click = lambda e: show_add_oil_type_dialog()
-    page.appbar.actions[0].items[2].on_click = lambda e: show_history_dialog()
+    page.appbar.actions[0].items[2].on_click = lambda e: page.run_task(show_history_dialog)
     
     # تحديث أولي للواجهة
     if len(oil_types) > 0:
         first_oil = list(oil_types.keys())[0]
         oil_dropdown.value = first_oil
         update_oil_info(first_oil)
-    page.update()
+
+    # اختيار السيارة من الأسطول
+    vehicle_dropdown = Dropdown(
+        label="السيارة",
+        hint_text="اختر السيارة",
+        prefix_icon=Icons.DIRECTIONS_CAR,
+        border_color=ThemeColors.PRIMARY,
+        focused_border_color=ThemeColors.PRIMARY,
+    )
+    vehicle_name_text = Text("لم يتم إضافة سيارة", color=Colors.GREY_700)
+    vehicle_year_text = Text("غير محدد", color=Colors.GREY_700)
+    vehicle_mileage_text = Text("غير محدد", color=Colors.GREY_700)
+
+    def select_vehicle(vehicle_id):
+        vehicle = vehicles.get(vehicle_id)
+        active_vehicle["id"] = vehicle_id if vehicle else None
+        vehicle_dropdown.value = str(vehicle_id) if vehicle else None
+        vehicle_name_text.value = vehicle[1] if vehicle else "لم يتم إضافة سيارة"
+        vehicle_year_text.value = str(vehicle[2]) if vehicle else "غير محدد"
+        vehicle_mileage_text.value = f"{vehicle[3]} كم" if vehicle else "غير محدد"
+        render.update(vehicle_dropdown, vehicle_name_text, vehicle_year_text, vehicle_mileage_text, oil_dropdown)
+
+        # عرض نوع الزيت المركب في السيارة إن وجد
+        state = fleet.get(active_vehicle["id"])
+        if state and state["oil_type"] in oil_types:
+            oil_dropdown.value = state["oil_type"]
+        if oil_dropdown.value:
+            update_oil_info(oil_dropdown.value)
+
+    def refresh_vehicle_options():
+        vehicle_dropdown.options = [
+            dropdown.Option(key=str(vehicle_id), text=f"{vehicle[1]} ({vehicle[2]})")
+            for vehicle_id, vehicle in vehicles.items()
+        ]
+
+    @render.event()
+    async def on_vehicle_added(vehicle_id):
+        vehicle = await run_read(get_repository().get_vehicle_info, vehicle_id)
+        vehicles[vehicle_id] = vehicle
+        fleet.set(vehicle_id, None, vehicle[3], DEFAULT_OIL_INTERVAL)
+        refresh_vehicle_options()
+        select_vehicle(vehicle_id)
+        store_snapshot()
+        await refresh_predictions()
+
+    @render.event()
+    def on_vehicle_change(e):
+        if e.data:
+            select_vehicle(int(e.data))
+            page.run_task(refresh_predictions)
+
+    vehicle_dropdown.on_change = on_vehicle_change
+    refresh_vehicle_options()
+    if vehicles:
+        # آخر سيارة مضافة هي المختارة عند البدء
+        select_vehicle(max(vehicles))
+
+    notifications_holder = Container()
 
     # إنشاء قسم المعلومات الرئيسي مع تصميم محسن
     def create_dashboard_section():
-        # استرجاع معلومات السيارة
-        vehicle = get_vehicle_info()
-        
         # بطاقة معلومات السيارة
         vehicle_card = create_pro_card(
             Column([
@@ -1174,7 +1063,7 @@ def main(page: Page):
                     IconButton(
                         icon=Icons.ADD,
                         icon_color=ThemeColors.PRIMARY,
-                        on_click=lambda e: add_vehicle_dialog(page, show_snackbar)
+                        on_click=lambda e: add_vehicle_dialog(page, on_vehicle_added)
                     ),
                     IconButton(
                         icon=Icons.TIRE_REPAIR,
@@ -1185,23 +1074,24 @@ def main(page: Page):
                 ], alignment=MainAxisAlignment.SPACE_BETWEEN),
                 Divider(height=1, color=Colors.BLACK12),
                 Container(height=10),
+                vehicle_dropdown,
                 Row([
                     Text("نوع السيارة:", weight=FontWeight.W_500),
-                    Text(vehicle[1] if vehicle else "لم يتم إضافة سيارة", color=Colors.GREY_700),
+                    vehicle_name_text,
                 ], alignment=MainAxisAlignment.SPACE_BETWEEN),
                 Row([
                     Text("سنة الصنع:", weight=FontWeight.W_500),
-                    Text(str(vehicle[2]) if vehicle else "غير محدد", color=Colors.GREY_700),
+                    vehicle_year_text,
                 ], alignment=MainAxisAlignment.SPACE_BETWEEN),
                 Row([
                     Text("الكيلومترات الحالية:", weight=FontWeight.W_500),
-                    Text(f"{vehicle[3]} كم" if vehicle else "غير محدد", color=Colors.GREY_700),
+                    vehicle_mileage_text,
                 ], alignment=MainAxisAlignment.SPACE_BETWEEN),
             ], spacing=10)
         )
 
-        # بطاقة التنبيهات والإشعارات
-        notifications_card = create_notifications_card()
+        # بطاقة التنبيهات والإشعارات، يعاد بناؤها بعد تحميل البيانات
+        notifications_holder.content = create_notifications_card()
 
         # زر المزيد من التفاصيل
         more_details_btn = TextButton(
@@ -1219,19 +1109,37 @@ def main(page: Page):
         return Column([
             vehicle_card,
             Container(height=20),
-            notifications_card,
+            notifications_holder,
             Container(height=20),
             more_details_btn
         ])
 
+    def current_due(selected_oil):
+        # توقع السيارة المختارة، أو نوع الزيت عند عدم اختيار سيارة
+        if active_vehicle["id"] in fleet:
+            return predictions.get("vehicles", {}).get(active_vehicle["id"])
+        return predictions.get("oil_types", {}).get(selected_oil)
+
+    @render.event()
+    async def refresh_predictions():
+        # المعدلات تعاد فقط إذا تغير سجل القراءات، والمواعيد تحسب من المتبقي الحالي
+        try:
+            predictions.update(await run_read(predictor.predict, active_vehicle["id"]))
+            fleet_summary.update(await run_read(get_repository().fleet_summary))
+        except Exception as e:
+            log_error(e, "توقع مواعيد الصيانة")
+            return
+        notifications_holder.content = create_notifications_card()
+        render.update(notifications_holder)
+
     def create_notifications_card():
         try:
             notifications = []
             
             # فحص الزيت
             if oil_dropdown.value:
-                remaining = oil_types[oil_dropdown.value]["remaining_distance"]
-                if remaining <= 500:
+                remaining = current_remaining(oil_dropdown.value)
+                if remaining <= OIL_ALERT_THRESHOLD:
                     notifications.append(
                         Row([
                             Icon(Icons.WARNING_AMBER, color=Colors.ORANGE, size=20),
@@ -1239,13 +1147,38 @@ def main(page: Page):
                         ], spacing=10)
                     )
             
-            # إضافة تنبيهات أخرى حسب الحاجة
-            notifications.append(
-                Row([
-                    Icon(Icons.TIRE_REPAIR, color=Colors.RED, size=20),
-                    Text("فحص الإطارات مطلوب", color=Colors.RED),
-                ], spacing=10)
-            )
+                # الموعد المتوقع من معدل استخدام السيارة
+                due = current_due(oil_dropdown.value)
+                if due and due["due_date"]:
+                    notifications.append(
+                        Row([
+                            Icon(Icons.EVENT, color=ThemeColors.PRIMARY, size=20),
+                            Text(f"تغيير الزيت المتوقع: {due['due_date']:%d/%m/%Y} ({due['days_left']} يوم)"),
+                        ], spacing=10)
+                    )
+
+            # باقي سيارات الأسطول التي وصلت حد التنبيه
+            if fleet_summary.get("vehicles", 0) > 1 and fleet_summary.get("due"):
+                notifications.append(
+                    Row([
+                        Icon(Icons.DIRECTIONS_CAR, color=Colors.ORANGE, size=20),
+                        Text(f"{fleet_summary['due']} من {fleet_summary['vehicles']} سيارات تحتاج تغيير الزيت",
+                             color=Colors.ORANGE),
+                    ], spacing=10)
+                )
+
+            # الإطارات التي تجاوزت عمرها المتوقع أو يقترب موعدها
+            for wheel in predictions.get("wheels", []):
+                worn = wheel["km_used"] is not None and wheel["expected_life"] is not None \
+                    and wheel["km_used"] >= wheel["expected_life"]
+                if worn or (wheel["days_left"] is not None and wheel["days_left"] <= WHEEL_ALERT_DAYS):
+                    when = "الآن" if worn or not wheel["due_date"] else f"قبل {wheel['due_date']:%d/%m/%Y}"
+                    notifications.append(
+                        Row([
+                            Icon(Icons.TIRE_REPAIR, color=Colors.RED, size=20),
+                            Text(f"تغيير الإطارات ({wheel['wheel_type']}) {when}", color=Colors.RED),
+                        ], spacing=10)
+                    )
             
             return create_pro_card(
                 Column([
@@ -1262,7 +1195,11 @@ def main(page: Page):
             print(f"خطأ في إنشاء بطاقة التنبيهات: {e}")
             return Container()  # إرجاع حاوية فارغة في حالة الخطأ
 
-    def show_details_dialog(e):
+    def build_details_dialog():
+        last_change_text = Text()
+        grade_text = Text()
+        next_change_text = Text()
+        due_date_text = Text()
         details_dialog = AlertDialog(
             title=Text("تفاصيل إضافية", weight=FontWeight.BOLD),
             content=Column([
@@ -1276,16 +1213,20 @@ def main(page: Page):
                     rows=[
                         DataRow([
                             DataCell(Text("آخر تغيير زيت")),
-                            DataCell(Text("15/03/2023"))
+                            DataCell(last_change_text)
                         ]),
                         DataRow([
                             DataCell(Text("نوع الزيت")),
-                            DataCell(Text("10W-40"))
+                            DataCell(grade_text)
                         ]),
                         DataRow([
                             DataCell(Text("الكيلومترات القادمة للتغيير")),
-                            DataCell(Text("5000 كم"))
-                        ])
+                            DataCell(next_change_text)
+                        ]),
+                        DataRow([
+                            DataCell(Text("الموعد المتوقع للتغيير")),
+                            DataCell(due_date_text)
+                        ]),
                     ]
                 )
             ], width=400, height=300),
@@ -1293,9 +1234,89 @@ def main(page: Page):
                 TextButton("إغلاق", on_click=lambda e: close_dialog(e, details_dialog))
             ]
         )
-        page.overlay.append(details_dialog)
-        details_dialog.open = True
-        page.update()
+        details_dialog.data = (last_change_text, grade_text, next_change_text, due_date_text)
+        return details_dialog
+
+    @render.event()
+    def show_details_dialog(e):
+        dialog = dialogs.get("details", build_details_dialog)
+        last_change_text, grade_text, next_change_text, due_date_text = dialog.data
+
+        selected_oil = oil_dropdown.value if oil_dropdown.value in oil_types else None
+        vehicle = vehicles.get(active_vehicle["id"])
+        due = current_due(selected_oil) if selected_oil else None
+        last_change_text.value = (vehicle[4] if vehicle else None) or "غير محدد"
+        grade_text.value = oil_types[selected_oil]["grade"] if selected_oil else "غير محدد"
+        next_change_text.value = f"{int(current_remaining(selected_oil))} كم" if selected_oil else "غير محدد"
+        due_date_text.value = f"{due['due_date']:%d/%m/%Y}" if due and due["due_date"] else "لا توجد قراءات كافية"
+        dialogs.open(dialog)
+
+    # عنصر لوحة الأداء لا يضاف للقائمة إلا بعد الضغط المطول على أيقونة التطبيق
+    performance_item = PopupMenuItem(
+        text="الأداء",
+        icon=Icons.INSIGHTS,
+        on_click=lambda e: show_performance_dialog()
+    )
+
+    @render.event()
+    def reveal_performance_item():
+        menu = page.appbar.actions[0]
+        if performance_item not in menu.items:
+            menu.items.append(performance_item)
+            render.update(menu)
+            show_snackbar(page, "تم إظهار لوحة الأداء في القائمة")
+
+    def performance_lines() -> list:
+        lines = [f"{name}: {data['count']}× p50 {data['p50_ms']} p95 {data['p95_ms']} "
+                 f"أقصى {data['max_ms']} ms"
+                 for name, data in perf.snapshot().items()]
+        writer_metrics = writer.metrics()
+        if writer_metrics:
+            lines.append(f"الكاتب: {writer_metrics['commits']} حفظ لـ {writer_metrics['operations']} عملية، "
+                         f"{writer_metrics['commits_per_s']} حفظ/ث، متوسط الدفعة {writer_metrics['batch_avg']}")
+        lines.extend(f"حدث {name}: {counts['events']}× بمتوسط {counts['per_event']} تحديث"
+                     for name, counts in render.report().items())
+        return lines
+
+    def build_performance_dialog():
+        rows = ListView(height=400, spacing=6)
+
+        @render.event("export_performance")
+        async def export_performance(e):
+            try:
+                path = data_dir / PERF_REPORT_NAME.format(datetime.datetime.now())
+                await run_io(perf.dump, path, render=render.report(), writer=writer.metrics())
+                show_snackbar(page, f"تم حفظ تقرير الأداء: {path.name}", ThemeColors.SUCCESS)
+            except Exception as ex:
+                show_error(page, ex, "تصدير تقرير الأداء")
+
+        @render.event("reset_performance")
+        def reset_performance(e):
+            perf.reset()
+            fill_performance_rows(rows)
+            render.update(rows)
+
+        dialog = AlertDialog(
+            title=Text("الأداء", size=20, weight=FontWeight.BOLD, color=ThemeColors.PRIMARY),
+            content=Container(content=rows, width=450),
+            actions=[
+                TextButton("تصدير JSON", on_click=export_performance),
+                TextButton("تصفير", on_click=reset_performance),
+                TextButton("إغلاق", on_click=lambda e: close_dialog(e, dialog)),
+            ],
+        )
+        dialog.data = rows
+        return dialog
+
+    def fill_performance_rows(rows):
+        rows.controls = [Text(line, size=12, selectable=True) for line in performance_lines()] \
+            or [Text("لا توجد قياسات بعد", color=Colors.GREY_700)]
+
+    @render.event()
+    def show_performance_dialog():
+        dialog = dialogs.get("performance", build_performance_dialog)
+        fill_performance_rows(dialog.data)
+        dialogs.open(dialog)
 
     # إضافة قسم المعلومات الرئيسي للصفحة
     page.add(
@@ -1310,11 +1331,12 @@ def main(page: Page):
             create_pro_card(
                 Column([
                     Image(
-                        src="https://cdn-icons-png.flaticon.com/512/3202/3202926.png",
+                        src=APP_ICON,
                         width=100,
                         height=100,
                         fit=ImageFit.CONTAIN,
                         border_radius=50,
+                        error_content=Icon(Icons.OIL_BARREL, color=ThemeColors.PRIMARY, size=80),
                     ),
                     Text(
                         "ALKA Oil Tracker",
@@ -1342,78 +1364,49 @@ def main(page: Page):
             oil_info,
             Container(height=20),
             add_reading_btn,
+            export_progress,
         ], horizontal_alignment=CrossAxisAlignment.CENTER, spacing=10)
     )
 
-    def show_add_wheel_dialog(page, e):
-        wheel_type = TextField(
-            label="نوع الإطارات",
-            prefix_icon=Icons.TIRE_REPAIR,
-            width=300,
-            border_color=ThemeColors.PRIMARY
-        )
-        install_date = TextField(
-            label="تاريخ التركيب",
-            prefix_icon=Icons.CALENDAR_TODAY,
-            width=300,
-            border_color=ThemeColors.PRIMARY
-        )
-        expected_life = TextField(
-            label="العمر المتوقع (كم)",
-            prefix_icon=Icons.SPEED,
-            width=300,
-            keyboard_type=KeyboardType.NUMBER,
-            border_color=ThemeColors.PRIMARY
-        )
-
-        def close_dlg(e):
-            dlg.open = False
-            page.update()
-
-        def save_wheel(e):
-            try:
-                conn = sqlite3.connect(str(db_path))
-                c = conn.cursor()
-                c.execute('''INSERT INTO wheels (wheel_type, install_date, expected_life) 
-                            VALUES (?, ?, ?)''', 
-                         (wheel_type.value, install_date.value, int(expected_life.value)))
-                conn.commit()
-                conn.close()
-                dlg.open = False
-                page.update()
-                show_snackbar(page, "تم حفظ معلومات الإطارات بنجاح", ThemeColors.SUCCESS)
-            except Exception as ex:
-                show_snackbar(page, f"خطأ: {str(ex)}", ThemeColors.ERROR)
+    page.appbar.actions[0].items[1].on_click = lambda e: show_wheel_dialog(page, e)
+    render.update()
+    timer.mark("first_frame")
 
-        dlg = AlertDialog(
-            modal=True,
-            title=Text("إضافة معلومات الإطارات"),
-            content=Container(
-                content=Column(
-                    [wheel_type, install_date, expected_life],
-                    tight=True,
-                    spacing=20,
-                ),
-                padding=padding.all(20),
-            ),
-            actions=[
-                TextButton("إلغاء", on_click=close_dlg),
-                ElevatedButton(
-                    "حفظ",
-                    on_click=save_wheel,
-                    style=ButtonStyle(bgcolor=ThemeColors.PRIMARY)
-                )
-            ],
-            actions_alignment=MainAxisAlignment.END,
-        )
-        page.dialog = dlg
-        dlg.open = True
-        page.update()
+    @render.event()
+    async def finish_startup():
+        # ترحيل قاعدة البيانات وقراءتها بعد ظهور الإطار الأول
+        try:
+            catalog_snapshot, states, vehicle_rows = await run_read(load_startup_data)
+        except Exception as e:
+            show_error(page, e, "تحميل البيانات")
+            return
+        timer.mark("db_ready")
+
+        fleet.load(states)
+        vehicles.clear()
+        vehicles.update((row[0], row) for row in vehicle_rows)
+        apply_catalog(*catalog_snapshot)
+        refresh_vehicle_options()
+        select_vehicle(active_vehicle["id"] if active_vehicle["id"] in vehicles else max(vehicles, default=None))
+        notifications_holder.content = create_notifications_card()
+        render.update(notifications_holder)
+        render.flush()
+        timer.mark("data_loaded")
+
+        store_snapshot()
+        await run_io(timer.report, cached=bool(snapshot), vehicles=len(vehicles))
+        await refresh_predictions()
+
+        # تنزيل صور الزيوت البعيدة مرة واحدة، وتعرض من القرص في المرات القادمة
+        if await run_io(prefetch_images, [data.get("image") for data in oil_types.values()]):
+            update_oil_info(oil_dropdown.value)
 
-    page.appbar.actions[0].items[1].on_click = lambda e: show_add_wheel_dialog(page, e)
+    page.run_task(finish_startup)
 
 if __name__ == "__main__":
+    init_logging()
+    logging.info("تم بدء تشغيل تطبيق ALKA Oil Tracker")
     try:
-        app(target=main)
+        app(target=main, assets_dir="assets")
     except Exception as e:
         logging.error(f"خطأ حرج في التطبيق: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,404 @@
+"""ترحيل مخطط قاعدة البيانات تدريجياً بالاعتماد على PRAGMA user_version"""
+import logging
+import os
+import sqlite3
+
+import summary
+
+# القيم الافتراضية لأنواع الزيوت التي تضاف عند إنشاء قاعدة بيانات جديدة
+DEFAULT_OIL_TYPES = {
+    "زيت 10W-40": {
+        "max_distance": 5000,
+        "remaining_distance": 5000,
+        "image": "",
+        "liter_capacity": 4,
+        "grade": "10W-40"
+    },
+    "زيت 5W-30": {
+        "max_distance": 6000,
+        "remaining_distance": 6000,
+        "image": "",
+        "liter_capacity": 5,
+        "grade": "5W-30"
+    }
+}
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> set:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _add_column_if_missing(conn: sqlite3.Connection, table: str, column: str, declaration: str):
+    """إضافة عمود لجدول قائم دون نسخ الجدول أو حذفه"""
+    if column not in _table_columns(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+
+# السجلات المكررة التي تحذفها خطوات الترحيل تنقل إلى هذا الجدول أولاً، فلا يضيع أي صف
+_REMOVED_TABLE_DDL = """CREATE TABLE IF NOT EXISTS oil_changes_removed
+                        (id INTEGER PRIMARY KEY,
+                         oil_type TEXT, change_date TEXT,
+                         kilometer_reading INTEGER,
+                         vehicle_type TEXT,
+                         vehicle_id INTEGER,
+                         schema_version INTEGER NOT NULL,
+                         removed_at TEXT NOT NULL)"""
+
+
+def _move_duplicates(conn: sqlite3.Connection, schema_version: int, condition: str) -> int:
+    """نقل صفوف oil_changes المطابقة لـ condition إلى oil_changes_removed ثم حذفها
+
+    الخطوات الجديدة تستخدمها بدلاً من الحذف المباشر، فالصفوف المحذوفة تبقى محفوظة للمراجعة
+    """
+    conn.execute(_REMOVED_TABLE_DDL)
+    # vehicle_id يضاف في الإصدار 4، فالخطوات الأقدم تنقل الصفوف بدونه
+    vehicle_id = "vehicle_id" if "vehicle_id" in _table_columns(conn, "oil_changes") else "NULL"
+    conn.execute(f"""INSERT OR IGNORE INTO oil_changes_removed
+                     (id, oil_type, change_date, kilometer_reading, vehicle_type, vehicle_id,
+                      schema_version, removed_at)
+                     SELECT id, oil_type, change_date, kilometer_reading, vehicle_type, {vehicle_id},
+                            ?, datetime('now', 'localtime')
+                     FROM oil_changes
+                     WHERE {condition}""", (schema_version,))
+    removed = conn.execute(f"DELETE FROM oil_changes WHERE {condition}").rowcount
+    if removed:
+        logging.warning(f"الترحيل {schema_version}: نقل {removed} سجل مكرر إلى oil_changes_removed")
+    return removed
+
+
+def _v1_base_schema(conn: sqlite3.Connection):
+    # الجداول الأساسية كما كانت تنشئها init_db سابقاً
+    conn.execute('''CREATE TABLE IF NOT EXISTS oil_types
+                    (name TEXT PRIMARY KEY, max_distance INTEGER,
+                     remaining_distance INTEGER, image TEXT,
+                     liter_capacity REAL, grade TEXT)''')
+
+    conn.execute('''CREATE TABLE IF NOT EXISTS oil_changes
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     oil_type TEXT, change_date TEXT,
+                     kilometer_reading INTEGER,
+                     vehicle_type TEXT DEFAULT 'سيارة خاصة')''')
+
+    conn.execute('''CREATE TABLE IF NOT EXISTS vehicles
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     car_type TEXT,
+                     manufacture_year INTEGER,
+                     current_mileage INTEGER,
+                     last_oil_change_date TEXT,
+                     next_oil_change_mileage INTEGER)''')
+
+    conn.execute('''CREATE TABLE IF NOT EXISTS wheels
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     wheel_type TEXT,
+                     install_date TEXT,
+                     expected_life INTEGER)''')
+
+    # قواعد البيانات القديمة قد لا تحتوي على الحقول المضافة لاحقاً
+    _add_column_if_missing(conn, "oil_types", "liter_capacity", "REAL")
+    _add_column_if_missing(conn, "oil_types", "grade", "TEXT")
+    _add_column_if_missing(conn, "oil_changes", "vehicle_type", "TEXT DEFAULT 'سيارة خاصة'")
+
+    # إضافة البيانات الافتراضية دون المساس بالقيم المحفوظة
+    conn.executemany("""INSERT OR IGNORE INTO oil_types
+                        (name, max_distance, remaining_distance, image, liter_capacity, grade)
+                        VALUES (?, ?, ?, ?, ?, ?)""",
+                     [(name, data["max_distance"], data["remaining_distance"],
+                       data["image"], data["liter_capacity"], data["grade"])
+                      for name, data in DEFAULT_OIL_TYPES.items()])
+
+
+def _v2_history_indexes(conn: sqlite3.Connection):
+    # فهارس لعرض السجل مرتباً حسب التاريخ دون مسح الجدول كاملاً
+    # المعرّف id هو rowid فيدخل ضمنياً في كل فهرس ويكمل مفتاح الترتيب
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_oil_changes_date ON oil_changes (change_date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_oil_changes_oil_type_date ON oil_changes (oil_type, change_date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_oil_changes_vehicle_type_date ON oil_changes (vehicle_type, change_date)")
+
+
+def _v3_import_keys(conn: sqlite3.Connection):
+    # إزالة التكرار القديم قبل فرض المفتاح الطبيعي، ويبقى أقدم سجل
+    conn.execute("""DELETE FROM oil_changes
+                    WHERE id NOT IN (SELECT MIN(id) FROM oil_changes
+                                     GROUP BY change_date, oil_type, vehicle_type, kilometer_reading)""")
+    conn.execute("""CREATE UNIQUE INDEX IF NOT EXISTS ux_oil_changes_natural_key
+                    ON oil_changes (change_date, oil_type, vehicle_type, kilometer_reading)""")
+    # فهارس لفحص تكرار السيارات والإطارات عند الاستيراد
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vehicles_car_type ON vehicles (car_type, manufacture_year)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_wheels_wheel_type ON wheels (wheel_type, install_date)")
+
+
+def _v4_vehicle_oil_state(conn: sqlite3.Connection):
+    # حالة الزيت لكل سيارة بدلاً من المسافة المتبقية العامة في oil_types
+    conn.execute("""CREATE TABLE IF NOT EXISTS vehicle_oil_state
+                    (vehicle_id INTEGER PRIMARY KEY REFERENCES vehicles(id) ON DELETE CASCADE,
+                     oil_type TEXT REFERENCES oil_types(name),
+                     last_change_km INTEGER,
+                     remaining_distance INTEGER,
+                     updated_at TEXT)""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vehicle_oil_state_oil_type ON vehicle_oil_state (oil_type)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vehicle_oil_state_remaining ON vehicle_oil_state (remaining_distance)")
+
+    # ربط سجل التغييرات بالسيارة
+    _add_column_if_missing(conn, "oil_changes", "vehicle_id", "INTEGER REFERENCES vehicles(id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_oil_changes_vehicle_date ON oil_changes (vehicle_id, change_date)")
+
+    # السيارات الموجودة تبدأ من موعد التغيير المحفوظ لها
+    conn.execute("""INSERT OR IGNORE INTO vehicle_oil_state
+                    (vehicle_id, oil_type, last_change_km, remaining_distance, updated_at)
+                    SELECT id, NULL, current_mileage,
+                           MAX(0, COALESCE(next_oil_change_mileage - current_mileage, 5000)),
+                           datetime('now', 'localtime')
+                    FROM vehicles""")
+
+
+def _v5_vehicle_natural_key(conn: sqlite3.Connection):
+    # سيارتان مختلفتان قد تسجلان نفس المسافة في نفس الوقت، فرقم السيارة جزء من المفتاح
+    conn.execute("DROP INDEX IF EXISTS ux_oil_changes_natural_key")
+    conn.execute("""CREATE UNIQUE INDEX IF NOT EXISTS ux_oil_changes_natural_key
+                    ON oil_changes (change_date, oil_type, vehicle_type, kilometer_reading,
+                                    IFNULL(vehicle_id, 0))""")
+
+
+def _v6_null_oil_type_key(conn: sqlite3.Connection):
+    # قراءات السيارات قد تأتي بلا نوع زيت، و NULL لا يتطابق مع نفسه في الفهرس الفريد
+    conn.execute("""DELETE FROM oil_changes
+                    WHERE id NOT IN (SELECT MIN(id) FROM oil_changes
+                                     GROUP BY change_date, IFNULL(oil_type, ''), vehicle_type,
+                                              kilometer_reading, IFNULL(vehicle_id, 0))""")
+    conn.execute("DROP INDEX IF EXISTS ux_oil_changes_natural_key")
+    conn.execute("""CREATE UNIQUE INDEX IF NOT EXISTS ux_oil_changes_natural_key
+                    ON oil_changes (change_date, IFNULL(oil_type, ''), vehicle_type, kilometer_reading,
+                                    IFNULL(vehicle_id, 0))""")
+
+
+def _v7_fleet_summary(conn: sqlite3.Connection):
+    # مجاميع محفوظة تحدث مع كل كتابة، فلا تمسح لوحة المعلومات سجل التغييرات كاملاً
+    conn.execute("""CREATE TABLE IF NOT EXISTS vehicle_summary
+                    (vehicle_id INTEGER PRIMARY KEY REFERENCES vehicles(id) ON DELETE CASCADE,
+                     oil_type TEXT,
+                     readings_count INTEGER NOT NULL DEFAULT 0,
+                     total_km REAL NOT NULL DEFAULT 0,
+                     km_since_change REAL NOT NULL DEFAULT 0,
+                     last_reading_at TEXT,
+                     due INTEGER NOT NULL DEFAULT 0)""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vehicle_summary_due ON vehicle_summary (due)")
+    conn.execute("""CREATE TABLE IF NOT EXISTS oil_type_summary
+                    (oil_type TEXT PRIMARY KEY,
+                     readings_count INTEGER NOT NULL DEFAULT 0,
+                     total_km REAL NOT NULL DEFAULT 0,
+                     km_since_change REAL NOT NULL DEFAULT 0,
+                     last_reading_at TEXT,
+                     due INTEGER NOT NULL DEFAULT 0)""")
+
+    # المجاميع تعبأ من السجل الموجود بعد آخر خطوة
+    return True
+
+
+def _v8_reading_idempotency_key(conn: sqlite3.Connection):
+    # قراءة السيارة تعرف بالسيارة ووقت فتح الحوار والمسافة، فالضغط المزدوج أو إعادة المحاولة
+    # لا يضيف صفاً ثانياً حتى لو تغير نوع السيارة أو الزيت بينهما
+    removed = conn.execute("""DELETE FROM oil_changes
+                              WHERE vehicle_id IS NOT NULL
+                                AND id NOT IN (SELECT MIN(id) FROM oil_changes
+                                               WHERE vehicle_id IS NOT NULL
+                                               GROUP BY vehicle_id, change_date, kilometer_reading)""").rowcount
+    conn.execute("""CREATE UNIQUE INDEX IF NOT EXISTS ux_oil_changes_idempotency
+                    ON oil_changes (vehicle_id, change_date, kilometer_reading)
+                    WHERE vehicle_id IS NOT NULL""")
+    return removed > 0
+
+
+# المسافة من أعلى قراءة سابقة بالتاريخ، وليس من LAG حتى لا تحسب من قراءة متراجعة
+# وعلم للقراءة الأقل من سابقتها (rollback) أو التي وصلت بعد قراءة أحدث منها (out_of_order).
+# {readings} مصدر القراءات: الجدول كله للعرض، أو استعلام فرعي مقيد بسيارات معينة لأن SQLite
+# لا يدفع شرط السيارة داخل دالة النافذة فيحسبها لكل السجل عند التقييد من خارج العرض
+OIL_READING_DELTAS_SQL = """SELECT id, vehicle_id, reading_date, reading_km, oil_type, previous_km,
+                                   CASE WHEN reading_km >= previous_km THEN reading_km - previous_km END AS delta_km,
+                                   CASE WHEN reading_km < previous_km THEN 'rollback'
+                                        WHEN reading_date < latest_before THEN 'out_of_order' END AS flag
+                            FROM (SELECT *,
+                                         MAX(reading_km) OVER (PARTITION BY vehicle_id ORDER BY reading_date, id
+                                                               ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING)
+                                             AS previous_km,
+                                         MAX(reading_date) OVER (PARTITION BY vehicle_id ORDER BY id
+                                                                 ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING)
+                                             AS latest_before
+                                  FROM {readings})"""
+
+
+def _create_reading_deltas_view(conn: sqlite3.Connection):
+    conn.execute(f"CREATE VIEW oil_reading_deltas AS {OIL_READING_DELTAS_SQL.format(readings='oil_readings')}")
+
+
+def _create_oil_readings_constraints(conn: sqlite3.Connection):
+    # المفتاح الفريد يغطي استعلامات المدى (السيارة, الوقت) ويرجع المسافة من الفهرس وحده
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_oil_readings_vehicle_km ON oil_readings (vehicle_id, reading_km)")
+    conn.execute("""CREATE UNIQUE INDEX IF NOT EXISTS ux_oil_readings_natural_key
+                    ON oil_readings (vehicle_id, reading_date, reading_km)""")
+
+    # السجل للإضافة فقط، والنقل للأرشيف يوقف هذه القيود داخل معاملته
+    conn.execute("""CREATE TRIGGER IF NOT EXISTS oil_readings_no_update BEFORE UPDATE ON oil_readings
+                    BEGIN SELECT RAISE(ABORT, 'oil_readings is append-only'); END""")
+    conn.execute("""CREATE TRIGGER IF NOT EXISTS oil_readings_no_delete BEFORE DELETE ON oil_readings
+                    BEGIN SELECT RAISE(ABORT, 'oil_readings is append-only'); END""")
+
+
+def _v9_odometer_readings(conn: sqlite3.Connection):
+    # قراءات العداد المطلقة لكل سيارة، والمسافة بين قراءتين تحسب منها عند الحاجة
+    conn.execute("""CREATE TABLE IF NOT EXISTS oil_readings
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     vehicle_id INTEGER NOT NULL REFERENCES vehicles(id) ON DELETE CASCADE,
+                     reading_date TEXT NOT NULL,
+                     reading_km INTEGER NOT NULL,
+                     oil_type TEXT)""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_oil_readings_vehicle_km ON oil_readings (vehicle_id, reading_km)")
+    conn.execute("""CREATE UNIQUE INDEX IF NOT EXISTS ux_oil_readings_natural_key
+                    ON oil_readings (vehicle_id, reading_date, reading_km)""")
+
+    conn.execute("DROP VIEW IF EXISTS oil_reading_deltas")
+    _create_reading_deltas_view(conn)
+
+    # قراءة أساس لكل سيارة موجودة حتى تحسب مسافة أول قراءة حقيقية
+    conn.execute("""INSERT OR IGNORE INTO oil_readings (vehicle_id, reading_date, reading_km, oil_type)
+                    SELECT v.id, IFNULL(v.last_oil_change_date, datetime('now', 'localtime')),
+                           v.current_mileage, s.oil_type
+                    FROM vehicles v
+                    LEFT JOIN vehicle_oil_state s ON s.vehicle_id = v.id
+                    WHERE v.current_mileage IS NOT NULL""")
+
+
+def _v10_oil_readings_epoch(conn: sqlite3.Connection):
+    # وقت القراءة عدد صحيح (ثواني يونكس) بدلاً من نص ISO: مقارنة أسرع وفهرس أصغر
+    conn.execute("DROP VIEW IF EXISTS oil_reading_deltas")
+    conn.execute("ALTER TABLE oil_readings RENAME TO oil_readings_v9")
+    conn.execute("""CREATE TABLE oil_readings
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     vehicle_id INTEGER NOT NULL REFERENCES vehicles(id),
+                     reading_date INTEGER NOT NULL,
+                     reading_km INTEGER NOT NULL,
+                     oil_type TEXT)""")
+    conn.execute("""INSERT OR IGNORE INTO oil_readings (id, vehicle_id, reading_date, reading_km, oil_type)
+                    SELECT id, vehicle_id, CAST(strftime('%s', reading_date, 'utc') AS INTEGER),
+                           reading_km, oil_type
+                    FROM oil_readings_v9
+                    WHERE strftime('%s', reading_date, 'utc') IS NOT NULL
+                    ORDER BY id""")
+    conn.execute("DROP TABLE oil_readings_v9")
+
+    _create_oil_readings_constraints(conn)
+    _create_reading_deltas_view(conn)
+
+
+def _v11_removed_duplicates(conn: sqlite3.Connection):
+    # جدول السجلات المكررة المنقولة موجود في كل قاعدة بيانات، حتى التي لم يحذف منها شيء
+    conn.execute(_REMOVED_TABLE_DDL)
+
+
+def _v12_oil_changes_keys(conn: sqlite3.Connection):
+    # المفتاح الطبيعي (الإصدار 6) ومفتاح عدم التكرار (الإصدار 8) كما يجب أن يكونا الآن، فقاعدة
+    # بيانات وصلت لهذه الإصدارات بنسخة أقدم من خطواتها تصحح هنا، والمكرر ينقل ولا يحذف
+    removed = _move_duplicates(conn, 12, """id NOT IN (SELECT MIN(id) FROM oil_changes
+                                             GROUP BY change_date, IFNULL(oil_type, ''), vehicle_type,
+                                                      kilometer_reading, IFNULL(vehicle_id, 0))""")
+    removed += _move_duplicates(conn, 12, """vehicle_id IS NOT NULL
+                                  AND id NOT IN (SELECT MIN(id) FROM oil_changes
+                                                 WHERE vehicle_id IS NOT NULL
+                                                 GROUP BY vehicle_id, change_date, kilometer_reading)""")
+    conn.execute("DROP INDEX IF EXISTS ux_oil_changes_natural_key")
+    conn.execute("""CREATE UNIQUE INDEX ux_oil_changes_natural_key
+                    ON oil_changes (change_date, IFNULL(oil_type, ''), vehicle_type, kilometer_reading,
+                                    IFNULL(vehicle_id, 0))""")
+    conn.execute("""CREATE UNIQUE INDEX IF NOT EXISTS ux_oil_changes_idempotency
+                    ON oil_changes (vehicle_id, change_date, kilometer_reading)
+                    WHERE vehicle_id IS NOT NULL""")
+    return removed > 0
+
+
+def _v13_oil_readings_cascade(conn: sqlite3.Connection):
+    # إعادة بناء الإصدار 10 أسقطت ON DELETE CASCADE من vehicle_id، فيعاد الجدول بنفس أعمدته
+    # مع القيد كما عرفه الإصدار 9. الفهارس والقيود تسقط مع الجدول القديم وتنشأ من جديد
+    conn.execute("DROP VIEW IF EXISTS oil_reading_deltas")
+    conn.execute("ALTER TABLE oil_readings RENAME TO oil_readings_v12")
+    conn.execute("""CREATE TABLE oil_readings
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     vehicle_id INTEGER NOT NULL REFERENCES vehicles(id) ON DELETE CASCADE,
+                     reading_date INTEGER NOT NULL,
+                     reading_km INTEGER NOT NULL,
+                     oil_type TEXT)""")
+    conn.execute("""INSERT INTO oil_readings (id, vehicle_id, reading_date, reading_km, oil_type)
+                    SELECT id, vehicle_id, reading_date, reading_km, oil_type
+                    FROM oil_readings_v12
+                    ORDER BY id""")
+    # الجدول الجديد يأخذ عداد القديم، فلا تعاد أرقام قراءات نقلت للأرشيف
+    conn.execute("DELETE FROM sqlite_sequence WHERE name = 'oil_readings'")
+    conn.execute("UPDATE sqlite_sequence SET name = 'oil_readings' WHERE name = 'oil_readings_v12'")
+    conn.execute("DROP TABLE oil_readings_v12")
+
+    _create_oil_readings_constraints(conn)
+    _create_reading_deltas_view(conn)
+
+
+# خطوات الترحيل مرتبة، رقم الإصدار هو موقع الخطوة في القائمة + 1
+# لا تعدّل خطوة منشورة أبداً، أضف خطوة جديدة في النهاية. الخطوة التي تغير سجل التغييرات
+# ترجع True، فتعاد تعبئة جداول الملخص مرة واحدة بعد آخر خطوة بمخطط summary.py الحالي
+# بدلاً من استدعائه من خطوة قديمة قد لا يطابق مخططها
+MIGRATIONS = [
+    _v1_base_schema,
+    _v2_history_indexes,
+    _v3_import_keys,
+    _v4_vehicle_oil_state,
+    _v5_vehicle_natural_key,
+    _v6_null_oil_type_key,
+    _v7_fleet_summary,
+    _v8_reading_idempotency_key,
+    _v9_odometer_readings,
+    _v10_oil_readings_epoch,
+    _v11_removed_duplicates,
+    _v12_oil_changes_keys,
+    _v13_oil_readings_cascade,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _backup_before_upgrade(conn: sqlite3.Connection, version: int):
+    """نسخة من ملف قاعدة البيانات قبل ترقيتها، فما تحذفه الخطوات القديمة يبقى قابلاً للاسترجاع"""
+    path = conn.execute("PRAGMA database_list").fetchone()[2]
+    if not version or not path:
+        # قاعدة بيانات جديدة أو في الذاكرة: لا شيء يحفظ
+        return
+    backup = f"{path}.v{version}.bak"
+    if not os.path.exists(backup):
+        conn.execute("VACUUM INTO ?", (backup,))
+        logging.info(f"نسخة قاعدة البيانات قبل الترحيل من الإصدار {version}: {backup}")
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """تنفيذ خطوات الترحيل الناقصة فقط وإرجاع إصدار المخطط الحالي"""
+    version = get_schema_version(conn)
+    if version >= SCHEMA_VERSION:
+        return version
+
+    _backup_before_upgrade(conn, version)
+
+    rebuild_summaries = False
+    for target, step in enumerate(MIGRATIONS[version:], start=version + 1):
+        # كل خطوة في معاملة مستقلة حتى لا يبقى المخطط في حالة وسطية
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rebuild_summaries |= bool(step(conn))
+            if target == SCHEMA_VERSION and rebuild_summaries:
+                # مع آخر خطوة في نفس المعاملة، فلا تنتهي الترقية بملخص لم يعد حسابه
+                summary.rebuild(conn)
+            conn.execute(f"PRAGMA user_version = {target}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        logging.info(f"تم ترحيل قاعدة البيانات إلى الإصدار {target}")
+
+    return SCHEMA_VERSION
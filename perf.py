@@ -0,0 +1,115 @@
+"""قياس زمن المسارات الساخنة: مدرج تكراري للزمن لكل اسم (استدعاءات قاعدة البيانات،
+page.update()، بناء الحوارات) يعرض في لوحة الأداء المخفية أو يصدّر JSON
+
+الأسماء بصيغة "الفئة:الاسم" مثل db:Repository.record_odometer أو ui:page.update.
+التسجيل رخيص (perf_counter وقفل قصير) فيبقى مفعلاً دائماً حتى على أجهزة Android البطيئة
+"""
+import datetime
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable
+
+# حدود فئات المدرج بالمللي ثانية، وما بعد آخر حد فئة أخيرة مفتوحة
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class Histogram:
+    __slots__ = ("count", "total_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def record(self, ms: float):
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.buckets[bisect_left(BUCKETS_MS, ms)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """الحد الأعلى للفئة التي تقع فيها النسبة المطلوبة، والفئة المفتوحة ترجع أقصى زمن"""
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                return min(BUCKETS_MS[index], self.max_ms) if index < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 2),
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50), 2),
+            "p95_ms": round(self.percentile(0.95), 2),
+            "max_ms": round(self.max_ms, 2),
+            "buckets": {f"<={bound}" if index < len(BUCKETS_MS) else f">{BUCKETS_MS[-1]}": count
+                        for index, (bound, count) in enumerate(zip(BUCKETS_MS + (None,), self.buckets))
+                        if count},
+        }
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: dict = {}
+        self._started = datetime.datetime.now()
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.record(seconds * 1000)
+
+    @contextmanager
+    def measure(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def snapshot(self) -> dict:
+        """المدرجات مرتبة بالزمن الكلي، الأثقل أولاً"""
+        with self._lock:
+            histograms = {name: histogram.to_dict() for name, histogram in self._histograms.items()}
+        return dict(sorted(histograms.items(), key=lambda item: item[1]["total_ms"], reverse=True))
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._started = datetime.datetime.now()
+
+    def dump(self, path: Path, **extra) -> Path:
+        """كتابة المدرجات وأي بيانات إضافية (تقرير الواجهة، مقاييس الكاتب) في ملف JSON"""
+        data = {
+            "since": self._started.isoformat(timespec="seconds"),
+            "time": datetime.datetime.now().isoformat(timespec="seconds"),
+            "histograms": self.snapshot(),
+            **extra,
+        }
+        path = Path(path)
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        return path
+
+
+def label(fn: Callable) -> str:
+    """اسم الدالة في المدرجات، والدوال المقيدة تظهر باسم صنفها (Repository.record_odometer)"""
+    return getattr(fn, "__qualname__", None) or getattr(fn, "__name__", None) or type(fn).__name__
+
+
+# مسجل واحد للعملية، تستخدمه كل الوحدات عبر الدوال التالية
+recorder = Recorder()
+record = recorder.record
+measure = recorder.measure
+snapshot = recorder.snapshot
+reset = recorder.reset
+dump = recorder.dump
@@ -0,0 +1,260 @@
+"""توقع مواعيد الصيانة من معدل الاستخدام اليومي المقدّر من سجل القراءات
+
+معدل كل سيارة (كم/يوم) هو ميل خط الانحدار للمسافة التراكمية مقابل الزمن. مجاميع الانحدار
+تحسب لكل السيارات دفعة واحدة بعمليات NumPy عند أول تحميل، ثم تحدّث بالقراءات الجديدة فقط
+"""
+import datetime
+import math
+import threading
+from typing import Optional
+
+from catalog import OilCatalog, get_catalog
+from repository import Repository, get_repository
+
+# أقل عدد قراءات وأقل مدة (يوم) لتقدير معدل موثوق
+MIN_READINGS = 2
+MIN_SPAN_DAYS = 1.0
+
+# الإطار الذي يقترب موعده خلال هذه المدة يظهر في التنبيهات
+WHEEL_ALERT_DAYS = 30
+
+# اليوم الجولياني لتاريخ يونكس 1970-01-01
+_UNIX_EPOCH_JULIAN = 2440587.5
+
+
+def _numpy():
+    # NumPy ثقيل التحميل، فلا يستورد إلا عند أول حساب
+    import numpy
+    return numpy
+
+
+# مجاميع الانحدار لكل مفتاح (رقم السيارة، أو ("oil", نوع الزيت) للقراءات بلا سيارة):
+# [العدد, Σx, Σy, Σx², Σxy, أول يوم, آخر يوم, المسافة التراكمية]
+# x الأيام منذ أول قراءة للمفتاح، و y المسافة التراكمية عند القراءة
+_N, _SX, _SY, _SXX, _SXY, _FIRST, _LAST, _TOTAL = range(8)
+
+
+def usage_sums(keys: list, days, km) -> dict:
+    """مجاميع الانحدار لكل مفتاح من سجل كامل، محسوبة دفعة واحدة بعمليات NumPy مجمّعة
+
+    keys مفتاح المجموعة لكل قراءة، days وقت القراءة باليوم، km المسافة المقطوعة في القراءة
+    """
+    np = _numpy()
+    if not len(keys):
+        return {}
+
+    unique_keys, groups = np.unique(np.asarray([str(key) for key in keys]), return_inverse=True)
+    key_of = {}
+    for key in keys:
+        key_of.setdefault(str(key), key)
+    days = np.asarray(days, dtype=np.float64)
+    km = np.asarray(km, dtype=np.float64)
+
+    # ترتيب القراءات حسب المجموعة ثم الوقت، ثم المسافة التراكمية داخل كل مجموعة
+    order = np.lexsort((days, groups))
+    groups, days, km = groups[order], days[order], km[order]
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    lengths = np.diff(np.r_[starts, len(groups)])
+    cumulative = np.cumsum(km)
+    cumulative -= np.repeat(cumulative[starts] - km[starts], lengths)
+
+    # الأيام نسبية لأول قراءة في كل مجموعة لتجنب فقد الدقة
+    x = days - np.repeat(days[starts], lengths)
+    count = np.bincount(groups)
+    sum_x = np.bincount(groups, x)
+    sum_y = np.bincount(groups, cumulative)
+    sum_xx = np.bincount(groups, x * x)
+    sum_xy = np.bincount(groups, x * cumulative)
+    ends = starts + lengths - 1
+
+    return {key_of[key]: [int(count[index]), float(sum_x[index]), float(sum_y[index]),
+                          float(sum_xx[index]), float(sum_xy[index]), float(days[starts[index]]),
+                          float(days[ends[index]]), float(cumulative[ends[index]])]
+            for index, key in enumerate(unique_keys)}
+
+
+def add_reading(sums: Optional[list], day: float, km: float) -> list:
+    """إضافة قراءة ليست أقدم من آخر قراءة للمفتاح إلى مجاميعه"""
+    if sums is None:
+        sums = [0, 0.0, 0.0, 0.0, 0.0, day, day, 0.0]
+    total = sums[_TOTAL] + km
+    x = day - sums[_FIRST]
+    sums[_N] += 1
+    sums[_SX] += x
+    sums[_SY] += total
+    sums[_SXX] += x * x
+    sums[_SXY] += x * total
+    sums[_LAST] = day
+    sums[_TOTAL] = total
+    return sums
+
+
+def usage_rate(sums: list) -> Optional[float]:
+    """ميل خط الانحدار (كم/يوم)، أو None إذا كانت القراءات أقل أو أقصر من تقدير موثوق"""
+    n, sum_x, sum_y, sum_xx, sum_xy, first, last, _ = sums
+    denominator = n * sum_xx - sum_x * sum_x
+    if n < MIN_READINGS or last - first < MIN_SPAN_DAYS or denominator <= 0:
+        return None
+    rate = (n * sum_xy - sum_x * sum_y) / denominator
+    return rate if math.isfinite(rate) and rate > 0 else None
+
+
+def _usage_key(vehicle_id: Optional[int], oil_type: Optional[str]):
+    # القراءات القديمة بلا سيارة تجمع حسب نوع الزيت
+    return vehicle_id if vehicle_id is not None else ("oil", oil_type)
+
+
+def _due(remaining: Optional[float], rate: Optional[float], today: float) -> dict:
+    if remaining is None or not rate:
+        return {"km_per_day": rate, "days_left": None, "due_date": None}
+    days_left = max(0.0, remaining / rate)
+    return {
+        "km_per_day": round(rate, 1),
+        "days_left": int(days_left),
+        "due_date": _to_date(today + days_left),
+    }
+
+
+# التواريخ المحفوظة نصوص بالتوقيت المحلي و julianday تحسبها كما هي دون تحويل، فاليوم
+# وتاريخ الاستحقاق يحسبان بنفس الساعة المحلية وليس بثواني يونكس (UTC)
+_LOCAL_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def _to_date(julian_day: float) -> datetime.date:
+    return (_LOCAL_EPOCH + datetime.timedelta(days=julian_day - _UNIX_EPOCH_JULIAN)).date()
+
+
+def _today() -> float:
+    return (datetime.datetime.now() - _LOCAL_EPOCH) / datetime.timedelta(days=1) + _UNIX_EPOCH_JULIAN
+
+
+class MaintenancePredictor:
+    """توقعات الصيانة مع مجاميع انحدار محفوظة لكل سيارة
+
+    أعلى رقم قراءة هو الإصدار، ومع كل توقع تضاف للمجاميع القراءات التي بعده فقط،
+    فحفظ قراءة لا يعيد مسح السجل. القراءة الأقدم من آخر قراءة للسيارة تغير المسافة
+    التراكمية لما بعدها، فيعاد حساب تلك السيارة وحدها من سجلها. المواعيد تحسب في كل
+    مرة من المسافة المتبقية الحالية لأنها رخيصة
+    """
+
+    def __init__(self, repo: Optional[Repository] = None, catalog: Optional[OilCatalog] = None):
+        self._repo = repo
+        self._catalog = catalog or (OilCatalog(repo) if repo else None)
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._sums = {}
+        self._rates = {}
+
+    @property
+    def repo(self) -> Repository:
+        return self._repo or get_repository()
+
+    @property
+    def catalog(self) -> OilCatalog:
+        return self._catalog or get_catalog()
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+
+    def usage_rates(self) -> dict:
+        """معدل الاستخدام (كم/يوم أو None) لكل مفتاح"""
+        with self._lock:
+            repo = self.repo
+            version = repo.readings_version()
+            if self._version is None or version < self._version:
+                # أول تحميل، أو حذف قراءات: الحساب من السجل كاملاً
+                rows = repo.usage_history()
+                self._sums = usage_sums([_usage_key(row[1], row[2]) for row in rows],
+                                        [row[3] for row in rows], [row[4] or 0 for row in rows])
+                self._rates = {key: usage_rate(sums) for key, sums in self._sums.items()}
+            elif version > self._version:
+                self._apply_new_readings(repo.usage_history(self._version))
+            self._version = version
+            return dict(self._rates)
+
+    def _apply_new_readings(self, rows: list):
+        changed, refit = set(), set()
+        for _, vehicle_id, oil_type, day, km in sorted(rows, key=lambda row: row[3]):
+            key = _usage_key(vehicle_id, oil_type)
+            if key in refit:
+                continue
+            sums = self._sums.get(key)
+            if sums is not None and day < sums[_LAST]:
+                refit.add(key)
+                continue
+            self._sums[key] = add_reading(sums, day, km or 0)
+            changed.add(key)
+
+        for key in refit:
+            history = self.repo.usage_history_for(*((key, None) if not isinstance(key, tuple) else (None, key[1])))
+            self._sums.update(usage_sums([key] * len(history), [row[0] for row in history],
+                                         [row[1] or 0 for row in history]))
+        for key in changed | refit:
+            self._rates[key] = usage_rate(self._sums[key])
+
+    def predict(self, vehicle_id: Optional[int] = None) -> dict:
+        """مواعيد تغيير الزيت لكل سيارة ونوع زيت، وعمر الإطارات مقابل استخدام السيارة المحددة"""
+        rates = self.usage_rates()
+        today = _today()
+        repo = self.repo
+
+        vehicles = {}
+        for state_vehicle_id, state in repo.load_vehicle_states().items():
+            vehicles[state_vehicle_id] = _due(state["remaining_distance"], rates.get(state_vehicle_id), today)
+
+        oil_types = {}
+        for name, data in self.catalog.load().items():
+            oil_types[name] = _due(data["remaining_distance"], rates.get(("oil", name)), today)
+
+        wheels = repo.list_wheels()
+        history = repo.usage_history_for(vehicle_id) if wheels and vehicle_id is not None else []
+        return {
+            "vehicles": vehicles,
+            "oil_types": oil_types,
+            "wheels": self._predict_wheels(rates.get(vehicle_id), history, wheels, today),
+        }
+
+    def _predict_wheels(self, rate: Optional[float], history: list, wheels: list, today: float) -> list:
+        np = _numpy()
+        if not wheels:
+            return []
+
+        # المسافة منذ التركيب لكل الإطارات دفعة واحدة من المسافة التراكمية للسيارة
+        install_days = np.array([row[3] if row[3] is not None else np.nan for row in wheels], dtype=np.float64)
+        if history:
+            days = np.array([row[0] for row in history], dtype=np.float64)
+            cumulative = np.cumsum([row[1] or 0 for row in history], dtype=np.float64)
+            index = np.searchsorted(days, np.nan_to_num(install_days, nan=np.inf), side="left")
+            before = np.where(index > 0, cumulative[np.maximum(index - 1, 0)], 0.0)
+            used = np.where(np.isnan(install_days), np.nan, cumulative[-1] - before)
+        else:
+            used = np.full(len(wheels), np.nan)
+
+        predictions = []
+        for (wheel_id, wheel_type, install_date, _, expected_life), km_used in zip(wheels, used):
+            km_used = None if np.isnan(km_used) else float(km_used)
+            remaining = None if km_used is None or expected_life is None else max(0.0, expected_life - km_used)
+            predictions.append({
+                "id": wheel_id,
+                "wheel_type": wheel_type,
+                "install_date": install_date,
+                "expected_life": expected_life,
+                "km_used": km_used,
+                **_due(remaining, rate, today),
+            })
+        return predictions
+
+
+_predictor: Optional[MaintenancePredictor] = None
+_predictor_lock = threading.Lock()
+
+
+def get_predictor() -> MaintenancePredictor:
+    """المتوقع المشترك بين كل الجلسات، فتحدّث المجاميع مرة واحدة لكل قراءة جديدة"""
+    global _predictor
+    if _predictor is None:
+        with _predictor_lock:
+            if _predictor is None:
+                _predictor = MaintenancePredictor()
+    return _predictor
@@ -0,0 +1,116 @@
+"""تجميع تحديثات الواجهة: كل حدث يرسل تحديثاً واحداً للعناصر التي تغيرت فقط بدلاً من page.update()"""
+import contextvars
+import functools
+import inspect
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+import perf
+
+# الدفعة الحالية لكل حدث، لكل مهمة async أو خيط نسخته فلا تختلط أحداث متزامنة
+_current_batch: contextvars.ContextVar = contextvars.ContextVar("render_batch", default=None)
+
+
+class _Batch:
+    __slots__ = ("name", "controls", "full", "updates")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.controls = []
+        self.full = False
+        self.updates = 0
+
+
+class Renderer:
+    """نقطة واحدة لتحديث الصفحة
+
+    update(*controls) داخل حدث تسجل العناصر المتغيرة فقط، وترسل كلها عند انتهاء الحدث
+    باستدعاء واحد page.update(*controls). update() بلا عناصر تعني تحديث الصفحة كاملة
+    (عند إضافة حوار إلى overlay مثلاً). خارج الأحداث يرسل التحديث فوراً
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self._lock = threading.Lock()
+        # لكل حدث: عدد مرات تنفيذه وعدد استدعاءات التحديث المرسلة
+        self.stats = {}
+
+    def update(self, *controls):
+        batch = _current_batch.get()
+        if batch is None:
+            self._count("direct", self._send(controls))
+            return
+        if not controls:
+            batch.full = True
+        for control in controls:
+            if control is not None and control not in batch.controls:
+                batch.controls.append(control)
+
+    def flush(self):
+        """إرسال ما تجمع حتى الآن، مثل إظهار مؤشر التحميل قبل انتظار عملية طويلة"""
+        batch = _current_batch.get()
+        if batch is not None and (batch.full or batch.controls):
+            batch.updates += self._send(() if batch.full else batch.controls)
+            batch.controls, batch.full = [], False
+
+    @contextmanager
+    def batch(self, name: str = "event"):
+        # الدفعات المتداخلة تنضم للدفعة الخارجية
+        if _current_batch.get() is not None:
+            yield
+            return
+        batch = _Batch(name)
+        token = _current_batch.set(batch)
+        try:
+            yield
+        finally:
+            try:
+                self.flush()
+            finally:
+                _current_batch.reset(token)
+                self._count(name, batch.updates)
+
+    def event(self, name: Optional[str] = None):
+        """مزخرف لمعالجات الأحداث (عادية أو async) يجمع تحديثاتها في دفعة واحدة"""
+        def decorator(fn):
+            event_name = name or fn.__name__
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    with self.batch(event_name):
+                        return await fn(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.batch(event_name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def report(self) -> dict:
+        """متوسط التحديثات لكل حدث، لإثبات أن كل حدث يكلف رحلة واحدة"""
+        with self._lock:
+            return {name: {**counts, "per_event": round(counts["updates"] / counts["events"], 2)}
+                    for name, counts in self.stats.items()}
+
+    def _send(self, controls) -> int:
+        if not controls:
+            with perf.measure("ui:page.update"):
+                self.page.update()
+            return 1
+        # العنصر الذي لم يضف للصفحة بعد يرسل كاملاً عند إضافته، فلا داعي لتحديثه الآن
+        attached = [control for control in controls if control.page is not None]
+        if attached:
+            with perf.measure("ui:page.update"):
+                self.page.update(*attached)
+        return 1 if attached else 0
+
+    def _count(self, name: str, updates: int):
+        with self._lock:
+            counts = self.stats.setdefault(name, {"events": 0, "updates": 0})
+            counts["events"] += 1
+            counts["updates"] += updates
+        logging.debug(f"تحديث الواجهة: {name} أرسل {updates} تحديث")
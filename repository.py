@@ -0,0 +1,624 @@
+"""طبقة الوصول إلى البيانات: اتصال واحد طويل العمر مشترك بين جميع العمليات"""
+import datetime
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+import summary
+from fleet import DEFAULT_OIL_INTERVAL
+from migrations import migrate
+
+# مجلد البيانات وقاعدة البيانات
+data_dir = Path.home() / "ALKA_Data"
+db_path = data_dir / "alka_oil.db"
+
+# إعدادات الاتصال، تعدّل من هنا فقط
+PRAGMAS = {
+    "journal_mode": "WAL",
+    # كل حفظ يكتب على القرص (fsync) قبل إرجاع النتيجة، فالقراءة المسجلة لا تضيع بانقطاع
+    # الكهرباء. كاتب الدفعات يوزع تكلفة fsync على كل عمليات الدفعة
+    "synchronous": "FULL",
+    "mmap_size": 64 * 1024 * 1024,
+    # انتظار قفل الكتابة بدل الفشل فوراً بـ database is locked عند كتابة عملية أخرى (سطر الأوامر)
+    "busy_timeout": 5000,
+}
+
+# إعدادات اتصالات القراءة، لكل خيط قراءة اتصال واحد للقراءة فقط
+READER_PRAGMAS = {
+    "mmap_size": 64 * 1024 * 1024,
+    "busy_timeout": 5000,
+    "query_only": 1,
+}
+
+# عدد سجلات التغيير في كل صفحة من نافذة السجل
+HISTORY_PAGE_SIZE = 50
+
+# عدد الاستعلامات المحضّرة التي يحتفظ بها الاتصال
+STATEMENT_CACHE_SIZE = 256
+
+# جداول أرشيف قراءات العداد، جدول لكل شهر باسم oil_readings_YYYYMM
+ARCHIVE_TABLE_GLOB = "oil_readings_[0-9][0-9][0-9][0-9][0-9][0-9]"
+
+
+def to_epoch(value) -> int:
+    """وقت القراءة بثواني يونكس، من رقم أو نص ISO بالتوقيت المحلي"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(datetime.datetime.fromisoformat(value).timestamp())
+
+
+def _month_start(year: int, month: int) -> int:
+    """بداية الشهر بثواني يونكس، والشهر قد يخرج عن 1..12 عند الجمع والطرح"""
+    year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+    return int(datetime.datetime(year, month, 1).timestamp())
+
+
+class Repository:
+    """اتصال SQLite واحد آمن للاستخدام من عدة خيوط
+
+    كل الكتابة تمر عبر الاتصال المشترك وقفله. مع concurrent_reads يفتح كل خيط آخر اتصال
+    قراءة خاصاً به فتتوازى القراءات (WAL) ولا تنتظر الكتابة، إلا داخل معاملة مفتوحة
+    على نفس الخيط فتقرأ من الاتصال المشترك لترى ما كتبته
+    """
+
+    def __init__(self, path: Path = db_path, pragmas: Optional[dict] = None,
+                 concurrent_reads: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.concurrent_reads = concurrent_reads
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._owner: Optional[int] = None
+        self._after_commit: list = []
+        self._local = threading.local()
+        self._readers: list = []
+        self._conn = sqlite3.connect(
+            str(self.path),
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        for name, value in {**PRAGMAS, **(pragmas or {})}.items():
+            self._conn.execute(f"PRAGMA {name} = {value}")
+
+    def migrate(self) -> int:
+        with self._lock:
+            return migrate(self._conn)
+
+    def close(self):
+        with self._lock:
+            for reader in self._readers:
+                reader.close()
+            self._readers.clear()
+            self._conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """وحدة عمل: كل ما بداخلها يحفظ معاً أو يلغى معاً"""
+        with self._lock:
+            if self._depth:
+                # معاملة متداخلة تصبح جزءاً من المعاملة الخارجية
+                self._depth += 1
+                try:
+                    yield self._conn
+                finally:
+                    self._depth -= 1
+                return
+
+            # IMMEDIATE يحجز الكتابة من البداية، فلا تفشل المعاملة في منتصفها لأن عملية أخرى
+            # (سطر الأوامر مثلاً) بدأت الكتابة بعد قراءتها
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._depth = 1
+            self._owner = threading.get_ident()
+            try:
+                yield self._conn
+                self._conn.commit()
+                self._run_after_commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            finally:
+                self._after_commit.clear()
+                self._depth = 0
+                self._owner = None
+
+    @contextmanager
+    def savepoint(self, name: str = "operation"):
+        """جزء من المعاملة يلغى وحده إذا فشل، ومعه ما سجل داخله في after_commit"""
+        with self.transaction() as conn:
+            mark = len(self._after_commit)
+            conn.execute(f"SAVEPOINT {name}")
+            try:
+                yield conn
+            except Exception:
+                conn.execute(f"ROLLBACK TO {name}")
+                conn.execute(f"RELEASE {name}")
+                del self._after_commit[mark:]
+                raise
+            conn.execute(f"RELEASE {name}")
+
+    def in_transaction(self) -> bool:
+        """هل الخيط الحالي داخل معاملة كتابة مفتوحة، فيرى ما لم يحفظ بعد"""
+        return bool(self._depth) and self._owner == threading.get_ident()
+
+    def after_commit(self, callback):
+        """تنفيذ callback بعد حفظ المعاملة الحالية فقط، ولا ينفذ إذا ألغيت
+
+        لتحديث ما في الذاكرة بعد أن يصبح التعديل محفوظاً، وخارج أي معاملة ينفذ فوراً
+        """
+        if self.in_transaction():
+            self._after_commit.append(callback)
+        else:
+            callback()
+
+    def _run_after_commit(self):
+        # البيانات محفوظة بالفعل، فخطأ في دالة لا يلغي المعاملة ولا يمنع البقية
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logging.error(f"خطأ بعد حفظ المعاملة: {e}")
+
+    @contextmanager
+    def snapshot(self):
+        """اتصال قراءة مستقل بلقطة ثابتة، للقراءات الطويلة دون حجز الاتصال المشترك"""
+        conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        try:
+            conn.execute("BEGIN")
+            yield conn
+        finally:
+            conn.close()
+
+    def _reader(self) -> Optional[sqlite3.Connection]:
+        """اتصال القراءة الخاص بالخيط الحالي، أو None ليقرأ من الاتصال المشترك"""
+        if not self.concurrent_reads or self._owner == threading.get_ident():
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True,
+                                   check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+            for name, value in READER_PRAGMAS.items():
+                conn.execute(f"PRAGMA {name} = {value}")
+            self._local.conn = conn
+            with self._lock:
+                self._readers.append(conn)
+        return conn
+
+    def query(self, sql: str, params: tuple = ()) -> list:
+        reader = self._reader()
+        if reader is not None:
+            return reader.execute(sql, params).fetchall()
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def query_one(self, sql: str, params: tuple = ()) -> Optional[tuple]:
+        reader = self._reader()
+        if reader is not None:
+            return reader.execute(sql, params).fetchone()
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    # أنواع الزيوت
+    def load_oil_types(self) -> dict:
+        rows = self.query("""SELECT name, max_distance, remaining_distance,
+                                    image, liter_capacity, grade
+                             FROM oil_types""")
+        return {row[0]: {
+            "max_distance": row[1],
+            "remaining_distance": row[2],
+            "image": row[3],
+            "liter_capacity": row[4],
+            "grade": row[5]
+        } for row in rows}
+
+    def get_oil_type(self, name: str) -> Optional[tuple]:
+        return self.query_one("SELECT * FROM oil_types WHERE name = ?", (name,))
+
+    def save_oil_types(self, oil_types: dict):
+        with self.transaction() as conn:
+            conn.executemany("""INSERT OR REPLACE INTO oil_types
+                                (name, max_distance, remaining_distance, image, liter_capacity, grade)
+                                VALUES (?, ?, ?, ?, ?, ?)""",
+                             [(name, data["max_distance"], data["remaining_distance"],
+                               data["image"], data["liter_capacity"], data["grade"])
+                              for name, data in oil_types.items()])
+            summary.sync_oil_types(conn)
+
+    def add_oil_type(self, name: str, max_distance: float, capacity: float, grade: str, image: str = ""):
+        with self.transaction() as conn:
+            conn.execute("""INSERT INTO oil_types
+                            (name, max_distance, remaining_distance, image, liter_capacity, grade)
+                            VALUES (?, ?, ?, ?, ?, ?)""",
+                         (name, max_distance, max_distance, image, capacity, grade))
+            summary.sync_oil_types(conn, name)
+
+    def set_remaining_distance(self, name: str, remaining: float):
+        with self.transaction() as conn:
+            conn.execute("""UPDATE oil_types
+                            SET remaining_distance = ?
+                            WHERE name = ?""",
+                         (remaining, name))
+            summary.sync_oil_types(conn, name)
+
+    # سجل التغييرات
+    def record_reading(self, oil_type: str, km_reading: float, vehicle_type: str,
+                       reading_at: Optional[str] = None) -> tuple:
+        """إضافة القراءة للسجل وخصمها من نوع الزيت والملخص في معاملة واحدة
+
+        reading_at مفتاح عدم التكرار مع المسافة: إعادة نفس القراءة لا تخصم مرة ثانية.
+        ترجع (المسافة المتبقية بعد الحفظ, هل أضيفت القراءة)
+        """
+        reading_at = reading_at or datetime.datetime.now().isoformat()
+        with self.transaction() as conn:
+            inserted = conn.execute("""INSERT OR IGNORE INTO oil_changes
+                                       (oil_type, change_date, kilometer_reading, vehicle_type)
+                                       VALUES (?, ?, ?, ?)""",
+                                    (oil_type, reading_at, km_reading, vehicle_type)).rowcount
+            if not inserted:
+                row = conn.execute("SELECT remaining_distance FROM oil_types WHERE name = ?",
+                                   (oil_type,)).fetchone()
+                return (row[0] if row else None), False
+            # نتيجة RETURNING تقرأ كاملة قبل الحفظ حتى لا تبقى العبارة مفتوحة
+            rows = conn.execute("""UPDATE oil_types
+                                   SET remaining_distance = MAX(0, remaining_distance - ?)
+                                   WHERE name = ?
+                                   RETURNING remaining_distance""",
+                                (km_reading, oil_type)).fetchall()
+            summary.record_reading(conn, None, oil_type, km_reading, reading_at)
+        return (rows[0][0] if rows else None), True
+
+    def history_page(self, after: Optional[tuple] = None, limit: int = HISTORY_PAGE_SIZE,
+                     oil_type: Optional[str] = None, vehicle_type: Optional[str] = None) -> tuple:
+        """صفحة من السجل بعد المؤشر (change_date, id)، تكلفتها ثابتة مهما كبر الجدول
+
+        ترجع الصفوف ومؤشر الصفحة التالية، أو None إذا انتهى السجل
+        آخر عمود في كل صف هو التاريخ منسقاً للعرض
+        """
+        conditions, params = [], []
+        if oil_type is not None:
+            conditions.append("oil_type = ?")
+            params.append(oil_type)
+        if vehicle_type is not None:
+            conditions.append("vehicle_type = ?")
+            params.append(vehicle_type)
+        if after is not None:
+            conditions.append("(change_date, id) < (?, ?)")
+            params.extend(after)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self.query(f"""SELECT id, oil_type, change_date, kilometer_reading, vehicle_type,
+                                     strftime('%Y-%m-%d %H:%M', change_date)
+                              FROM oil_changes
+                              {where}
+                              ORDER BY change_date DESC, id DESC
+                              LIMIT ?""", (*params, limit))
+
+        next_cursor = (rows[-1][2], rows[-1][0]) if len(rows) == limit else None
+        return rows, next_cursor
+
+    # قراءات العداد المطلقة، سجل للإضافة فقط
+    def save_oil_reading(self, vehicle_id: int, reading_date, reading_km: int, oil_type: str) -> bool:
+        """حفظ قراءة عداد خام دون خصم، وترجع False إذا كانت محفوظة سابقاً
+
+        reading_date نص ISO أو ثواني يونكس، ويحفظ بالثواني
+        """
+        with self.transaction() as conn:
+            return bool(conn.execute('''INSERT OR IGNORE INTO oil_readings
+                                        (vehicle_id, reading_date, reading_km, oil_type)
+                                        VALUES (?, ?, ?, ?)''',
+                                     (vehicle_id, to_epoch(reading_date), reading_km, oil_type)).rowcount)
+
+    def record_odometer(self, vehicle_id: int, oil_type: str, reading_km: float, vehicle_type: str,
+                        reading_at: Optional[str] = None) -> tuple:
+        """حفظ قراءة العداد المطلقة وخصم ما تجاوزت به عداد السيارة في معاملة واحدة
+
+        المسافة تحسب كما في عرض oil_reading_deltas: من أعلى قراءة سابقة بوقت القراءة، فالقراءة
+        المتأخرة بين قراءتين لها مسافتها لكن لا يخصم منها إلا ما تجاوز عداد السيارة، والأقل من
+        سابقتها تحفظ للمراجعة (علم rollback) دون خصم.
+        ترجع (المسافة المتبقية, المسافة أو None للقراءة المتراجعة, هل أضيفت القراءة)
+        """
+        reading_at = reading_at or datetime.datetime.now().isoformat()
+        with self.transaction() as conn:
+            row = conn.execute("""SELECT s.remaining_distance, v.current_mileage
+                                  FROM vehicles v
+                                  LEFT JOIN vehicle_oil_state s ON s.vehicle_id = v.id
+                                  WHERE v.id = ?""", (vehicle_id,)).fetchone()
+            if row is None:
+                raise ValueError(f"السيارة {vehicle_id} غير موجودة")
+            remaining, mileage = row
+            mileage = mileage or 0
+            if not self.save_oil_reading(vehicle_id, reading_at, reading_km, oil_type):
+                return remaining, None, False
+
+            # القراءات قبلها بالوقت، ومع نفس الوقت الأقدم حفظاً، كترتيب نافذة العرض
+            reading_date = to_epoch(reading_at)
+            previous_km = conn.execute("""SELECT MAX(reading_km) FROM oil_readings
+                                          WHERE vehicle_id = ? AND reading_date <= ?
+                                            AND (reading_date < ? OR id < last_insert_rowid())""",
+                                       (vehicle_id, reading_date, reading_date)).fetchone()[0]
+            distance = reading_km - (mileage if previous_km is None else previous_km)
+            if distance < 0:
+                return remaining, None, True
+            if reading_km > mileage:
+                conn.execute("UPDATE vehicles SET current_mileage = ? WHERE id = ?", (reading_km, vehicle_id))
+                remaining, _ = self.record_vehicle_reading(vehicle_id, oil_type, reading_km - mileage,
+                                                           vehicle_type, reading_at)
+        return remaining, distance, True
+
+    def odometer_deltas(self, vehicle_id: int, limit: int = HISTORY_PAGE_SIZE) -> list:
+        """آخر قراءات السيارة مع المسافة المحسوبة وعلم القراءات المشكوك فيها"""
+        return self.query("""SELECT id, datetime(reading_date, 'unixepoch', 'localtime'),
+                                    reading_km, delta_km, flag
+                             FROM oil_reading_deltas
+                             WHERE vehicle_id = ?
+                             ORDER BY reading_date DESC, id DESC
+                             LIMIT ?""", (vehicle_id, limit))
+
+    def flagged_readings(self) -> list:
+        """القراءات المتراجعة أو المتأخرة في كل الأسطول، للمراجعة بعد الإدخال بالجملة"""
+        return self.query("""SELECT id, vehicle_id, datetime(reading_date, 'unixepoch', 'localtime'),
+                                    reading_km, previous_km, flag
+                             FROM oil_reading_deltas
+                             WHERE flag IS NOT NULL
+                             ORDER BY vehicle_id, reading_date""")
+
+    def archive_tables(self) -> list:
+        """جداول الأرشيف الشهرية من الأقدم للأحدث"""
+        return [row[0] for row in self.query("""SELECT name FROM sqlite_master
+                                                WHERE type = 'table' AND name GLOB ?
+                                                ORDER BY name""", (ARCHIVE_TABLE_GLOB,))]
+
+    def odometer_range(self, vehicle_id: int, start, end) -> list:
+        """قراءات السيارة (الوقت, العداد) في المدى [start, end) من الجدول الحالي والأرشيف
+
+        تقرأ فقط أشهر الأرشيف التي تتقاطع مع المدى، وكل جزء يقرأ من الفهرس وحده
+        """
+        start, end = to_epoch(start), to_epoch(end)
+        tables = ["oil_readings"]
+        for table in self.archive_tables():
+            year, month = int(table[-6:-2]), int(table[-2:])
+            if _month_start(year, month) < end and _month_start(year, month + 1) > start:
+                tables.append(table)
+        parts = " UNION ALL ".join(f"""SELECT reading_date, reading_km FROM {table}
+                                        WHERE vehicle_id = ? AND reading_date >= ? AND reading_date < ?"""
+                                   for table in tables)
+        return self.query(f"{parts} ORDER BY reading_date", (vehicle_id, start, end) * len(tables))
+
+    def archive_oil_readings(self, keep_months: int = 12) -> dict:
+        """نقل القراءات الأقدم من keep_months شهراً إلى جدول أرشيف لكل شهر
+
+        يبقى الجدول الحالي صغيراً لحساب الفروق والإدخال، وترجع عدد القراءات المنقولة لكل جدول
+        """
+        today = datetime.date.today()
+        cutoff = _month_start(today.year, today.month - keep_months)
+        moved = {}
+        with self.transaction() as conn:
+            months = [row[0] for row in conn.execute("""SELECT DISTINCT strftime('%Y%m', reading_date, 'unixepoch', 'localtime')
+                                                        FROM oil_readings WHERE reading_date < ?""", (cutoff,))]
+            for month in months:
+                table = f"oil_readings_{month}"
+                year, number = int(month[:4]), int(month[4:])
+                start, end = _month_start(year, number), _month_start(year, number + 1)
+                conn.execute(f"""CREATE TABLE IF NOT EXISTS {table}
+                                 (id INTEGER PRIMARY KEY, vehicle_id INTEGER NOT NULL,
+                                  reading_date INTEGER NOT NULL, reading_km INTEGER NOT NULL, oil_type TEXT)""")
+                conn.execute(f"""CREATE UNIQUE INDEX IF NOT EXISTS ux_{table}_natural_key
+                                 ON {table} (vehicle_id, reading_date, reading_km)""")
+                moved[table] = conn.execute(f"""INSERT OR IGNORE INTO {table}
+                                                SELECT id, vehicle_id, reading_date, reading_km, oil_type
+                                                FROM oil_readings
+                                                WHERE reading_date >= ? AND reading_date < ? AND reading_date < ?""",
+                                            (start, end, cutoff)).rowcount
+
+            if months:
+                # قيد الإضافة فقط يرفع للحذف ثم يعاد بنفس تعريفه داخل نفس المعاملة
+                trigger = conn.execute("""SELECT sql FROM sqlite_master
+                                          WHERE type = 'trigger' AND name = 'oil_readings_no_delete'""").fetchone()
+                conn.execute("DROP TRIGGER IF EXISTS oil_readings_no_delete")
+                conn.execute("DELETE FROM oil_readings WHERE reading_date < ?", (cutoff,))
+                if trigger:
+                    conn.execute(trigger[0])
+        if moved:
+            logging.info(f"تم نقل قراءات العداد للأرشيف: {moved}")
+        return moved
+
+    # السيارات والإطارات
+    def get_vehicle_info(self, vehicle_id: Optional[int] = None) -> Optional[tuple]:
+        if vehicle_id is None:
+            return self.query_one('SELECT * FROM vehicles ORDER BY id DESC LIMIT 1')
+        return self.query_one('SELECT * FROM vehicles WHERE id = ?', (vehicle_id,))
+
+    def list_vehicles(self) -> list:
+        return self.query('SELECT * FROM vehicles ORDER BY id')
+
+    def add_vehicle(self, car_type: str, manufacture_year: int, current_mileage: int,
+                    oil_type: Optional[str] = None, oil_interval: int = DEFAULT_OIL_INTERVAL) -> int:
+        """إضافة سيارة مع حالة زيت جديدة، وإرجاع رقمها"""
+        with self.transaction() as conn:
+            cursor = conn.execute('''INSERT INTO vehicles
+                                     (car_type, manufacture_year, current_mileage, last_oil_change_date, next_oil_change_mileage)
+                                     VALUES (?, ?, ?, ?, ?)''',
+                                  (car_type,
+                                   manufacture_year,
+                                   current_mileage,
+                                   datetime.datetime.now().strftime("%Y-%m-%d"),
+                                   current_mileage + oil_interval))
+            vehicle_id = cursor.lastrowid
+            conn.execute("""INSERT INTO vehicle_oil_state
+                            (vehicle_id, oil_type, last_change_km, remaining_distance, updated_at)
+                            VALUES (?, ?, ?, ?, ?)""",
+                         (vehicle_id, oil_type, current_mileage, oil_interval,
+                          datetime.datetime.now().isoformat()))
+            # قراءة الأساس التي تحسب منها مسافة أول قراءة للعداد
+            self.save_oil_reading(vehicle_id, datetime.datetime.now().isoformat(), current_mileage, oil_type)
+            summary.add_vehicle(conn, vehicle_id)
+        return vehicle_id
+
+    # حالة الزيت لكل سيارة
+    def load_vehicle_states(self) -> dict:
+        rows = self.query("""SELECT vehicle_id, oil_type, last_change_km, remaining_distance
+                             FROM vehicle_oil_state""")
+        return {row[0]: {
+            "oil_type": row[1],
+            "last_change_km": row[2],
+            "remaining_distance": row[3]
+        } for row in rows}
+
+    def ensure_vehicle_states(self) -> int:
+        """إنشاء حالة زيت للسيارات التي لا حالة لها (مثل السيارات المستوردة)"""
+        with self.transaction() as conn:
+            return conn.execute("""INSERT OR IGNORE INTO vehicle_oil_state
+                                   (vehicle_id, oil_type, last_change_km, remaining_distance, updated_at)
+                                   SELECT id, NULL, current_mileage,
+                                          MAX(0, COALESCE(next_oil_change_mileage - current_mileage, ?)),
+                                          datetime('now', 'localtime')
+                                   FROM vehicles""", (DEFAULT_OIL_INTERVAL,)).rowcount
+
+    def due_vehicles(self, threshold: float) -> list:
+        """السيارات التي وصلت مسافتها المتبقية إلى حد التنبيه، الأقرب أولاً"""
+        return self.query("""SELECT v.id, v.car_type, s.oil_type, s.remaining_distance
+                             FROM vehicle_oil_state s
+                             JOIN vehicles v ON v.id = s.vehicle_id
+                             WHERE s.remaining_distance <= ?
+                             ORDER BY s.remaining_distance""", (threshold,))
+
+    def stats(self) -> dict:
+        # من جدول الملخص فلا يمسح سجل التغييرات مهما كبر
+        row = self.query_one("""SELECT (SELECT COUNT(*) FROM vehicles),
+                                       (SELECT COUNT(*) FROM oil_types),
+                                       (SELECT IFNULL(SUM(due), 0) FROM vehicle_summary),
+                                       IFNULL(SUM(readings_count), 0),
+                                       IFNULL(SUM(total_km), 0),
+                                       MAX(last_reading_at)
+                                FROM oil_type_summary""")
+        return {
+            "vehicles": row[0],
+            "oil_types": row[1],
+            "due_vehicles": row[2],
+            "oil_changes": row[3],
+            "total_km": row[4],
+            "last_change": row[5],
+        }
+
+    def fleet_summary(self) -> dict:
+        """ملخص لوحة المعلومات: عدد السيارات المستحقة ومتوسط المسافة منذ آخر تغيير لكل نوع زيت"""
+        due = self.query_one("SELECT COUNT(*), IFNULL(SUM(due), 0) FROM vehicle_summary")
+        by_oil_type = self.query("""SELECT oil_type, COUNT(*), SUM(due),
+                                           AVG(km_since_change), SUM(readings_count), MAX(last_reading_at)
+                                    FROM vehicle_summary
+                                    WHERE oil_type IS NOT NULL
+                                    GROUP BY oil_type
+                                    ORDER BY oil_type""")
+        return {
+            "vehicles": due[0],
+            "due": due[1],
+            "by_oil_type": [{
+                "oil_type": row[0],
+                "vehicles": row[1],
+                "due": row[2],
+                "avg_km_since_change": round(row[3] or 0, 1),
+                "readings": row[4],
+                "last_reading": row[5],
+            } for row in by_oil_type],
+        }
+
+    def rebuild_summaries(self):
+        """إعادة حساب الملخص بعد الاستيراد بالجملة"""
+        with self.transaction() as conn:
+            summary.rebuild(conn)
+
+    def record_vehicle_reading(self, vehicle_id: int, oil_type: str, km_reading: float,
+                               vehicle_type: str, reading_at: Optional[str] = None) -> tuple:
+        """إضافة قراءة سيارة واحدة للسجل وخصمها من حالتها والملخص في معاملة واحدة
+
+        المفتاح (السيارة, reading_at, المسافة) فريد، فإعادة المحاولة آمنة.
+        ترجع (المسافة المتبقية بعد الحفظ, هل أضيفت القراءة)
+        """
+        reading_at = reading_at or datetime.datetime.now().isoformat()
+        with self.transaction() as conn:
+            inserted = conn.execute("""INSERT OR IGNORE INTO oil_changes
+                                       (oil_type, change_date, kilometer_reading, vehicle_type, vehicle_id)
+                                       VALUES (?, ?, ?, ?, ?)""",
+                                    (oil_type, reading_at, km_reading, vehicle_type, vehicle_id)).rowcount
+            if not inserted:
+                row = conn.execute("SELECT remaining_distance FROM vehicle_oil_state WHERE vehicle_id = ?",
+                                   (vehicle_id,)).fetchone()
+                return (row[0] if row else None), False
+            rows = conn.execute("""UPDATE vehicle_oil_state
+                                   SET remaining_distance = MAX(0, remaining_distance - ?), updated_at = ?
+                                   WHERE vehicle_id = ?
+                                   RETURNING remaining_distance""",
+                                (km_reading, datetime.datetime.now().isoformat(), vehicle_id)).fetchall()
+            summary.record_reading(conn, vehicle_id, oil_type, km_reading, reading_at)
+        return (rows[0][0] if rows else None), True
+
+    def reset_vehicle_oil(self, vehicle_id: int, oil_type: str, max_distance: float):
+        """تسجيل تغيير الزيت للسيارة وتركيب نوع الزيت المحدد"""
+        now = datetime.datetime.now()
+        with self.transaction() as conn:
+            conn.execute("""UPDATE vehicle_oil_state
+                            SET oil_type = ?, remaining_distance = ?, updated_at = ?,
+                                last_change_km = (SELECT current_mileage FROM vehicles WHERE id = ?)
+                            WHERE vehicle_id = ?""",
+                         (oil_type, max_distance, now.isoformat(), vehicle_id, vehicle_id))
+            conn.execute("""UPDATE vehicles
+                            SET last_oil_change_date = ?, next_oil_change_mileage = current_mileage + ?
+                            WHERE id = ?""",
+                         (now.strftime("%Y-%m-%d"), max_distance, vehicle_id))
+            summary.reset_vehicle(conn, vehicle_id, oil_type, max_distance)
+
+    # بيانات توقع الصيانة
+    def readings_version(self) -> int:
+        """أعلى رقم قراءة، يتغير مع كل قراءة جديدة ويقرأ من نهاية المفتاح الأساسي مباشرة"""
+        return self.query_one("SELECT IFNULL(MAX(id), 0) FROM oil_changes")[0]
+
+    def usage_history(self, after_id: int = 0) -> list:
+        """القراءات بعد after_id بوقتها كيوم جولياني: (رقم القراءة, رقم السيارة, نوع الزيت, اليوم, المسافة)"""
+        return self.query("""SELECT id, vehicle_id, oil_type, julianday(change_date), kilometer_reading
+                             FROM oil_changes
+                             WHERE id > ? AND julianday(change_date) IS NOT NULL
+                             ORDER BY id""", (after_id,))
+
+    def usage_history_for(self, vehicle_id: Optional[int] = None, oil_type: Optional[str] = None) -> list:
+        """(اليوم, المسافة) مرتبة بالوقت لسيارة واحدة، أو للقراءات بلا سيارة لنوع زيت"""
+        if vehicle_id is not None:
+            return self.query("""SELECT julianday(change_date), kilometer_reading
+                                 FROM oil_changes
+                                 WHERE vehicle_id = ? AND julianday(change_date) IS NOT NULL
+                                 ORDER BY 1, id""", (vehicle_id,))
+        return self.query("""SELECT julianday(change_date), kilometer_reading
+                             FROM oil_changes
+                             WHERE vehicle_id IS NULL AND oil_type IS ? AND julianday(change_date) IS NOT NULL
+                             ORDER BY 1, id""", (oil_type,))
+
+    def list_wheels(self) -> list:
+        # تاريخ التركيب نص يدخله المستخدم، و julianday ترجع NULL إذا لم يكن تاريخاً صحيحاً
+        return self.query("""SELECT id, wheel_type, install_date, julianday(install_date), expected_life
+                             FROM wheels ORDER BY id""")
+
+    def add_wheel(self, wheel_type: str, install_date: str, expected_life: int):
+        with self.transaction() as conn:
+            conn.execute('''INSERT INTO wheels
+                            (wheel_type, install_date, expected_life)
+                            VALUES (?, ?, ?)''',
+                         (wheel_type, install_date, expected_life))
+
+
+_repository: Optional[Repository] = None
+_repository_lock = threading.Lock()
+
+
+def get_repository() -> Repository:
+    """إرجاع المستودع المشترك، يفتح الاتصال ويرحّل المخطط عند أول استخدام"""
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                repo = Repository()
+                repo.migrate()
+                _repository = repo
+                logging.info(f"تم فتح قاعدة البيانات: {db_path}")
+    return _repository
@@ -0,0 +1,61 @@
+"""تشغيل التطبيق كخادم ويب لكل ميكانيكيي الورشة
+
+كل جلسة متصفح تشغل main(page) في نفس العملية وتتشارك طبقة بيانات واحدة:
+اتصال كتابة واحد (خلف كاتب الدفعات writer.py مع --group-commit)، واتصال قراءة لكل خيط
+قراءة فتتوازى القراءات ولا تنتظر الحفظ، وكتالوج أنواع الزيوت المشترك. قاعدة البيانات تفتح
+ويرحّل مخططها ويحمّل الكتالوج مرة واحدة قبل قبول أول جلسة
+
+أمثلة:
+    python server.py
+    python server.py --host 0.0.0.0 --port 8550 --readers 8 --group-commit
+"""
+import argparse
+import logging
+
+from flet import AppView, app
+
+import worker
+import writer
+from catalog import get_catalog
+from main import init_logging, main
+from repository import get_repository
+
+DEFAULT_PORT = 8550
+
+
+def warm_up():
+    """تجهيز طبقة البيانات المشتركة، ينفذ على خيط قاعدة البيانات قبل أول جلسة"""
+    repo = get_repository()
+    repo.concurrent_reads = True
+    get_catalog().snapshot()
+
+
+def serve(host: str = None, port: int = DEFAULT_PORT, readers: int = worker.READ_WORKERS,
+          group_commit: bool = writer.GROUP_COMMIT):
+    worker.configure(read_workers=readers)
+    writer.configure(group_commit=group_commit)
+    worker.submit_db(warm_up).result()
+    if group_commit:
+        writer.get_writer()
+    logging.info(f"وضع الخادم على المنفذ {port} مع {readers} خيوط قراءة"
+                 f"{'، وتجميع الحفظ' if group_commit else ''}")
+    app(target=main, view=AppView.WEB_BROWSER, host=host, port=port, assets_dir="assets")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="alka-server", description="ALKA Oil Tracker web server")
+    parser.add_argument("--host", default=None, help="عنوان الاستماع، 0.0.0.0 لكل الشبكة")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--readers", type=int, default=worker.READ_WORKERS, help="عدد خيوط القراءة")
+    parser.add_argument("--group-commit", action="store_true",
+                        help="تجميع حفظ الجلسات في معاملة واحدة، مفيد مع جلسات كثيرة تكتب معاً")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    init_logging()
+    try:
+        serve(args.host, args.port, args.readers, args.group_commit)
+    except Exception as e:
+        logging.error(f"خطأ حرج في الخادم: {str(e)}")
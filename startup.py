@@ -0,0 +1,79 @@
+"""تسريع بدء التشغيل: لقطة مخزنة من البيانات لعرض الإطار الأول فوراً، وقياس مراحل البدء"""
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from repository import data_dir
+
+# يبدأ العد عند تحميل هذه الوحدة، وهي أول ما يستورده main.py
+_PROCESS_START = time.perf_counter()
+
+# لقطة من آخر بيانات معروضة، تقرأ قبل فتح قاعدة البيانات
+SNAPSHOT_PATH = data_dir / "startup_snapshot.json"
+SNAPSHOT_VERSION = 1
+
+# سجل أزمنة البدء، سطر JSON لكل تشغيل لمتابعة التراجع في الأداء
+TIMINGS_PATH = data_dir / "startup_timings.jsonl"
+TIMINGS_KEEP = 100
+
+
+def load_snapshot(path: Path = SNAPSHOT_PATH) -> Optional[dict]:
+    """قراءة اللقطة المخزنة، ترجع None إذا لم توجد أو كانت من إصدار آخر"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+
+    # مفاتيح JSON نصوص دائماً، ورقم السيارة رقم صحيح في بقية التطبيق
+    snapshot["states"] = {int(vehicle_id): state for vehicle_id, state in snapshot.get("states", {}).items()}
+    return snapshot
+
+
+def save_snapshot(oil_types: dict, vehicles: dict, states: dict,
+                  path: Path = SNAPSHOT_PATH):
+    # الكتابة في ملف مؤقت ثم الاستبدال حتى لا تقرأ لقطة نصف مكتوبة
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "oil_types": oil_types,
+        "vehicles": list(vehicles.values()),
+        "states": states,
+    }
+    # اسم مؤقت لكل خيط حتى لا تكتب جلستان (وضع الخادم) في نفس الملف المؤقت معاً
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class StartupTimer:
+    """تسجيل زمن كل مرحلة من بدء التشغيل بالمللي ثانية منذ تحميل التطبيق"""
+
+    def __init__(self, start: Optional[float] = None):
+        self.start = _PROCESS_START if start is None else start
+        self.marks = {}
+
+    def mark(self, name: str) -> float:
+        elapsed = round((time.perf_counter() - self.start) * 1000, 1)
+        self.marks[name] = elapsed
+        return elapsed
+
+    def report(self, path: Path = TIMINGS_PATH, **extra) -> dict:
+        """تسجيل الأزمنة في السجل وإضافتها إلى ملف القياسات مع الاحتفاظ بآخرها فقط"""
+        record = {"time": datetime.datetime.now().isoformat(timespec="seconds"), **extra, "marks_ms": self.marks}
+        logging.info("أزمنة بدء التشغيل: " + ", ".join(f"{name}={ms}ms" for name, ms in self.marks.items()))
+
+        try:
+            lines = path.read_text(encoding="utf-8").splitlines()[-(TIMINGS_KEEP - 1):] if path.exists() else []
+            lines.append(json.dumps(record, ensure_ascii=False))
+            path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        except OSError as e:
+            logging.warning(f"تعذر حفظ أزمنة بدء التشغيل: {e}")
+        return record
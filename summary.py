@@ -0,0 +1,120 @@
+"""ملخص الأسطول المحفوظ: مجاميع لكل سيارة ولكل نوع زيت تحدث مع كل كتابة في نفس المعاملة
+
+قراءة لوحة المعلومات تكلف O(عدد السيارات) بدلاً من مسح سجل التغييرات كاملاً.
+كل الدوال تستقبل اتصالاً داخل معاملة مفتوحة ولا تفتح معاملة بنفسها
+"""
+import sqlite3
+from typing import Optional
+
+from fleet import OIL_ALERT_THRESHOLD
+
+# المصدر {source} استعلام يرجع (vehicle_id, n, km, last) لقراءة واحدة أو لدفعة كاملة،
+# وحالة الزيت تقرأ بعد خصم القراءة فيحسب علم الاستحقاق من المتبقي الجديد
+_VEHICLE_UPSERT = """INSERT INTO vehicle_summary
+                     (vehicle_id, oil_type, readings_count, total_km, km_since_change, last_reading_at, due)
+                     SELECT d.vehicle_id, s.oil_type, d.n, d.km, d.km, d.last, s.remaining_distance <= :threshold
+                     FROM ({source}) AS d
+                     JOIN vehicle_oil_state s ON s.vehicle_id = d.vehicle_id
+                     WHERE true
+                     ON CONFLICT (vehicle_id) DO UPDATE SET
+                         oil_type = excluded.oil_type,
+                         readings_count = readings_count + excluded.readings_count,
+                         total_km = total_km + excluded.total_km,
+                         km_since_change = km_since_change + excluded.km_since_change,
+                         last_reading_at = MAX(IFNULL(last_reading_at, ''), excluded.last_reading_at),
+                         due = excluded.due"""
+
+# المصدر يرجع (oil_type, n, km, legacy_km, last)، والعداد العام لنوع الزيت
+# يتغير فقط بالقراءات التي لا تخص سيارة. القراءات بلا نوع زيت تجمع تحت نص فارغ
+# حتى يبقى مجموع هذا الجدول مساوياً للسجل كاملاً
+_OIL_TYPE_UPSERT = """INSERT INTO oil_type_summary
+                      (oil_type, readings_count, total_km, km_since_change, last_reading_at, due)
+                      SELECT d.oil_type, d.n, d.km, d.legacy_km, d.last,
+                             IFNULL(t.remaining_distance <= :threshold, 0)
+                      FROM ({source}) AS d
+                      LEFT JOIN oil_types t ON t.name = d.oil_type
+                      WHERE true
+                      ON CONFLICT (oil_type) DO UPDATE SET
+                          readings_count = readings_count + excluded.readings_count,
+                          total_km = total_km + excluded.total_km,
+                          km_since_change = km_since_change + excluded.km_since_change,
+                          last_reading_at = MAX(IFNULL(last_reading_at, ''), excluded.last_reading_at),
+                          due = excluded.due"""
+
+
+def add_vehicle(conn: sqlite3.Connection, vehicle_id: int):
+    conn.execute("INSERT OR IGNORE INTO vehicle_summary (vehicle_id) VALUES (?)", (vehicle_id,))
+
+
+def record_reading(conn: sqlite3.Connection, vehicle_id, oil_type, km: float, at: str,
+                   threshold: float = OIL_ALERT_THRESHOLD):
+    """إضافة قراءة واحدة للملخص، تستدعى بعد تحديث المسافة المتبقية"""
+    params = {"vehicle_id": vehicle_id, "oil_type": oil_type, "km": km, "at": at, "threshold": threshold}
+    if vehicle_id is not None:
+        conn.execute(_VEHICLE_UPSERT.format(
+            source="SELECT :vehicle_id AS vehicle_id, 1 AS n, :km AS km, :at AS last"), params)
+    conn.execute(_OIL_TYPE_UPSERT.format(
+        source="""SELECT IFNULL(:oil_type, '') AS oil_type, 1 AS n, :km AS km,
+                         CASE WHEN :vehicle_id IS NULL THEN :km ELSE 0 END AS legacy_km,
+                         :at AS last"""), params)
+
+
+def record_staged(conn: sqlite3.Connection, table: str, threshold: float = OIL_ALERT_THRESHOLD):
+    """إضافة دفعة قراءات من جدول مؤقت بأعمدة (vehicle_id, oil_type, change_date, km) بعمليتين فقط"""
+    conn.execute(_VEHICLE_UPSERT.format(
+        source=f"""SELECT vehicle_id, COUNT(*) AS n, SUM(km) AS km, MAX(change_date) AS last
+                   FROM {table} WHERE vehicle_id IS NOT NULL GROUP BY vehicle_id"""),
+        {"threshold": threshold})
+    conn.execute(_OIL_TYPE_UPSERT.format(
+        source=f"""SELECT IFNULL(oil_type, '') AS oil_type, COUNT(*) AS n, SUM(km) AS km,
+                          SUM(CASE WHEN vehicle_id IS NULL THEN km ELSE 0 END) AS legacy_km,
+                          MAX(change_date) AS last
+                   FROM {table} GROUP BY IFNULL(oil_type, '')"""),
+        {"threshold": threshold})
+
+
+def reset_vehicle(conn: sqlite3.Connection, vehicle_id: int, oil_type: str, max_distance: float,
+                  threshold: float = OIL_ALERT_THRESHOLD):
+    add_vehicle(conn, vehicle_id)
+    conn.execute("""UPDATE vehicle_summary
+                    SET oil_type = ?, km_since_change = 0, due = ?
+                    WHERE vehicle_id = ?""", (oil_type, max_distance <= threshold, vehicle_id))
+
+
+def sync_oil_types(conn: sqlite3.Connection, name: Optional[str] = None,
+                   threshold: float = OIL_ALERT_THRESHOLD):
+    """مزامنة العداد العام لنوع زيت (أو كل الأنواع) بعد تعديل مسافته المتبقية مباشرة"""
+    conn.execute("""INSERT INTO oil_type_summary (oil_type, km_since_change, due)
+                    SELECT name, MAX(0, IFNULL(max_distance - remaining_distance, 0)),
+                           IFNULL(remaining_distance <= ?, 0)
+                    FROM oil_types
+                    WHERE ? IS NULL OR name = ?
+                    ON CONFLICT (oil_type) DO UPDATE SET
+                        km_since_change = excluded.km_since_change,
+                        due = excluded.due""", (threshold, name, name))
+
+
+def rebuild(conn: sqlite3.Connection, threshold: float = OIL_ALERT_THRESHOLD):
+    """إعادة حساب الملخص من السجل كاملاً، للاستيراد بالجملة فقط"""
+    conn.execute("DELETE FROM vehicle_summary")
+    conn.execute("""INSERT INTO vehicle_summary
+                    (vehicle_id, oil_type, readings_count, total_km, km_since_change, last_reading_at, due)
+                    SELECT v.id, s.oil_type, COUNT(c.id), IFNULL(SUM(c.kilometer_reading), 0),
+                           IFNULL(SUM(CASE WHEN c.change_date >= IFNULL(v.last_oil_change_date, '')
+                                           THEN c.kilometer_reading END), 0),
+                           MAX(c.change_date), IFNULL(s.remaining_distance <= ?, 0)
+                    FROM vehicles v
+                    LEFT JOIN vehicle_oil_state s ON s.vehicle_id = v.id
+                    LEFT JOIN oil_changes c ON c.vehicle_id = v.id
+                    GROUP BY v.id""", (threshold,))
+    conn.execute("DELETE FROM oil_type_summary")
+    conn.execute("""INSERT INTO oil_type_summary
+                    (oil_type, readings_count, total_km, km_since_change, last_reading_at, due)
+                    SELECT k.oil_type, COUNT(c.id), IFNULL(SUM(c.kilometer_reading), 0),
+                           MAX(0, IFNULL(t.max_distance - t.remaining_distance, 0)),
+                           MAX(c.change_date), IFNULL(t.remaining_distance <= ?, 0)
+                    FROM (SELECT name AS oil_type FROM oil_types
+                          UNION SELECT IFNULL(oil_type, '') FROM oil_changes) AS k
+                    LEFT JOIN oil_types t ON t.name = k.oil_type
+                    LEFT JOIN oil_changes c ON IFNULL(c.oil_type, '') = k.oil_type
+                    GROUP BY k.oil_type""", (threshold,))
@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# الوحدات في جذر المستودع وليست حزمة
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from repository import Repository  # noqa: E402
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = Repository(tmp_path / "alka.db")
+    repo.migrate()
+    yield repo
+    repo.close()
+
+
+@pytest.fixture
+def make_repo(tmp_path):
+    """قاعدة بيانات إضافية في نفس المجلد المؤقت، مثل جهاز آخر يستورد النسخة"""
+    repos = []
+
+    def make(name: str) -> Repository:
+        repo = Repository(tmp_path / f"{name}.db")
+        repo.migrate()
+        repos.append(repo)
+        return repo
+
+    yield make
+    for repo in repos:
+        repo.close()
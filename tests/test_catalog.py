@@ -0,0 +1,50 @@
+import pytest
+
+from catalog import OilCatalog
+
+
+@pytest.fixture
+def catalog(repo):
+    return OilCatalog(repo)
+
+
+def test_committed_write_updates_snapshot(catalog):
+    version, _ = catalog.snapshot()
+
+    catalog.add("زيت جديد", 8000, 5, "5W-40")
+
+    new_version, types = catalog.snapshot()
+    assert new_version > version
+    assert types["زيت جديد"]["remaining_distance"] == 8000
+
+
+def test_rolled_back_write_leaves_snapshot_unchanged(repo, catalog):
+    before = catalog.snapshot()
+
+    with pytest.raises(RuntimeError):
+        with repo.transaction():
+            catalog.add("زيت ملغى", 8000, 5, "5W-40")
+            raise RuntimeError("rollback")
+
+    assert catalog.snapshot() == before
+    assert catalog.get("زيت ملغى") is None
+
+
+def test_uncommitted_read_is_not_cached(repo, catalog):
+    with pytest.raises(RuntimeError):
+        with repo.transaction():
+            repo.add_oil_type("زيت مؤقت", 1000, 4, "10W-30", "")
+            assert "زيت مؤقت" in catalog.load()
+            raise RuntimeError("rollback")
+
+    assert "زيت مؤقت" not in catalog.load()
+
+
+def test_invalidate_reloads_external_changes(repo, catalog):
+    catalog.load()
+    repo.set_remaining_distance("زيت 10W-40", 123)
+    assert catalog.get("زيت 10W-40")["remaining_distance"] != 123
+
+    catalog.invalidate()
+
+    assert catalog.get("زيت 10W-40")["remaining_distance"] == 123
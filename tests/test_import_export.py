@@ -0,0 +1,83 @@
+import pytest
+
+from exporter import export_data
+from importer import import_data
+
+OIL_TYPE = "زيت 10W-40"
+
+
+def _history(repo) -> list:
+    # السجل مع هوية السيارة بدل رقمها، فيقارن بين قاعدتي بيانات مختلفتي الترقيم
+    return repo.query("""SELECT c.oil_type, c.change_date, c.kilometer_reading, v.car_type, v.manufacture_year
+                         FROM oil_changes c LEFT JOIN vehicles v ON v.id = c.vehicle_id
+                         ORDER BY c.change_date, c.kilometer_reading""")
+
+
+@pytest.fixture
+def source(repo):
+    first = repo.add_vehicle("Toyota", 2019, 10000, OIL_TYPE)
+    second = repo.add_vehicle("Nissan", 2021, 500, OIL_TYPE)
+    repo.record_odometer(first, OIL_TYPE, 10120, "سيارة خاصة", "2024-03-01T08:00:00")
+    repo.record_odometer(second, OIL_TYPE, 640, "سيارة خاصة", "2024-03-02T08:00:00")
+    repo.record_reading(OIL_TYPE, 75, "سيارة خاصة", "2024-03-03T08:00:00")
+    return repo
+
+
+@pytest.mark.parametrize("fmt, compress", [("ndjson", True), ("ndjson", False), ("csv", False), ("csv", True)])
+def test_round_trip_into_empty_database(source, make_repo, tmp_path, fmt, compress):
+    path = export_data(tmp_path / f"backup.{fmt}{'.gz' if compress else ''}", fmt=fmt, compress=compress,
+                       repo=source)
+    target = make_repo("target")
+
+    summary = import_data(path, repo=target)
+
+    assert summary["oil_changes"] == {"read": 3, "inserted": 3, "rejected": 0}
+    assert _history(target) == _history(source)
+    # كل سيارة مستوردة لها حالة زيت
+    assert len(target.load_vehicle_states()) == 2
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+def test_reimport_into_same_database_adds_nothing(source, tmp_path, fmt):
+    path = export_data(tmp_path / f"backup.{fmt}", fmt=fmt, compress=False, repo=source)
+    history = _history(source)
+
+    summary = import_data(path, repo=source)
+
+    assert summary["oil_changes"] == {"read": 3, "inserted": 0, "rejected": 0}
+    assert summary["vehicles"]["inserted"] == 0
+    assert _history(source) == history
+
+
+def test_csv_import_is_idempotent(source, make_repo, tmp_path):
+    path = export_data(tmp_path / "backup.csv", fmt="csv", compress=False, repo=source)
+    target = make_repo("target")
+    import_data(path, repo=target)
+
+    summary = import_data(path, repo=target)
+
+    assert summary["oil_changes"]["inserted"] == 0
+    assert summary["vehicles"]["inserted"] == 0
+    assert target.query_one("SELECT COUNT(*) FROM vehicles")[0] == 2
+
+
+def test_csv_does_not_link_to_a_different_local_vehicle(source, make_repo, tmp_path):
+    path = export_data(tmp_path / "backup.csv", fmt="csv", compress=False, repo=source)
+    target = make_repo("target")
+    # نفس الرقم محجوز لسيارة أخرى على هذا الجهاز
+    target.add_vehicle("Kia", 2015, 90000, OIL_TYPE)
+
+    import_data(path, repo=target)
+
+    assert _history(target) == _history(source)
+    assert target.query_one("SELECT COUNT(*) FROM vehicles")[0] == 3
+
+
+def test_ndjson_rejects_changes_for_vehicles_missing_from_file(repo, make_repo, tmp_path):
+    path = tmp_path / "partial.ndjson"
+    path.write_text('{"table": "oil_changes", "oil_type": "x", "change_date": "2024-01-01", '
+                    '"kilometer_reading": 5, "vehicle_type": "s", "vehicle_id": 77}\n', encoding="utf-8")
+
+    summary = import_data(path, repo=repo)
+
+    assert summary["oil_changes"] == {"read": 1, "inserted": 0, "rejected": 1}
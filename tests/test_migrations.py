@@ -0,0 +1,90 @@
+import sqlite3
+
+from migrations import MIGRATIONS, SCHEMA_VERSION, get_schema_version
+from repository import Repository
+
+
+def _baseline(path):
+    # قاعدة بيانات كما كانت تنشئها init_db قبل الترحيل بالإصدارات، user_version = 0
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE oil_types (name TEXT PRIMARY KEY, max_distance INTEGER, remaining_distance INTEGER,
+                                image TEXT, liter_capacity REAL, grade TEXT);
+        CREATE TABLE oil_changes (id INTEGER PRIMARY KEY AUTOINCREMENT, oil_type TEXT, change_date TEXT,
+                                  kilometer_reading INTEGER, vehicle_type TEXT DEFAULT 'سيارة خاصة');
+        CREATE TABLE vehicles (id INTEGER PRIMARY KEY AUTOINCREMENT, car_type TEXT, manufacture_year INTEGER,
+                               current_mileage INTEGER, last_oil_change_date TEXT,
+                               next_oil_change_mileage INTEGER);
+        CREATE TABLE wheels (id INTEGER PRIMARY KEY AUTOINCREMENT, wheel_type TEXT, install_date TEXT,
+                             expected_life INTEGER);
+        INSERT INTO oil_types VALUES ('زيت خاص', 7000, 4200, '', 4.5, '0W-20');
+        INSERT INTO vehicles (car_type, manufacture_year, current_mileage, last_oil_change_date)
+            VALUES ('Toyota', 2018, 52000, '2024-01-10T09:00:00');
+        INSERT INTO oil_changes (oil_type, change_date, kilometer_reading)
+            VALUES ('زيت خاص', '2024-01-11T09:00:00', 120),
+                   ('زيت خاص', '2024-01-12T09:00:00', 300);
+        INSERT INTO wheels (wheel_type, install_date, expected_life) VALUES ('Michelin', '2023-05-01', 40000);
+    """)
+    conn.commit()
+    conn.close()
+
+
+def _migrate_to(path, version: int):
+    conn = sqlite3.connect(path, isolation_level=None)
+    for target, step in enumerate(MIGRATIONS[:version], start=1):
+        conn.execute("BEGIN IMMEDIATE")
+        step(conn)
+        conn.execute(f"PRAGMA user_version = {target}")
+        conn.execute("COMMIT")
+    conn.close()
+
+
+def test_baseline_database_migrates_to_latest(tmp_path):
+    path = tmp_path / "alka.db"
+    _baseline(path)
+
+    repo = Repository(path)
+    repo.migrate()
+
+    with repo.transaction() as conn:
+        assert get_schema_version(conn) == SCHEMA_VERSION
+    # البيانات القديمة كما هي
+    assert repo.query_one("SELECT max_distance, remaining_distance, grade FROM oil_types WHERE name = 'زيت خاص'") \
+        == (7000, 4200, "0W-20")
+    assert repo.query("SELECT kilometer_reading FROM oil_changes ORDER BY id") == [(120,), (300,)]
+    assert repo.query("SELECT wheel_type FROM wheels") == [("Michelin",)]
+    # حالة زيت وقراءة عداد أساس بوقت رقمي لكل سيارة قائمة
+    assert len(repo.load_vehicle_states()) == 1
+    assert repo.query("SELECT reading_km, typeof(reading_date) FROM oil_readings") == [(52000, "integer")]
+    repo.close()
+
+
+def test_migrate_is_idempotent(repo):
+    repo.migrate()
+    with repo.transaction() as conn:
+        assert get_schema_version(conn) == SCHEMA_VERSION
+
+
+def test_upgrade_keeps_readings_cascade_and_backup(tmp_path):
+    path = tmp_path / "alka.db"
+    _migrate_to(path, 12)
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO vehicles (car_type, manufacture_year, current_mileage) VALUES ('Kia', 2020, 10)")
+    conn.executemany("INSERT INTO oil_readings (vehicle_id, reading_date, reading_km) VALUES (1, ?, ?)",
+                     [(1700000000, 10), (1700000100, 20), (1700000200, 30)])
+    # أحدث قراءة نقلت للأرشيف، فرقمها لا يعاد استخدامه بعد إعادة بناء الجدول
+    conn.execute("DROP TRIGGER oil_readings_no_delete")
+    conn.execute("DELETE FROM oil_readings WHERE id = 3")
+    conn.commit()
+    conn.close()
+
+    repo = Repository(path)
+    repo.migrate()
+
+    assert (tmp_path / "alka.db.v12.bak").is_file()
+    assert repo.query("SELECT id, reading_km FROM oil_readings ORDER BY id") == [(1, 10), (2, 20)]
+    foreign_keys = repo.query("PRAGMA foreign_key_list(oil_readings)")
+    assert [(row[2], row[6]) for row in foreign_keys] == [("vehicles", "CASCADE")]
+    repo.save_oil_reading(1, 1700000300, 40, None)
+    assert repo.query_one("SELECT MAX(id) FROM oil_readings") == (4,)
+    repo.close()
@@ -0,0 +1,57 @@
+from ingest import ingest_readings
+
+OIL_TYPE = "زيت 10W-40"
+VEHICLE_TYPE = "سيارة خاصة"
+
+
+def _deltas(repo, vehicle_id) -> list:
+    return repo.query("""SELECT reading_km, delta_km, flag FROM oil_reading_deltas
+                         WHERE vehicle_id = ? ORDER BY reading_date, id""", (vehicle_id,))
+
+
+def _remaining(repo, vehicle_id) -> float:
+    return repo.load_vehicle_states()[vehicle_id]["remaining_distance"]
+
+
+def test_rollback_is_saved_and_flagged_without_deduction(repo):
+    vehicle_id = repo.add_vehicle("Toyota", 2019, 1000, OIL_TYPE)
+    repo.record_odometer(vehicle_id, OIL_TYPE, 1200, VEHICLE_TYPE, "2030-01-02T08:00:00")
+    remaining = _remaining(repo, vehicle_id)
+
+    assert repo.record_odometer(vehicle_id, OIL_TYPE, 1150, VEHICLE_TYPE, "2030-01-03T08:00:00") \
+        == (remaining, None, True)
+    assert _deltas(repo, vehicle_id)[-1] == (1150, None, "rollback")
+    assert repo.get_vehicle_info(vehicle_id)[3] == 1200
+    assert [row[5] for row in repo.flagged_readings()] == ["rollback"]
+
+
+def test_backfilled_reading_matches_view_and_is_not_deducted_twice(repo):
+    vehicle_id = repo.add_vehicle("Toyota", 2019, 1000, OIL_TYPE)
+    start = _remaining(repo, vehicle_id)
+    repo.record_odometer(vehicle_id, OIL_TYPE, 1200, VEHICLE_TYPE, "2030-01-03T08:00:00")
+
+    # قراءة متأخرة بين قراءتين: مسافتها من القراءة التي قبلها بالوقت، ولا خصم جديد
+    remaining, distance, inserted = repo.record_odometer(vehicle_id, OIL_TYPE, 1100, VEHICLE_TYPE,
+                                                         "2030-01-02T08:00:00")
+
+    assert (distance, inserted) == (100, True)
+    assert (1100, 100, "out_of_order") in _deltas(repo, vehicle_id)
+    assert remaining == start - 200
+
+
+def test_ingest_counts_only_new_flags_of_the_batch(repo):
+    first = repo.add_vehicle("Toyota", 2019, 1000, OIL_TYPE)
+    second = repo.add_vehicle("Nissan", 2020, 500, OIL_TYPE)
+    # علم قديم لسيارة أخرى لا يعد في إدخال لاحق
+    repo.record_odometer(second, OIL_TYPE, 400, VEHICLE_TYPE, "2030-01-01T08:00:00")
+
+    summary = ingest_readings([{"vehicle_id": first, "odometer": 1300, "timestamp": "2030-01-02T08:00:00"},
+                               {"vehicle_id": first, "odometer": 1250, "timestamp": "2030-01-03T08:00:00"},
+                               {"vehicle_id": 999, "odometer": 10, "timestamp": "2030-01-03T08:00:00"}],
+                              repo=repo)
+
+    assert (summary["odometer"], summary["rejected"], summary["flagged"]) == (2, 1, 1)
+    assert repo.get_vehicle_info(first)[3] == 1300
+    assert repo.query_one("SELECT SUM(kilometer_reading) FROM oil_changes WHERE vehicle_id = ?", (first,)) == (300,)
+    assert ingest_readings([{"vehicle_id": first, "odometer": 1400, "timestamp": "2030-01-04T08:00:00"}],
+                           repo=repo)["flagged"] == 0
@@ -0,0 +1,45 @@
+import datetime
+import sqlite3
+import time
+
+import pytest
+
+import prediction
+from prediction import MaintenancePredictor
+
+OIL_TYPE = "زيت 10W-40"
+VEHICLE_TYPE = "سيارة خاصة"
+
+
+@pytest.fixture(params=["UTC", "Pacific/Kiritimati", "America/Los_Angeles"])
+def local_zone(request, monkeypatch):
+    # منطقة بعيدة عن UTC تكشف خلط الساعة المحلية بساعة يونكس
+    monkeypatch.setenv("TZ", request.param)
+    time.tzset()
+    yield request.param
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_today_uses_the_clock_of_stored_dates(local_zone):
+    conn = sqlite3.connect(":memory:")
+    local_now = conn.execute("SELECT julianday('now', 'localtime')").fetchone()[0]
+    conn.close()
+
+    assert prediction._today() == pytest.approx(local_now, abs=1 / 86400)
+    assert prediction._to_date(local_now) == datetime.date.today()
+
+
+def test_vehicle_due_date_from_daily_usage(repo, local_zone):
+    vehicle_id = repo.add_vehicle("Toyota", 2019, 0, OIL_TYPE)
+    now = datetime.datetime.now().replace(microsecond=0)
+    for days_ago in range(5, 0, -1):
+        repo.record_vehicle_reading(vehicle_id, OIL_TYPE, 100, VEHICLE_TYPE,
+                                    (now - datetime.timedelta(days=days_ago)).isoformat())
+    remaining = repo.load_vehicle_states()[vehicle_id]["remaining_distance"]
+
+    due = MaintenancePredictor(repo).predict()["vehicles"][vehicle_id]
+
+    assert due["km_per_day"] == 100
+    assert due["days_left"] == int(remaining / 100)
+    assert due["due_date"] == (now + datetime.timedelta(days=remaining / 100)).date()
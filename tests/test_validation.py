@@ -0,0 +1,20 @@
+import pytest
+
+from validation import ERROR, OK, WARNING, check_reading
+
+
+@pytest.mark.parametrize("text, remaining, odometer, expected", [
+    ("", 1000, None, (OK, None)),
+    ("abc", 1000, None, (ERROR, None)),
+    ("-5", 1000, None, (ERROR, None)),
+    ("nan", 1000, None, (ERROR, None)),
+    ("100", 1000, None, (OK, 900)),
+    ("600", 1000, None, (WARNING, 400)),
+    ("1200", 1000, None, (ERROR, 0)),
+    # قراءة عداد مطلقة: المسافة هي الفرق عن عداد السيارة
+    ("50100", 1000, 50000, (OK, 900)),
+    ("49900", 1000, 50000, (WARNING, 1000)),
+])
+def test_check_reading(text, remaining, odometer, expected):
+    level, _, predicted = check_reading(text, remaining, odometer=odometer)
+    assert (level, predicted) == expected
@@ -0,0 +1,72 @@
+import sqlite3
+import threading
+
+import pytest
+
+from writer import GroupCommitWriter
+
+
+@pytest.fixture
+def group(repo):
+    group = GroupCommitWriter(repo)
+    yield group
+    group.close()
+
+
+def _committed_wheels(repo) -> list:
+    # اتصال مستقل يرى المحفوظ على القرص فقط
+    conn = sqlite3.connect(repo.path)
+    try:
+        return [row[0] for row in conn.execute("SELECT wheel_type FROM wheels ORDER BY id")]
+    finally:
+        conn.close()
+
+
+def _hold(group) -> threading.Event:
+    # عملية توقف خيط الكاتب، فما يرسل بعدها يدخل دفعة واحدة عند إطلاقها
+    started, release = threading.Event(), threading.Event()
+
+    def hold():
+        started.set()
+        release.wait()
+
+    group.submit(hold)
+    started.wait(timeout=5)
+    return release
+
+
+def test_future_resolves_only_after_commit(repo, group):
+    seen = []
+    future = group.submit(repo.add_wheel, "Michelin", "2024-01-01", 40000)
+    # ينفذ عند اكتمال Future، فيجب أن يرى الحفظ من اتصال آخر
+    future.add_done_callback(lambda f: seen.append(_committed_wheels(repo)))
+
+    future.result(timeout=5)
+
+    assert seen == [["Michelin"]]
+
+
+def test_failed_operation_rolls_back_alone(repo, group):
+    callbacks = []
+
+    def fail_after_write():
+        repo.add_wheel("Broken", "2024-01-01", 1)
+        repo.after_commit(lambda: callbacks.append("broken"))
+        raise ValueError("boom")
+
+    def add_with_callback(name):
+        repo.add_wheel(name, "2024-01-01", 1)
+        repo.after_commit(lambda: callbacks.append(name))
+
+    release = _hold(group)
+    futures = [group.submit(add_with_callback, "A"), group.submit(fail_after_write),
+               group.submit(add_with_callback, "B")]
+    release.set()
+
+    assert futures[0].result(timeout=5) is None
+    with pytest.raises(ValueError):
+        futures[1].result(timeout=5)
+    assert futures[2].result(timeout=5) is None
+    assert group.metrics()["batch_max"] == 3
+    assert _committed_wheels(repo) == ["A", "B"]
+    assert callbacks == ["A", "B"]
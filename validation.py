@@ -0,0 +1,107 @@
+"""التحقق من قراءة العداد أثناء الكتابة: ينتظر توقف الكتابة، ويرسل التغيير للواجهة فقط عند اختلافه"""
+import asyncio
+import functools
+import math
+from typing import Optional
+
+from fleet import OIL_ALERT_THRESHOLD
+
+# مدة انتظار توقف الكتابة قبل التحقق (ثانية)
+DEBOUNCE_SECONDS = 0.3
+
+# مستويات نتيجة التحقق، وتحول إلى ألوان في الواجهة
+OK = "ok"
+WARNING = "warning"
+ERROR = "error"
+
+
+@functools.lru_cache(maxsize=256)
+def check_reading(text: Optional[str], remaining: Optional[float],
+                  threshold: float = OIL_ALERT_THRESHOLD, odometer: Optional[float] = None) -> tuple:
+    """التحقق من نص القراءة وإرجاع (المستوى, الرسالة, المتبقي المتوقع بعد القراءة)
+
+    مع odometer (عداد السيارة الحالي) النص قراءة عداد مطلقة والمسافة هي الفرق بينهما
+    """
+    text = (text or "").strip()
+    if not text:
+        return OK, "", None
+    try:
+        km = float(text)
+    except ValueError:
+        return ERROR, "الرجاء إدخال رقم صحيح", None
+    if not math.isfinite(km) or km <= 0:
+        return ERROR, "القراءة يجب أن تكون أكبر من صفر", None
+    if odometer is not None:
+        if km < odometer:
+            return WARNING, f"القراءة أقل من عداد السيارة ({int(odometer)} كم)، ستحفظ للمراجعة دون خصم", remaining
+        km -= odometer
+    if remaining is None:
+        return OK, "", None
+
+    predicted = max(0, remaining - km)
+    if predicted <= 0:
+        return ERROR, "يجب تغيير الزيت بعد هذه القراءة", predicted
+    if predicted <= threshold:
+        return WARNING, f"متبقي {int(predicted)} كم، سيظهر تنبيه تغيير الزيت", predicted
+    return OK, f"متبقي {int(predicted)} كم بعد هذه القراءة", predicted
+
+
+class KmReadingValidator:
+    """يربط حقل القراءة بنص التغذية الراجعة
+
+    colors يحول المستوى إلى لون. المسافة المتبقية تمرر مرة واحدة عند فتح الحوار عبر reset
+    فلا يقرأ oil_types مع كل حرف
+    """
+
+    def __init__(self, field, feedback, colors: dict, render=None,
+                 delay: float = DEBOUNCE_SECONDS, threshold: float = OIL_ALERT_THRESHOLD):
+        self.field = field
+        self.feedback = feedback
+        self.colors = colors
+        self.render = render
+        self.delay = delay
+        self.threshold = threshold
+        self._remaining: Optional[float] = None
+        self._odometer: Optional[float] = None
+        self._generation = 0
+        field.on_change = self.on_change
+
+    def reset(self, remaining: Optional[float], odometer: Optional[float] = None):
+        """تهيئة الحقل لحوار جديد، القيم ترسل مع فتح الحوار فلا يحدّث شيء هنا"""
+        self._remaining = remaining
+        self._odometer = odometer
+        self._generation += 1
+        self.field.value = ""
+        self._apply(check_reading("", remaining, self.threshold, odometer))
+
+    async def on_change(self, e):
+        # كل حرف يلغي التحقق السابق، ولا يتحقق إلا آخر تغيير بعد مدة الانتظار
+        self._generation += 1
+        generation = self._generation
+        await asyncio.sleep(self.delay)
+        if generation == self._generation:
+            self.validate()
+
+    def validate(self) -> tuple:
+        result = check_reading(self.field.value, self._remaining, self.threshold, self._odometer)
+        changed = self._apply(result)
+        if changed:
+            if self.render:
+                with self.render.batch("validate_km"):
+                    self.render.update(*changed)
+            else:
+                self.field.page.update(*changed)
+        return result
+
+    def _apply(self, result: tuple) -> list:
+        level, message, _ = result
+        color = self.colors[level]
+        changed = []
+        if self.field.border_color != color:
+            self.field.border_color = color
+            changed.append(self.field)
+        if self.feedback.value != message or self.feedback.color != color:
+            self.feedback.value = message
+            self.feedback.color = color
+            changed.append(self.feedback)
+        return changed
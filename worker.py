@@ -0,0 +1,79 @@
+"""تنفيذ عمليات قاعدة البيانات والملفات خارج معالجات أحداث Flet"""
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+import perf
+
+# عدد الخيوط للعمليات الطويلة على الملفات (تصدير، استيراد)
+IO_WORKERS = 2
+
+# عدد خيوط القراءة، تتوازى فقط إذا فعّلت Repository.concurrent_reads
+READ_WORKERS = 4
+
+_db_executor: Optional[ThreadPoolExecutor] = None
+_io_executor: Optional[ThreadPoolExecutor] = None
+_read_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def configure(read_workers: int = READ_WORKERS):
+    """ضبط عدد خيوط القراءة قبل أول استخدام (وضع الخادم)"""
+    global READ_WORKERS
+    with _lock:
+        if _db_executor is not None:
+            raise RuntimeError("worker already started")
+        READ_WORKERS = read_workers
+
+
+def _get_executors() -> tuple:
+    # تنشأ الخيوط عند أول استخدام فقط
+    global _db_executor, _io_executor, _read_executor
+    if _db_executor is None:
+        with _lock:
+            if _db_executor is None:
+                _io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="alka-io")
+                _read_executor = ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix="alka-read")
+                _db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alka-db")
+    return _db_executor, _io_executor, _read_executor
+
+
+def submit_db(fn: Callable, *args, **kwargs) -> Future:
+    """تنفيذ دالة على خيط قاعدة البيانات، العمليات تنفذ بترتيب إرسالها"""
+    return _get_executors()[0].submit(fn, *args, **kwargs)
+
+
+def submit_io(fn: Callable, *args, **kwargs) -> Future:
+    """تنفيذ عملية ملفات طويلة دون حجز خيط قاعدة البيانات"""
+    return _get_executors()[1].submit(fn, *args, **kwargs)
+
+
+def submit_read(fn: Callable, *args, **kwargs) -> Future:
+    """تنفيذ قراءة فقط على خيوط القراءة، فلا تنتظر في طابور الكتابة خلف حفظ الجلسات الأخرى"""
+    return _get_executors()[2].submit(fn, *args, **kwargs)
+
+
+# الزمن المقاس من الإرسال حتى النتيجة، أي ما ينتظره معالج الحدث بما فيه الانتظار في الطابور
+async def run_db(fn: Callable, *args, **kwargs):
+    with perf.measure(f"db:{perf.label(fn)}"):
+        return await asyncio.wrap_future(submit_db(fn, *args, **kwargs))
+
+
+async def run_io(fn: Callable, *args, **kwargs):
+    with perf.measure(f"io:{perf.label(fn)}"):
+        return await asyncio.wrap_future(submit_io(fn, *args, **kwargs))
+
+
+async def run_read(fn: Callable, *args, **kwargs):
+    with perf.measure(f"read:{perf.label(fn)}"):
+        return await asyncio.wrap_future(submit_read(fn, *args, **kwargs))
+
+
+def shutdown(wait: bool = True):
+    global _db_executor, _io_executor, _read_executor
+    with _lock:
+        for executor in (_db_executor, _io_executor, _read_executor):
+            if executor is not None:
+                executor.shutdown(wait=wait)
+        _db_executor = _io_executor = _read_executor = None
@@ -0,0 +1,212 @@
+"""كاتب واحد بتجميع الحفظ (group commit) لعمليات الكتابة من كل الجلسات
+
+كل عملية كتابة تدخل طابوراً واحداً. خيط الكاتب يأخذ أول عملية مع كل ما وصل أثناء حفظ
+الدفعة السابقة وينفذه في معاملة واحدة بحفظ واحد على القرص (fsync واحد بدل واحد لكل
+عملية). كل عملية داخل SAVEPOINT خاص بها، فالعملية الفاشلة تلغى وحدها ولا تلغي بقية
+الدفعة. ما تسجله العمليات في Repository.after_commit ينفذ بعد حفظ الدفعة، والمستدعي
+يحصل على Future تكتمل بالنتيجة بعد اكتمال الحفظ فقط
+
+الكاتب مفيد فقط مع جلسات كثيرة تكتب معاً (وضع الخادم)، ومع جلسة واحدة لا يكسب شيئاً فهو
+معطل افتراضياً: run_write تنفذ على خيط قاعدة البيانات بحفظ لكل عملية حتى يفعّل بـ configure
+"""
+import asyncio
+import collections
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+import perf
+import worker
+from repository import Repository, get_repository
+
+# توجيه run_write للكاتب، يفعّل بـ configure قبل أول كتابة
+GROUP_COMMIT = False
+
+# مدة إضافية لجمع العمليات بعد أول عملية (ثانية). بدونها تجمع الدفعة ما وصل أثناء حفظ
+# السابقة فقط، وهذا يكفي لأن الحفظ على القرص هو ما تنتظره العمليات أصلاً
+WINDOW_SECONDS = 0.0
+
+# أقصى عدد عمليات في معاملة واحدة
+MAX_BATCH = 256
+
+# مدة حساب معدل الحفظ في الثانية
+RATE_WINDOW_SECONDS = 10.0
+
+_Operation = collections.namedtuple("_Operation", "future fn args kwargs")
+
+
+def _bucket(size: int) -> int:
+    # توزيع أحجام الدفعات على حدود 1, 2, 4, 8, ...
+    return 1 << (size - 1).bit_length()
+
+
+class GroupCommitWriter:
+    def __init__(self, repo: Optional[Repository] = None, window: float = WINDOW_SECONDS,
+                 max_batch: int = MAX_BATCH):
+        self._repo = repo
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._metrics_lock = threading.Lock()
+        self._commit_times: collections.deque = collections.deque()
+        self._commits = 0
+        self._operations = 0
+        self._failed = 0
+        self._batch_max = 0
+        self._batch_sizes: dict = {}
+        self._thread = threading.Thread(target=self._run, name="alka-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def repo(self) -> Repository:
+        return self._repo or get_repository()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """إضافة عملية كتابة للطابور، والنتيجة تصل بعد حفظ دفعتها"""
+        future = Future()
+        self._queue.put(_Operation(future, fn, args, kwargs))
+        return future
+
+    def close(self, wait: bool = True):
+        self._queue.put(None)
+        if wait:
+            self._thread.join()
+
+    def metrics(self) -> dict:
+        with self._metrics_lock:
+            now = time.monotonic()
+            while self._commit_times and self._commit_times[0] < now - RATE_WINDOW_SECONDS:
+                self._commit_times.popleft()
+            return {
+                "commits": self._commits,
+                "operations": self._operations,
+                "failed": self._failed,
+                "commits_per_s": round(len(self._commit_times) / RATE_WINDOW_SECONDS, 2),
+                "batch_avg": round(self._operations / self._commits, 2) if self._commits else 0.0,
+                "batch_max": self._batch_max,
+                "batch_sizes": dict(sorted(self._batch_sizes.items())),
+                "queued": self._queue.qsize(),
+            }
+
+    def _collect(self, first: _Operation) -> tuple:
+        """(الدفعة, هل طلب الإيقاف)"""
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            try:
+                # ما وصل بالفعل يؤخذ فوراً
+                operation = self._queue.get_nowait()
+            except queue.Empty:
+                # الطابور فارغ: العملية الوحيدة تحفظ فوراً ولا تنتظر النافذة، والانتظار حتى
+                # نهايتها فقط إذا وصلت عمليات أخرى معها، أي أن الجلسات تكتب في نفس الوقت
+                remaining = deadline - time.monotonic()
+                if len(batch) == 1 or remaining <= 0:
+                    break
+                try:
+                    operation = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if operation is None:
+                return batch, True
+            batch.append(operation)
+        return batch, False
+
+    def _run(self):
+        # المستودع يفتح ويرحّل على خيط الكاتب عند أول دفعة، وخطأ الفتح يصل للمستدعي عبر Future
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stopping = self._collect(first)
+            batch = [operation for operation in batch if operation.future.set_running_or_notify_cancel()]
+            if batch:
+                self._commit(batch)
+
+    def _commit(self, batch: list):
+        results = []
+        started = time.perf_counter()
+        try:
+            with self.repo.transaction():
+                for operation in batch:
+                    try:
+                        with self.repo.savepoint("group_operation"):
+                            result = operation.fn(*operation.args, **operation.kwargs)
+                    except Exception as e:
+                        results.append((operation, None, e))
+                    else:
+                        results.append((operation, result, None))
+        except Exception as e:
+            # فشل الحفظ نفسه: لم يحفظ شيء من الدفعة
+            logging.error(f"فشل حفظ دفعة من {len(batch)} عمليات: {e}")
+            with self._metrics_lock:
+                self._failed += len(batch)
+            for operation in batch:
+                operation.future.set_exception(e)
+            return
+
+        perf.record("db:group_commit", time.perf_counter() - started)
+        with self._metrics_lock:
+            self._commits += 1
+            self._operations += len(batch)
+            self._failed += sum(1 for _, _, error in results if error is not None)
+            self._batch_max = max(self._batch_max, len(batch))
+            bucket = _bucket(len(batch))
+            self._batch_sizes[bucket] = self._batch_sizes.get(bucket, 0) + 1
+            self._commit_times.append(time.monotonic())
+        for operation, result, error in results:
+            if error is None:
+                operation.future.set_result(result)
+            else:
+                operation.future.set_exception(error)
+
+
+_writer: Optional[GroupCommitWriter] = None
+_writer_lock = threading.Lock()
+
+
+def configure(group_commit: bool = GROUP_COMMIT):
+    """توجيه run_write للكاتب المشترك أو لخيط قاعدة البيانات، قبل أول كتابة"""
+    global GROUP_COMMIT
+    with _writer_lock:
+        if _writer is not None:
+            raise RuntimeError("writer already started")
+        GROUP_COMMIT = group_commit
+
+
+def get_writer() -> GroupCommitWriter:
+    """الكاتب المشترك على المستودع المشترك، يبدأ خيطه عند أول استخدام"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = GroupCommitWriter()
+    return _writer
+
+
+def submit_write(fn: Callable, *args, **kwargs) -> Future:
+    return get_writer().submit(fn, *args, **kwargs)
+
+
+async def run_write(fn: Callable, *args, **kwargs):
+    """عملية كتابة من معالج حدث، عبر الكاتب إن فعّل وإلا على خيط قاعدة البيانات"""
+    if not GROUP_COMMIT:
+        return await worker.run_db(fn, *args, **kwargs)
+    with perf.measure(f"write:{perf.label(fn)}"):
+        return await asyncio.wrap_future(submit_write(fn, *args, **kwargs))
+
+
+def metrics() -> Optional[dict]:
+    """مقاييس الكاتب المشترك، أو None إذا لم يبدأ بعد"""
+    return _writer.metrics() if _writer is not None else None
+
+
+def shutdown(wait: bool = True):
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close(wait)
+        _writer = None